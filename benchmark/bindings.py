@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+#Copyright (c) 2017-2018 William Emerison Six
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+
+import sys
+import ctypes
+
+if __name__ != '__main__':
+    sys.exit(1)
+
+from benchmark.common import *
+
+
+# compares the per-call cost of the hottest nuklear procedures when called
+# through ctypes without declared argtypes, the way nuklear.py used to
+# call them, against the typed prototypes which nuklear.py now installs.
+
+window, nuklear = createWindow()
+ctx = nuklear.ctx
+
+untyped_layout_row_dynamic = nk._nuklear['nk_layout_row_dynamic']
+untyped_label = nk._nuklear['nk_label']
+untyped_button_label = nk._nuklear['nk_button_label']
+untyped_button_label.restype = ctypes.c_int
+
+title = str.encode("button")
+
+report("untyped nk_layout_row_dynamic",
+       nanosecondsPerCall(nuklear, lambda: untyped_layout_row_dynamic(ctx, ctypes.c_float(20.0), 1)))
+report("typed nk_layout_row_dynamic",
+       nanosecondsPerCall(nuklear, lambda: nk.__layout_row_dynamic__(ctx, 20.0, 1)))
+
+report("untyped nk_label",
+       nanosecondsPerCall(nuklear, lambda: untyped_label(ctx, title, nk.TEXT_LEFT)))
+report("typed nk_label",
+       nanosecondsPerCall(nuklear, lambda: nk.__label__(ctx, title, nk.TEXT_LEFT)))
+
+report("untyped nk_button_label",
+       nanosecondsPerCall(nuklear, lambda: untyped_button_label(ctx, title)))
+report("typed nk_button_label",
+       nanosecondsPerCall(nuklear, lambda: nk.__button_label__(ctx, title)))
+
+glfw.glfwTerminate()
@@ -0,0 +1,82 @@
+#Copyright (c) 2017-2018 William Emerison Six
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import sys
+import os
+import ctypes
+import timeit
+
+if __name__ == '__main__':
+    print("common.py is a library, not a program.  Look at README.md for use of pyNuklear")
+    sys.exit(1)
+
+import builtins
+pwd = os.path.dirname(os.path.abspath(__file__))
+builtins.NUKLEAR_PATH = ctypes.CDLL(os.path.join(pwd, '..', 'contrib', 'nuklear', 'nuklearGLFWOpenGL3.so'))
+
+import glfw.glfw as glfw
+import nuklear as nk
+import nuklearGLFW3 as nkGLFW3
+
+
+# the benchmarks only measure the cost of talking to nuklear, so the
+# window they render into is never shown
+def createWindow(width=1000, height=1000):
+    if not glfw.glfwInit():
+        sys.exit()
+
+    glfw.glfwWindowHint(glfw.GLFW_CONTEXT_VERSION_MAJOR,3)
+    glfw.glfwWindowHint(glfw.GLFW_CONTEXT_VERSION_MINOR,3)
+    glfw.glfwWindowHint(glfw.GLFW_OPENGL_PROFILE,glfw.GLFW_OPENGL_CORE_PROFILE)
+    #for osx
+    glfw.glfwWindowHint(glfw.GLFW_OPENGL_FORWARD_COMPAT, 1)
+    glfw.glfwWindowHint(glfw.GLFW_VISIBLE, 0)
+
+    window = glfw.glfwCreateWindow(width, height, str.encode("pyNuklear benchmark"), None, None)
+    if not window:
+        glfw.glfwTerminate()
+        sys.exit()
+    glfw.glfwMakeContextCurrent(window)
+
+    ctx = nkGLFW3.glfw3_init(window, nkGLFW3.GLFW3_DEFAULT)
+    fontAtlas = ctypes.POINTER(nkGLFW3.FontAtlas)()
+    nkGLFW3.glfw3_font_stash_begin(ctypes.byref(fontAtlas))
+    nkGLFW3.glfw3_font_stash_end()
+    return window, nk.NuklearContext(ctx)
+
+
+# time "stmt" inside of a window which is opened and closed once per
+# frame, so that nuklear's layout state doesn't run out of room.
+# returns the average cost of one call in nanoseconds.
+def nanosecondsPerCall(nuklear, stmt, calls=1000, frames=50):
+    total = 0.0
+    for frame in range(frames):
+        nkGLFW3.glfw3_new_frame()
+        if nuklear.begin(title="benchmark",
+                         bounds=nk.Rect(0.0, 0.0, 1000.0, 1000.0),
+                         flags=nk.WINDOW_NO_SCROLLBAR):
+            total += timeit.timeit(stmt, number=calls)
+        nuklear.end()
+        nk.clear(nuklear.ctx)
+    return total / (calls * frames) * 1e9
+
+
+def report(name, nanoseconds):
+    print("{:<40} {:>10.1f} ns/call".format(name, nanoseconds))
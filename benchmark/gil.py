@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+#Copyright (c) 2017-2018 William Emerison Six
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+
+
+import sys
+import ctypes
+import threading
+
+if __name__ != '__main__':
+    sys.exit(1)
+
+from benchmark.common import *
+
+
+# compares the per-call cost of short nuklear procedures called through
+# ctypes.CDLL, which releases and retakes the GIL around every call,
+# against the ctypes.PyDLL handle nuklear.py now calls them through,
+# which keeps it.  see nk.RELEASE_GIL for the procedures which don't.
+
+window, nuklear = createWindow()
+ctx = nuklear.ctx
+
+# the typed prototype of procedure, on a handle of library
+def typed(library, procedure):
+    copy = getattr(library, procedure.__name__)
+    copy.argtypes = procedure.argtypes
+    copy.restype = procedure.restype
+    return copy
+
+releasing = ctypes.CDLL(nk._nuklear._name, handle=nk._nuklear._handle)
+holding = ctypes.PyDLL(nk._nuklear._name, handle=nk._nuklear._handle)
+
+title = str.encode("button")
+procedures = (("nk_layout_row_dynamic", nk.__layout_row_dynamic__, (ctx, 20.0, 1)),
+              ("nk_label", nk.__label__, (ctx, title, nk.TEXT_LEFT)),
+              ("nk_button_label", nk.__button_label__, (ctx, title)),
+              ("nk_widget_width", nk.__widget_width__, (ctx,)))
+
+def compare(suffix=""):
+    for name, procedure, arguments in procedures:
+        released = typed(releasing, procedure)
+        held = typed(holding, procedure)
+        report("CDLL " + name + suffix,
+               nanosecondsPerCall(nuklear, lambda: released(*arguments)))
+        report("PyDLL " + name + suffix,
+               nanosecondsPerCall(nuklear, lambda: held(*arguments)))
+
+compare()
+
+# with another Python thread busy, each release of the GIL lets that
+# thread run before the call can return
+busy = True
+def spin():
+    while busy:
+        pass
+thread = threading.Thread(target=spin)
+thread.start()
+compare(" (busy thread)")
+busy = False
+thread.join()
+
+glfw.glfwTerminate()
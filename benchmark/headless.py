@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+#Copyright (c) 2017-2018 William Emerison Six
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+
+import sys
+import os
+import ctypes
+import time
+
+if __name__ != '__main__':
+    sys.exit(1)
+
+import builtins
+pwd = os.path.dirname(os.path.abspath(__file__))
+builtins.NUKLEAR_PATH = ctypes.CDLL(os.path.join(pwd, '..', 'contrib', 'nuklear', 'nuklearHeadless.so'))
+
+import nuklear as nk
+import nuklearHeadless as nkHeadless
+from demo.overview import *
+
+
+# frames per second of building the overview and converting it to
+# vertices with the headless backend, which needs no display or GPU,
+# followed by the cost of rasterizing a frame with NumPy
+
+ctx = nkHeadless.init()
+nuklear = nk.NuklearContext(ctx)
+framebuffer = nkHeadless.Framebuffer(1000, 1000)
+
+def frame():
+    nkHeadless.new_frame()
+    overview(nuklear)
+
+for i in range(10):
+    frame()
+    framebuffer.convert()
+
+frames = 2000
+start = time.perf_counter()
+for i in range(frames):
+    frame()
+    framebuffer.convert()
+elapsed = time.perf_counter() - start
+print("{:<40} {:>10.1f} frames/s".format("build and convert", frames / elapsed))
+
+frames = 10
+start = time.perf_counter()
+for i in range(frames):
+    frame()
+    framebuffer.render()
+elapsed = time.perf_counter() - start
+print("{:<40} {:>10.1f} frames/s".format("build, convert and rasterize", frames / elapsed))
+
+nkHeadless.headless_shutdown()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+#Copyright (c) 2017-2018 William Emerison Six
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+
+import sys
+import ctypes
+import time
+
+if __name__ != '__main__':
+    sys.exit(1)
+
+import numpy as np
+from benchmark.common import *
+from demo.overview import *
+
+
+# frames per second and latency of rendering each frame as it is built,
+# and of pipelined frames, which nuklear converts on a worker thread
+# while Python builds the next one.  latency is the time from the end of
+# building a frame to the end of the swap after the render that drew it,
+# which for pipelined frames is the next one.  this runs on any OpenGL
+# 3.3 driver, including Mesa's llvmpipe without a GPU:
+#
+#   LIBGL_ALWAYS_SOFTWARE=1 ./benchmark/pipeline.py
+#
+# besides the overview, a chart of a few thousand points gives the
+# conversion enough to do for the overlap to matter
+
+window, nuklear = createWindow()
+signal = np.sin(np.linspace(0.0, 200.0, 4000, dtype=np.float32))
+
+# returns when the frame finished building, and when it was swapped
+def frame():
+    glfw.glfwPollEvents()
+    nkGLFW3.glfw3_new_frame()
+    overview(nuklear)
+    if nuklear.begin(title="load",
+                     bounds=nk.Rect(300.0, 0.0, 700.0, 600.0),
+                     flags=nk.WINDOW_BORDER):
+        nuklear.layout_row_dynamic(500.0, 1)
+        if nuklear.chart_begin(nk.CHART_LINES, len(signal), -1.0, 1.0):
+            nuklear.chart_push_values(signal)
+            nuklear.chart_end()
+    nuklear.end()
+    built = time.perf_counter()
+    nkGLFW3.glfw3_render(nk.ANTI_ALIASING_ON, 512 * 1024, 128 * 1024)
+    glfw.glfwSwapBuffers(window)
+    return built, time.perf_counter()
+
+frames = 500
+for name, pipelined in (("serial", False), ("pipelined", True)):
+    if nkGLFW3.glfw3_set_pipelined(pipelined) != pipelined:
+        print("{:<40} {:>10}".format(name, "unsupported"))
+        continue
+    for i in range(20):
+        frame()
+    built = np.zeros(frames)
+    swapped = np.zeros(frames)
+    start = time.perf_counter()
+    for i in range(frames):
+        built[i], swapped[i] = frame()
+    elapsed = time.perf_counter() - start
+    # a pipelined render draws the frame built before it
+    lag = 1 if pipelined else 0
+    latency = swapped[lag:] - built[:frames - lag]
+    print("{:<40} {:>8.1f} frames/s {:>8.2f} ms latency (p95 {:.2f} ms)".format(
+        name,
+        frames / elapsed,
+        np.median(latency) * 1e3,
+        np.percentile(latency, 95) * 1e3))
+nkGLFW3.glfw3_set_pipelined(False)
+
+glfw.glfwTerminate()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+#Copyright (c) 2017-2018 William Emerison Six
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import sys
+
+if __name__ != '__main__':
+    sys.exit(1)
+
+from benchmark.common import *
+
+
+# compares measuring a caption through nkWrapper_get_text_width every
+# time, the way get_text_width used to, against the widths cached by
+# get_text_width, and 100 captions measured one at a time against
+# text_widths measuring them in one call.
+
+window, nuklear = createWindow()
+ctx = nuklear.ctx
+
+caption = "a caption of a typical length"
+captions = ["caption {}".format(i) for i in range(100)]
+
+report("uncached get_text_width",
+       nanosecondsPerCall(nuklear, lambda: nk.__get_text_width__(ctx, nk.__encode__(caption))))
+report("cached get_text_width",
+       nanosecondsPerCall(nuklear, lambda: nuklear.get_text_width(caption)))
+
+report("100 uncached get_text_width",
+       nanosecondsPerCall(nuklear,
+                          lambda: [nk.__get_text_width__(ctx, nk.__encode__(c)) for c in captions],
+                          calls=100))
+report("text_widths of 100",
+       nanosecondsPerCall(nuklear, lambda: nuklear.text_widths(captions), calls=100))
+
+glfw.glfwTerminate()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+#Copyright (c) 2017-2018 William Emerison Six
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+
+import sys
+import ctypes
+import time
+
+if __name__ != '__main__':
+    sys.exit(1)
+
+import numpy as np
+from benchmark.common import *
+from demo.overview import *
+
+
+# CPU time nk_glfw3_render spends uploading each frame's vertices and
+# elements with each of the backend's upload strategies.  this runs on
+# any OpenGL 3.3 driver, including Mesa's llvmpipe without a GPU:
+#
+#   LIBGL_ALWAYS_SOFTWARE=1 ./benchmark/upload.py
+#
+# besides the overview, a chart of a few thousand points makes each frame
+# large enough for the upload to matter
+
+window, nuklear = createWindow()
+signal = np.sin(np.linspace(0.0, 200.0, 4000, dtype=np.float32))
+
+def frame():
+    glfw.glfwPollEvents()
+    nkGLFW3.glfw3_new_frame()
+    overview(nuklear)
+    if nuklear.begin(title="load",
+                     bounds=nk.Rect(300.0, 0.0, 700.0, 600.0),
+                     flags=nk.WINDOW_BORDER):
+        nuklear.layout_row_dynamic(500.0, 1)
+        if nuklear.chart_begin(nk.CHART_LINES, len(signal), -1.0, 1.0):
+            nuklear.chart_push_values(signal)
+            nuklear.chart_end()
+    nuklear.end()
+    nkGLFW3.glfw3_render(nk.ANTI_ALIASING_ON, 512 * 1024, 128 * 1024)
+    glfw.glfwSwapBuffers(window)
+
+convert, upload, draw = ctypes.c_double(), ctypes.c_double(), ctypes.c_double()
+frames = 500
+for name, strategy in (("orphan", nkGLFW3.UPLOAD_ORPHAN),
+                       ("ring", nkGLFW3.UPLOAD_RING),
+                       ("persistent", nkGLFW3.UPLOAD_PERSISTENT)):
+    if nkGLFW3.glfw3_set_upload(strategy) != strategy:
+        print("{:<40} {:>10}".format(name, "unsupported"))
+        continue
+    for i in range(20):
+        frame()
+    uploads = np.zeros(frames)
+    start = time.perf_counter()
+    for i in range(frames):
+        frame()
+        nkGLFW3.glfw3_render_timings(ctypes.byref(convert), ctypes.byref(upload), ctypes.byref(draw))
+        uploads[i] = upload.value
+    elapsed = time.perf_counter() - start
+    print("{:<40} {:>10.1f} us upload (p95 {:.1f} us) {:>8.1f} frames/s".format(
+        name,
+        np.median(uploads) * 1e6,
+        np.percentile(uploads, 95) * 1e6,
+        frames / elapsed))
+
+glfw.glfwTerminate()
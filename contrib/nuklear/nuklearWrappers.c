@@ -58,3 +58,537 @@ nkWrapper_get_text_width(struct nk_context *ctx,
   float text_width = f->width(f->userdata, f->height, str, nk_strlen(str));
   return text_width + 3 * ctx->style.button.padding.x;
 }
+
+const struct nk_user_font*
+nkWrapper_text_width_font(struct nk_context *ctx,
+                          float *metrics)
+{
+  /* what nkWrapper_get_text_width depends on besides the string: the
+     current font, returned, and its height and the button padding,
+     stored in metrics[0] and metrics[1] */
+  metrics[0] = ctx->style.font->height;
+  metrics[1] = ctx->style.button.padding.x;
+  return ctx->style.font;
+}
+
+void
+nkWrapper_text_widths(struct nk_context *ctx,
+                      const char **strings,
+                      int count,
+                      float *widths)
+{
+  /* nkWrapper_get_text_width of every string */
+  const struct nk_user_font *f = ctx->style.font;
+  float padding = 3 * ctx->style.button.padding.x;
+  int i;
+  for (i = 0; i < count; ++i)
+    widths[i] = f->width(f->userdata, f->height, strings[i], nk_strlen(strings[i])) + padding;
+}
+
+int
+nkWrapper_tree_push_hash(struct nk_context *ctx,
+                         enum nk_tree_type type,
+                         const char *title,
+                         enum nk_collapse_states initial_state,
+                         nk_hash tree_hash)
+{
+  /* same as nk_tree_push_hashed, but with the hash precomputed by the caller */
+  struct nk_window *win = ctx->current;
+  nk_uint *state = nk_find_value(win, tree_hash);
+  if (!state) {
+    state = nk_add_value(ctx, win, tree_hash, 0);
+    *state = initial_state;
+  }
+  return nk_tree_state_base(ctx, type, 0, title, (enum nk_collapse_states*)state);
+}
+
+/* opcodes for nkWrapper_replay.  these must match the __op_*__ values
+   in nuklear.py */
+enum nkWrapper_opcode {
+  NKWRAPPER_OP_END = 1,
+  NKWRAPPER_OP_LAYOUT_ROW_DYNAMIC,
+  NKWRAPPER_OP_LAYOUT_ROW_STATIC,
+  NKWRAPPER_OP_LAYOUT_ROW_BEGIN,
+  NKWRAPPER_OP_LAYOUT_ROW_PUSH,
+  NKWRAPPER_OP_LAYOUT_ROW_END,
+  NKWRAPPER_OP_SPACING,
+  NKWRAPPER_OP_TEXT,
+  NKWRAPPER_OP_LABEL_COLORED,
+  NKWRAPPER_OP_LABEL_WRAP,
+  NKWRAPPER_OP_TOOLTIP,
+  NKWRAPPER_OP_TREE_POP,
+  NKWRAPPER_OP_MENUBAR_BEGIN,
+  NKWRAPPER_OP_MENUBAR_END,
+  NKWRAPPER_OP_MENU_END,
+  NKWRAPPER_OP_COMBO_END,
+  NKWRAPPER_OP_CONTEXTUAL_END,
+  NKWRAPPER_OP_POPUP_END,
+  NKWRAPPER_OP_BUTTON_SET_BEHAVIOR,
+  NKWRAPPER_OP_SET_STYLE_WINDOW_HEADER_ALIGN,
+  NKWRAPPER_OP_STYLE_PUSH_WINDOW_SPACING,
+  NKWRAPPER_OP_STYLE_PUSH_BUTTON_ROUNDING,
+  NKWRAPPER_OP_STYLE_POP_FONT,
+  NKWRAPPER_OP_STYLE_POP_FLOAT,
+  NKWRAPPER_OP_STYLE_POP_VEC2,
+  NKWRAPPER_OP_STYLE_POP_STYLE_ITEM,
+  NKWRAPPER_OP_STYLE_POP_FLAGS,
+  NKWRAPPER_OP_STYLE_POP_COLOR
+};
+
+/* the operands in the opcode buffer are packed without any
+   alignment, so they are copied out instead of dereferenced */
+NK_INTERN int
+nkWrapper_read_int(const char **ops)
+{
+  int i;
+  NK_MEMCPY(&i, *ops, sizeof(i));
+  *ops += sizeof(i);
+  return i;
+}
+
+NK_INTERN float
+nkWrapper_read_float(const char **ops)
+{
+  float f;
+  NK_MEMCPY(&f, *ops, sizeof(f));
+  *ops += sizeof(f);
+  return f;
+}
+
+/* strings are stored as their length, followed by their bytes and a
+   terminating zero */
+NK_INTERN const char*
+nkWrapper_read_string(const char **ops, int *len)
+{
+  const char *str;
+  *len = nkWrapper_read_int(ops);
+  str = *ops;
+  *ops += *len + 1;
+  return str;
+}
+
+void
+nkWrapper_replay(struct nk_context *ctx,
+                 const char *ops,
+                 int len)
+{
+  const char *end = ops + len;
+  while (ops < end) {
+    unsigned char op = (unsigned char)*ops++;
+    switch (op) {
+    case NKWRAPPER_OP_END:
+      nk_end(ctx);
+      break;
+    case NKWRAPPER_OP_LAYOUT_ROW_DYNAMIC: {
+      float height = nkWrapper_read_float(&ops);
+      int cols = nkWrapper_read_int(&ops);
+      nk_layout_row_dynamic(ctx, height, cols);
+    } break;
+    case NKWRAPPER_OP_LAYOUT_ROW_STATIC: {
+      float height = nkWrapper_read_float(&ops);
+      int item_width = nkWrapper_read_int(&ops);
+      int cols = nkWrapper_read_int(&ops);
+      nk_layout_row_static(ctx, height, item_width, cols);
+    } break;
+    case NKWRAPPER_OP_LAYOUT_ROW_BEGIN: {
+      int fmt = nkWrapper_read_int(&ops);
+      float height = nkWrapper_read_float(&ops);
+      int cols = nkWrapper_read_int(&ops);
+      nk_layout_row_begin(ctx, (enum nk_layout_format)fmt, height, cols);
+    } break;
+    case NKWRAPPER_OP_LAYOUT_ROW_PUSH:
+      nk_layout_row_push(ctx, nkWrapper_read_float(&ops));
+      break;
+    case NKWRAPPER_OP_LAYOUT_ROW_END:
+      nk_layout_row_end(ctx);
+      break;
+    case NKWRAPPER_OP_SPACING:
+      nk_spacing(ctx, nkWrapper_read_int(&ops));
+      break;
+    case NKWRAPPER_OP_TEXT: {
+      nk_flags align = (nk_flags)nkWrapper_read_int(&ops);
+      int text_len;
+      const char *text = nkWrapper_read_string(&ops, &text_len);
+      nk_text(ctx, text, text_len, align);
+    } break;
+    case NKWRAPPER_OP_LABEL_COLORED: {
+      nk_flags align = (nk_flags)nkWrapper_read_int(&ops);
+      struct nk_color color;
+      int text_len;
+      const char *text;
+      NK_MEMCPY(&color, ops, sizeof(color));
+      ops += sizeof(color);
+      text = nkWrapper_read_string(&ops, &text_len);
+      nk_text_colored(ctx, text, text_len, align, color);
+    } break;
+    case NKWRAPPER_OP_LABEL_WRAP: {
+      int text_len;
+      const char *text = nkWrapper_read_string(&ops, &text_len);
+      nk_text_wrap(ctx, text, text_len);
+    } break;
+    case NKWRAPPER_OP_TOOLTIP: {
+      int text_len;
+      const char *text = nkWrapper_read_string(&ops, &text_len);
+      nk_tooltip(ctx, text);
+    } break;
+    case NKWRAPPER_OP_TREE_POP:
+      nk_tree_pop(ctx);
+      break;
+    case NKWRAPPER_OP_MENUBAR_BEGIN:
+      nk_menubar_begin(ctx);
+      break;
+    case NKWRAPPER_OP_MENUBAR_END:
+      nk_menubar_end(ctx);
+      break;
+    case NKWRAPPER_OP_MENU_END:
+      nk_menu_end(ctx);
+      break;
+    case NKWRAPPER_OP_COMBO_END:
+      nk_combo_end(ctx);
+      break;
+    case NKWRAPPER_OP_CONTEXTUAL_END:
+      nk_contextual_end(ctx);
+      break;
+    case NKWRAPPER_OP_POPUP_END:
+      nk_popup_end(ctx);
+      break;
+    case NKWRAPPER_OP_BUTTON_SET_BEHAVIOR:
+      nk_button_set_behavior(ctx, (enum nk_button_behavior)nkWrapper_read_int(&ops));
+      break;
+    case NKWRAPPER_OP_SET_STYLE_WINDOW_HEADER_ALIGN:
+      nkWrapper_context_set_style_window_header_align(ctx,
+                                                      (enum nk_style_header_align)nkWrapper_read_int(&ops));
+      break;
+    case NKWRAPPER_OP_STYLE_PUSH_WINDOW_SPACING: {
+      struct nk_vec2 spacing;
+      spacing.x = nkWrapper_read_float(&ops);
+      spacing.y = nkWrapper_read_float(&ops);
+      nkWrapper_style_push_window_spacing(ctx, spacing);
+    } break;
+    case NKWRAPPER_OP_STYLE_PUSH_BUTTON_ROUNDING:
+      nkWrapper_style_push_button_rounding(ctx, nkWrapper_read_float(&ops));
+      break;
+    case NKWRAPPER_OP_STYLE_POP_FONT:
+      nk_style_pop_font(ctx);
+      break;
+    case NKWRAPPER_OP_STYLE_POP_FLOAT:
+      nk_style_pop_float(ctx);
+      break;
+    case NKWRAPPER_OP_STYLE_POP_VEC2:
+      nk_style_pop_vec2(ctx);
+      break;
+    case NKWRAPPER_OP_STYLE_POP_STYLE_ITEM:
+      nk_style_pop_style_item(ctx);
+      break;
+    case NKWRAPPER_OP_STYLE_POP_FLAGS:
+      nk_style_pop_flags(ctx);
+      break;
+    case NKWRAPPER_OP_STYLE_POP_COLOR:
+      nk_style_pop_color(ctx);
+      break;
+    default:
+      /* a corrupt buffer, there is no way to find the next opcode */
+      NK_ASSERT(0 && "unknown opcode");
+      return;
+    }
+  }
+}
+
+int
+nkWrapper_chart_push_slot_values(struct nk_context *ctx,
+                                 const float *values,
+                                 int count,
+                                 int slot,
+                                 int *clicked)
+{
+  /* push a whole array into a chart slot in one call.  returns the index
+     of the hovered value or -1, and stores the index of the clicked value
+     (or -1) into clicked */
+  int i;
+  int hovered = -1;
+  if (clicked) *clicked = -1;
+  for (i = 0; i < count; ++i) {
+    nk_flags res = nk_chart_push_slot(ctx, values[i], slot);
+    if (res & NK_CHART_HOVERING) hovered = i;
+    if (clicked && (res & NK_CHART_CLICKED)) *clicked = i;
+  }
+  return hovered;
+}
+
+int
+nkWrapper_property_grid(struct nk_context *ctx,
+                        void *values,
+                        int integer,
+                        int count,
+                        const char **labels,
+                        const float *ranges,
+                        float inc_per_pixel,
+                        unsigned char *changed)
+{
+  /* a property per element of values, which is an int array if integer
+     and a float array otherwise.  property i is named labels[i] and goes
+     from ranges[3 * i] to ranges[3 * i + 1] in steps of ranges[3 * i + 2],
+     and by inc_per_pixel, or the step if that is 0, per pixel dragged.
+     sets changed[i] to whether values[i] changed, and returns how many
+     did */
+  int i;
+  int changes = 0;
+  for (i = 0; i < count; ++i) {
+    const float *range = ranges + 3 * i;
+    float inc = inc_per_pixel > 0 ? inc_per_pixel : range[2];
+    if (integer) {
+      int *value = (int*)values + i;
+      int before = *value;
+      nk_property_int(ctx, labels[i], (int)range[0], value, (int)range[1], (int)range[2], inc);
+      changed[i] = *value != before;
+    } else {
+      float *value = (float*)values + i;
+      float before = *value;
+      nk_property_float(ctx, labels[i], range[0], value, range[1], range[2], inc);
+      changed[i] = *value != before;
+    }
+    changes += changed[i];
+  }
+  return changes;
+}
+
+/* one drawing command, flattened for nkWrapper_commands.  rect is the
+   bounds of the shape, except for lines and curves where it runs from
+   the begin point (x, y) to the end point (x + w, y + h).  text commands
+   store their string at text_offset in the text buffer. this must match
+   COMMAND in nuklear.py */
+struct nkWrapper_command {
+  int type;
+  float rect[4];
+  struct nk_color color;
+  float thickness;
+  float rounding;
+  int text_offset;
+  int text_length;
+};
+
+NK_INTERN void
+nkWrapper_command_bounds(struct nkWrapper_command *out,
+                         const struct nk_vec2i *points,
+                         int count)
+{
+  int i;
+  short x0 = points[0].x, y0 = points[0].y, x1 = x0, y1 = y0;
+  for (i = 1; i < count; ++i) {
+    x0 = NK_MIN(x0, points[i].x); y0 = NK_MIN(y0, points[i].y);
+    x1 = NK_MAX(x1, points[i].x); y1 = NK_MAX(y1, points[i].y);
+  }
+  out->rect[0] = x0; out->rect[1] = y0;
+  out->rect[2] = x1 - x0; out->rect[3] = y1 - y0;
+}
+
+NK_INTERN void
+nkWrapper_command_rect(struct nkWrapper_command *out,
+                       float x, float y, float w, float h)
+{
+  out->rect[0] = x; out->rect[1] = y;
+  out->rect[2] = w; out->rect[3] = h;
+}
+
+int
+nkWrapper_commands(struct nk_context *ctx,
+                   struct nkWrapper_command *commands,
+                   int max_commands,
+                   char *text,
+                   int max_text,
+                   int *text_used)
+{
+  /* walk the frame's command buffer with nk__begin/nk__next.  returns the
+     number of commands and stores the number of text bytes, even when they
+     don't fit, so the caller can grow its buffers and call again.
+     commands which don't fit are counted but not written */
+  const struct nk_command *cmd;
+  int count = 0;
+  int used = 0;
+  nk_foreach(cmd, ctx) {
+    struct nkWrapper_command c;
+    NK_MEMSET(&c, 0, sizeof(c));
+    c.type = cmd->type;
+    c.text_offset = -1;
+    switch (cmd->type) {
+    case NK_COMMAND_SCISSOR: {
+      const struct nk_command_scissor *s = (const struct nk_command_scissor*)cmd;
+      nkWrapper_command_rect(&c, s->x, s->y, s->w, s->h);
+    } break;
+    case NK_COMMAND_LINE: {
+      const struct nk_command_line *l = (const struct nk_command_line*)cmd;
+      nkWrapper_command_rect(&c, l->begin.x, l->begin.y,
+                             l->end.x - l->begin.x, l->end.y - l->begin.y);
+      c.color = l->color;
+      c.thickness = l->line_thickness;
+    } break;
+    case NK_COMMAND_CURVE: {
+      const struct nk_command_curve *q = (const struct nk_command_curve*)cmd;
+      nkWrapper_command_rect(&c, q->begin.x, q->begin.y,
+                             q->end.x - q->begin.x, q->end.y - q->begin.y);
+      c.color = q->color;
+      c.thickness = q->line_thickness;
+    } break;
+    case NK_COMMAND_RECT: {
+      const struct nk_command_rect *r = (const struct nk_command_rect*)cmd;
+      nkWrapper_command_rect(&c, r->x, r->y, r->w, r->h);
+      c.color = r->color;
+      c.thickness = r->line_thickness;
+      c.rounding = r->rounding;
+    } break;
+    case NK_COMMAND_RECT_FILLED: {
+      const struct nk_command_rect_filled *r = (const struct nk_command_rect_filled*)cmd;
+      nkWrapper_command_rect(&c, r->x, r->y, r->w, r->h);
+      c.color = r->color;
+      c.rounding = r->rounding;
+    } break;
+    case NK_COMMAND_RECT_MULTI_COLOR: {
+      const struct nk_command_rect_multi_color *r = (const struct nk_command_rect_multi_color*)cmd;
+      nkWrapper_command_rect(&c, r->x, r->y, r->w, r->h);
+      c.color = r->left;
+    } break;
+    case NK_COMMAND_CIRCLE: {
+      const struct nk_command_circle *o = (const struct nk_command_circle*)cmd;
+      nkWrapper_command_rect(&c, o->x, o->y, o->w, o->h);
+      c.color = o->color;
+      c.thickness = o->line_thickness;
+    } break;
+    case NK_COMMAND_CIRCLE_FILLED: {
+      const struct nk_command_circle_filled *o = (const struct nk_command_circle_filled*)cmd;
+      nkWrapper_command_rect(&c, o->x, o->y, o->w, o->h);
+      c.color = o->color;
+    } break;
+    case NK_COMMAND_ARC: {
+      const struct nk_command_arc *a = (const struct nk_command_arc*)cmd;
+      nkWrapper_command_rect(&c, a->cx - a->r, a->cy - a->r, 2 * a->r, 2 * a->r);
+      c.color = a->color;
+      c.thickness = a->line_thickness;
+    } break;
+    case NK_COMMAND_ARC_FILLED: {
+      const struct nk_command_arc_filled *a = (const struct nk_command_arc_filled*)cmd;
+      nkWrapper_command_rect(&c, a->cx - a->r, a->cy - a->r, 2 * a->r, 2 * a->r);
+      c.color = a->color;
+    } break;
+    case NK_COMMAND_TRIANGLE: {
+      const struct nk_command_triangle *t = (const struct nk_command_triangle*)cmd;
+      struct nk_vec2i points[3];
+      points[0] = t->a; points[1] = t->b; points[2] = t->c;
+      nkWrapper_command_bounds(&c, points, 3);
+      c.color = t->color;
+      c.thickness = t->line_thickness;
+    } break;
+    case NK_COMMAND_TRIANGLE_FILLED: {
+      const struct nk_command_triangle_filled *t = (const struct nk_command_triangle_filled*)cmd;
+      struct nk_vec2i points[3];
+      points[0] = t->a; points[1] = t->b; points[2] = t->c;
+      nkWrapper_command_bounds(&c, points, 3);
+      c.color = t->color;
+    } break;
+    case NK_COMMAND_POLYGON: {
+      const struct nk_command_polygon *p = (const struct nk_command_polygon*)cmd;
+      nkWrapper_command_bounds(&c, p->points, p->point_count);
+      c.color = p->color;
+      c.thickness = p->line_thickness;
+    } break;
+    case NK_COMMAND_POLYGON_FILLED: {
+      const struct nk_command_polygon_filled *p = (const struct nk_command_polygon_filled*)cmd;
+      nkWrapper_command_bounds(&c, p->points, p->point_count);
+      c.color = p->color;
+    } break;
+    case NK_COMMAND_POLYLINE: {
+      const struct nk_command_polyline *p = (const struct nk_command_polyline*)cmd;
+      nkWrapper_command_bounds(&c, p->points, p->point_count);
+      c.color = p->color;
+      c.thickness = p->line_thickness;
+    } break;
+    case NK_COMMAND_TEXT: {
+      const struct nk_command_text *t = (const struct nk_command_text*)cmd;
+      nkWrapper_command_rect(&c, t->x, t->y, t->w, t->h);
+      c.color = t->foreground;
+      c.text_offset = used;
+      c.text_length = t->length;
+      if (used + t->length <= max_text)
+        NK_MEMCPY(text + used, t->string, (nk_size)t->length);
+      used += t->length;
+    } break;
+    case NK_COMMAND_IMAGE: {
+      const struct nk_command_image *i = (const struct nk_command_image*)cmd;
+      nkWrapper_command_rect(&c, i->x, i->y, i->w, i->h);
+      c.color = i->col;
+    } break;
+    case NK_COMMAND_CUSTOM: {
+      const struct nk_command_custom *u = (const struct nk_command_custom*)cmd;
+      nkWrapper_command_rect(&c, u->x, u->y, u->w, u->h);
+    } break;
+    default:
+      break;
+    }
+    if (count < max_commands)
+      commands[count] = c;
+    count++;
+  }
+  *text_used = used;
+  return count;
+}
+
+/* one draw command of nkWrapper_convert, texture is the handle's id.
+   this must match DRAW_COMMAND in nuklear.py */
+struct nkWrapper_draw_command {
+  float clip_rect[4];
+  unsigned int elem_count;
+  int texture;
+};
+
+nk_flags
+nkWrapper_convert(struct nk_context *ctx,
+                  const struct nk_convert_config *config,
+                  void *vertices,
+                  int vertices_size,
+                  void *elements,
+                  int elements_size,
+                  struct nkWrapper_draw_command *commands,
+                  int max_commands,
+                  int *vertices_needed,
+                  int *elements_needed,
+                  int *command_count)
+{
+  /* nk_convert into caller owned vertex and element memory, of
+     vertices_size and elements_size bytes, and flatten the draw commands
+     into an array.  the number of bytes and commands needed is stored
+     even when they don't fit, so the caller can grow its buffers and
+     convert again.  the frame is not cleared, but the draw list is reset
+     before and after, so converting again works and nothing points into
+     this function's buffers afterwards */
+  struct nk_buffer cmds, vbuf, ebuf;
+  const struct nk_draw_command *cmd;
+  nk_flags result;
+  int count = 0;
+
+  nk_draw_list_clear(&ctx->draw_list);
+  nk_buffer_init_default(&cmds);
+  nk_buffer_init_fixed(&vbuf, vertices, (nk_size)vertices_size);
+  nk_buffer_init_fixed(&ebuf, elements, (nk_size)elements_size);
+  result = nk_convert(ctx, &cmds, &vbuf, &ebuf, config);
+
+  nk_draw_foreach(cmd, ctx, &cmds) {
+    if (!cmd->elem_count) continue;
+    if (count < max_commands) {
+      commands[count].clip_rect[0] = cmd->clip_rect.x;
+      commands[count].clip_rect[1] = cmd->clip_rect.y;
+      commands[count].clip_rect[2] = cmd->clip_rect.w;
+      commands[count].clip_rect[3] = cmd->clip_rect.h;
+      commands[count].elem_count = cmd->elem_count;
+      commands[count].texture = cmd->texture.id;
+    } else {
+      result |= NK_CONVERT_COMMAND_BUFFER_FULL;
+    }
+    count++;
+  }
+  *vertices_needed = (int)vbuf.needed;
+  *elements_needed = (int)ebuf.needed;
+  *command_count = count;
+  nk_draw_list_clear(&ctx->draw_list);
+  ctx->draw_list.buffer = 0;
+  nk_buffer_free(&cmds);
+  return result;
+}
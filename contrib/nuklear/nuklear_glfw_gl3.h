@@ -20,12 +20,39 @@ enum nk_glfw_init_state{
     NK_GLFW3_INSTALL_CALLBACKS
 };
 
+/* how nk_glfw3_render streams each frame's vertices and elements */
+enum nk_glfw_upload {
+    NK_GLFW3_UPLOAD_ORPHAN=0,   /* glBufferData(NULL) and glMapBuffer every frame */
+    NK_GLFW3_UPLOAD_RING,       /* unsynchronized glMapBufferRange of a ring of fenced sections */
+    NK_GLFW3_UPLOAD_PERSISTENT  /* a ring which stays mapped, needs GL 4.4 or ARB_buffer_storage */
+};
+
+/* every nk_glfw3_* function works on the current backend.  there is a
+   default one, so a program with a single window needn't know about
+   backends; for more windows, create a backend for each and make it
+   current, together with its window's GL context, before using it */
+struct nk_glfw;
+NK_API struct nk_glfw*      nk_glfw3_create(void);
+NK_API void                 nk_glfw3_make_current(struct nk_glfw*);
+NK_API void                 nk_glfw3_destroy(struct nk_glfw*);
+
 NK_API struct nk_context*   nk_glfw3_init(GLFWwindow *win, enum nk_glfw_init_state);
 NK_API void                 nk_glfw3_shutdown(void);
 NK_API void                 nk_glfw3_font_stash_begin(struct nk_font_atlas **atlas);
 NK_API void                 nk_glfw3_font_stash_end(void);
+NK_API void                 nk_glfw3_font_stash_share(const struct nk_glfw *source);
 NK_API void                 nk_glfw3_new_frame(void);
 NK_API void                 nk_glfw3_render(enum nk_anti_aliasing, int max_vertex_buffer, int max_element_buffer);
+NK_API int                  nk_glfw3_frame_changed(void);
+NK_API void                 nk_glfw3_render_timings(double *convert, double *upload, double *draw);
+NK_API void                 nk_glfw3_render_stats(int *vertices, int *elements, int *draw_commands, int *convert_result);
+NK_API void                 nk_glfw3_null_texture(struct nk_draw_null_texture *null);
+NK_API void                 nk_glfw3_buffer_stats(int *vertex_capacity, int *element_capacity, int *vertex_high_water, int *element_high_water);
+NK_API int                  nk_glfw3_set_upload(enum nk_glfw_upload);
+NK_API void                 nk_glfw3_set_tessellation(int line_AA, int shape_AA, unsigned circle_segments, unsigned arc_segments, unsigned curve_segments, float lod_tolerance);
+NK_API int                  nk_glfw3_set_pipelined(int pipelined);
+NK_API int                  nk_glfw3_render_pending(void);
+NK_API void                 nk_glfw3_render_flush(void);
 
 NK_API void                 nk_glfw3_device_destroy(void);
 NK_API void                 nk_glfw3_device_create(void);
@@ -44,6 +71,8 @@ NK_API void                 nk_glfw3_mouse_button_callback(GLFWwindow *win, int
  */
 #ifdef NK_GLFW_GL3_IMPLEMENTATION
 
+#include <pthread.h>
+
 #ifndef NK_GLFW_TEXT_MAX
 #define NK_GLFW_TEXT_MAX 256
 #endif
@@ -53,6 +82,24 @@ NK_API void                 nk_glfw3_mouse_button_callback(GLFWwindow *win, int
 #ifndef NK_GLFW_DOUBLE_CLICK_HI
 #define NK_GLFW_DOUBLE_CLICK_HI 0.2
 #endif
+#ifndef NK_GLFW_BUFFER_MAX
+#define NK_GLFW_BUFFER_MAX (64 * 1024 * 1024)
+#endif
+#ifndef NK_GLFW_SHRINK_FRAMES
+#define NK_GLFW_SHRINK_FRAMES 300
+#endif
+#ifndef NK_GLFW_RING_FRAMES
+#define NK_GLFW_RING_FRAMES 3
+#endif
+#ifndef NK_GLFW_SEGMENTS
+#define NK_GLFW_SEGMENTS 22
+#endif
+#ifndef NK_GLFW_LOD_MIN_SEGMENTS
+#define NK_GLFW_LOD_MIN_SEGMENTS 6
+#endif
+#ifndef NK_GLFW_FENCE_TIMEOUT
+#define NK_GLFW_FENCE_TIMEOUT 1000000000 /* nanoseconds */
+#endif
 
 struct nk_glfw_device {
     struct nk_buffer cmds;
@@ -75,7 +122,27 @@ struct nk_glfw_vertex {
     nk_byte col[4];
 };
 
-static struct nk_glfw {
+/* a frame on its way through the pipeline, see nk_glfw3_set_pipelined.
+   ctx stands in for the real context for nk_convert only: its memory is
+   a copy of the frame's command buffer, which its one window spans */
+struct nk_glfw_frame {
+    struct nk_context ctx;
+    struct nk_window window;
+    void *commands;
+    nk_size commands_capacity;
+    struct nk_convert_config config;
+    struct nk_buffer cmds;
+    void *vertices;
+    void *elements;
+    nk_size vertex_capacity;
+    nk_size element_capacity;
+    nk_size vertices_needed;
+    nk_size elements_needed;
+    nk_flags convert_result;
+    double convert_time;
+};
+
+struct nk_glfw {
     GLFWwindow *win;
     int width, height;
     int display_width, display_height;
@@ -89,7 +156,93 @@ static struct nk_glfw {
     double last_button_click;
     int is_double_click_down;
     struct nk_vec2 double_click_pos;
-} glfw;
+    /* idle frame detection, see nk_glfw3_frame_changed */
+    int input_arrived;
+    int track_changes;
+    void *last_cmds;
+    nk_size last_cmds_size;
+    nk_size last_cmds_capacity;
+    nk_hash last_window_order;
+    /* seconds spent in each part of the last nk_glfw3_render */
+    double convert_time;
+    double upload_time;
+    double draw_time;
+    /* what nk_convert produced in the last nk_glfw3_render */
+    int vertex_count;
+    int element_count;
+    int draw_command_count;
+    nk_flags convert_result;
+    /* sizes in bytes of the vertex and element buffers, which grow when a
+       frame doesn't fit and shrink again after NK_GLFW_SHRINK_FRAMES
+       frames which used a quarter of them or less */
+    nk_size vertex_capacity;
+    nk_size element_capacity;
+    nk_size min_vertex_buffer;
+    nk_size min_element_buffer;
+    nk_size vertex_high_water;
+    nk_size element_high_water;
+    nk_size vertex_peak;
+    nk_size element_peak;
+    int peak_frames;
+    /* the ring and persistent uploads split the GL buffers into
+       NK_GLFW_RING_FRAMES sections of the capacities above, and write each
+       frame into the next section once the GPU is done drawing from it */
+    enum nk_glfw_upload upload;
+    nk_size section_vertex_size;
+    nk_size section_element_size;
+    int section;
+    GLsync fences[NK_GLFW_RING_FRAMES];
+    void *persistent_vertices;
+    void *persistent_elements;
+    nk_size vertex_offset;
+    nk_size element_offset;
+    /* see nk_glfw3_set_tessellation */
+    int tessellation_set;
+    int line_AA;
+    int shape_AA;
+    unsigned circle_segment_count;
+    unsigned arc_segment_count;
+    unsigned curve_segment_count;
+    float lod_tolerance;
+    /* see nk_glfw3_set_pipelined.  the worker converts pipeline_job while
+       it is set; pipeline_queued is the index of the frame last handed
+       to it, -1 before the first, and pipeline_flushed is set when
+       nk_glfw3_render_flush has drawn that frame */
+    int pipelined;
+    pthread_t pipeline_worker;
+    pthread_mutex_t pipeline_lock;
+    pthread_cond_t pipeline_posted;
+    pthread_cond_t pipeline_done;
+    struct nk_glfw_frame *pipeline_job;
+    int pipeline_quit;
+    int pipeline_queued;
+    int pipeline_drawn;
+    int pipeline_flushed;
+    struct nk_glfw_frame pipeline_frames[2];
+    /* the framebuffer size and window count of the frame last handed to
+       the worker, see nk_glfw3_pipeline_stale */
+    int pipeline_width, pipeline_height;
+    nk_uint pipeline_windows;
+    /* the font texture belongs to another backend, see
+       nk_glfw3_font_stash_share */
+    int shared_font;
+    struct nk_glfw *next;
+};
+
+static struct nk_glfw nk_glfw_default;
+/* the backend nk_glfw3_* work on, see nk_glfw3_make_current */
+static struct nk_glfw *glfw = &nk_glfw_default;
+/* every initialized backend, GLFW's callbacks go to the one of their window */
+static struct nk_glfw *nk_glfw_backends;
+
+NK_INTERN struct nk_glfw*
+nk_glfw3_backend(GLFWwindow *win)
+{
+    struct nk_glfw *it;
+    for (it = nk_glfw_backends; it; it = it->next)
+        if (it->win == win) return it;
+    return glfw;
+}
 
 #ifdef __APPLE__
   #define NK_SHADER_VERSION "#version 150\n"
@@ -125,7 +278,7 @@ nk_glfw3_device_create(void)
         "   Out_Color = Frag_Color * texture(Texture, Frag_UV.st);\n"
         "}\n";
 
-    struct nk_glfw_device *dev = &glfw.ogl;
+    struct nk_glfw_device *dev = &glfw->ogl;
     nk_buffer_init_default(&dev->cmds);
     dev->prog = glCreateProgram();
     dev->vert_shdr = glCreateShader(GL_VERTEX_SHADER);
@@ -183,7 +336,7 @@ nk_glfw3_device_create(void)
 NK_INTERN void
 nk_glfw3_device_upload_atlas(const void *image, int width, int height)
 {
-    struct nk_glfw_device *dev = &glfw.ogl;
+    struct nk_glfw_device *dev = &glfw->ogl;
     glGenTextures(1, &dev->font_tex);
     glBindTexture(GL_TEXTURE_2D, dev->font_tex);
     glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR);
@@ -192,34 +345,370 @@ nk_glfw3_device_upload_atlas(const void *image, int width, int height)
                 GL_RGBA, GL_UNSIGNED_BYTE, image);
 }
 
+/* delete the fences and the vertex and element buffers, which are
+   replaced by new, empty ones.  buffers made with glBufferStorage can't be
+   resized, so the ring and persistent uploads start over this way when
+   the capacities change */
+NK_INTERN void
+nk_glfw3_release_buffers(void)
+{
+    struct nk_glfw_device *dev = &glfw->ogl;
+    int i;
+    for (i = 0; i < NK_GLFW_RING_FRAMES; ++i) {
+        if (glfw->fences[i])
+            glDeleteSync(glfw->fences[i]);
+        glfw->fences[i] = 0;
+    }
+    glDeleteBuffers(1, &dev->vbo);
+    glDeleteBuffers(1, &dev->ebo);
+    glGenBuffers(1, &dev->vbo);
+    glGenBuffers(1, &dev->ebo);
+    glfw->persistent_vertices = 0;
+    glfw->persistent_elements = 0;
+    glfw->section_vertex_size = 0;
+    glfw->section_element_size = 0;
+    glfw->section = 0;
+}
+
 NK_API void
 nk_glfw3_device_destroy(void)
 {
-    struct nk_glfw_device *dev = &glfw.ogl;
+    struct nk_glfw_device *dev = &glfw->ogl;
     glDetachShader(dev->prog, dev->vert_shdr);
     glDetachShader(dev->prog, dev->frag_shdr);
     glDeleteShader(dev->vert_shdr);
     glDeleteShader(dev->frag_shdr);
     glDeleteProgram(dev->prog);
-    glDeleteTextures(1, &dev->font_tex);
+    if (!glfw->shared_font)
+        glDeleteTextures(1, &dev->font_tex);
+    nk_glfw3_release_buffers();
     glDeleteBuffers(1, &dev->vbo);
     glDeleteBuffers(1, &dev->ebo);
     nk_buffer_free(&dev->cmds);
 }
 
-NK_API void
-nk_glfw3_render(enum nk_anti_aliasing AA, int max_vertex_buffer, int max_element_buffer)
+NK_INTERN nk_hash
+nk_glfw3_window_order(const struct nk_context *ctx)
 {
-    struct nk_glfw_device *dev = &glfw.ogl;
-    struct nk_buffer vbuf, ebuf;
+    /* nk_convert draws the windows in list order, which is not part of
+       the command buffer itself */
+    const struct nk_window *win;
+    nk_hash hash = 0;
+    for (win = ctx->begin; win; win = win->next) {
+        hash = nk_murmur_hash(&win->buffer.begin, (int)sizeof(win->buffer.begin), hash);
+        hash = nk_murmur_hash(&win->buffer.end, (int)sizeof(win->buffer.end), hash);
+        hash = nk_murmur_hash(&win->flags, (int)sizeof(win->flags), hash);
+    }
+    return hash;
+}
+
+NK_INTERN void
+nk_glfw3_snapshot_commands(void)
+{
+    const struct nk_buffer *cmds = &glfw->ctx.memory;
+    if (cmds->allocated > glfw->last_cmds_capacity) {
+        void *grown = realloc(glfw->last_cmds, cmds->allocated);
+        if (!grown) {
+            /* without a snapshot every frame counts as changed */
+            free(glfw->last_cmds);
+            glfw->last_cmds = 0;
+            glfw->last_cmds_capacity = 0;
+            glfw->last_cmds_size = 0;
+            return;
+        }
+        glfw->last_cmds = grown;
+        glfw->last_cmds_capacity = cmds->allocated;
+    }
+    if (cmds->allocated)
+        memcpy(glfw->last_cmds, cmds->memory.ptr, cmds->allocated);
+    glfw->last_cmds_size = cmds->allocated;
+    glfw->last_window_order = nk_glfw3_window_order(&glfw->ctx);
+}
+
+/* returns whether the frame which was just built would draw anything
+   different from the last frame nk_glfw3_render drew, or whether input
+   arrived since then.  if it returns false, the caller can skip
+   clearing, rendering and swapping buffers, and keep showing the last
+   frame, but it must still nk_clear the context.  the first call turns
+   on taking a copy of the command buffer on every render. */
+NK_API int
+nk_glfw3_frame_changed(void)
+{
+    const struct nk_buffer *cmds = &glfw->ctx.memory;
+    glfw->track_changes = nk_true;
+    if (glfw->input_arrived || !glfw->last_cmds)
+        return nk_true;
+    if (glfw->last_cmds_size != cmds->allocated)
+        return nk_true;
+    if (glfw->last_window_order != nk_glfw3_window_order(&glfw->ctx))
+        return nk_true;
+    return memcmp(glfw->last_cmds, cmds->memory.ptr, cmds->allocated) != 0;
+}
+
+/* the capacity to retry a frame with, after needed bytes didn't fit.
+   capacity is 0 when a render asked for empty buffers */
+NK_INTERN nk_size
+nk_glfw3_buffer_grow(nk_size capacity, nk_size needed)
+{
+    capacity = NK_MAX(capacity, 1) * 2;
+    while (capacity < needed)
+        capacity *= 2;
+    return NK_MIN(capacity, NK_GLFW_BUFFER_MAX);
+}
+
+/* halve the capacity while peak bytes would use a quarter of it or less */
+NK_INTERN nk_size
+nk_glfw3_buffer_shrink(nk_size capacity, nk_size peak, nk_size minimum)
+{
+    while (capacity / 2 >= minimum && peak * 4 <= capacity)
+        capacity /= 2;
+    return capacity;
+}
+
+/* point the vertex attributes at the vertices starting offset bytes into
+   the vertex buffer, which is bound to GL_ARRAY_BUFFER */
+NK_INTERN void
+nk_glfw3_vertex_pointers(nk_size offset)
+{
+    struct nk_glfw_device *dev = &glfw->ogl;
+    GLsizei vs = sizeof(struct nk_glfw_vertex);
+    size_t vp = offset + offsetof(struct nk_glfw_vertex, position);
+    size_t vt = offset + offsetof(struct nk_glfw_vertex, uv);
+    size_t vc = offset + offsetof(struct nk_glfw_vertex, col);
+    glVertexAttribPointer((GLuint)dev->attrib_pos, 2, GL_FLOAT, GL_FALSE, vs, (void*)vp);
+    glVertexAttribPointer((GLuint)dev->attrib_uv, 2, GL_FLOAT, GL_FALSE, vs, (void*)vt);
+    glVertexAttribPointer((GLuint)dev->attrib_col, 4, GL_UNSIGNED_BYTE, GL_TRUE, vs, (void*)vc);
+}
+
+/* get memory to convert a frame into, of the current capacities, in the
+   bound vertex and element buffers.  for the ring and persistent uploads
+   this is the next section, after waiting for the GPU to finish drawing
+   the frame that was last written there */
+NK_INTERN void
+nk_glfw3_map_buffers(void **vertices, void **elements)
+{
+    struct nk_glfw_device *dev = &glfw->ogl;
+    nk_size vsize = glfw->vertex_capacity, esize = glfw->element_capacity;
+    GLsync *fence;
+
+    if (glfw->upload == NK_GLFW3_UPLOAD_ORPHAN) {
+        glBufferData(GL_ARRAY_BUFFER, (GLsizeiptr)vsize, NULL, GL_STREAM_DRAW);
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, (GLsizeiptr)esize, NULL, GL_STREAM_DRAW);
+        *vertices = glMapBuffer(GL_ARRAY_BUFFER, GL_WRITE_ONLY);
+        *elements = glMapBuffer(GL_ELEMENT_ARRAY_BUFFER, GL_WRITE_ONLY);
+        glfw->vertex_offset = 0;
+        glfw->element_offset = 0;
+        return;
+    }
+
+    if (glfw->section_vertex_size != vsize || glfw->section_element_size != esize) {
+        nk_glfw3_release_buffers();
+        glBindBuffer(GL_ARRAY_BUFFER, dev->vbo);
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, dev->ebo);
+        if (glfw->upload == NK_GLFW3_UPLOAD_PERSISTENT) {
+            GLbitfield flags = GL_MAP_WRITE_BIT | GL_MAP_PERSISTENT_BIT | GL_MAP_COHERENT_BIT;
+            glBufferStorage(GL_ARRAY_BUFFER, (GLsizeiptr)(vsize * NK_GLFW_RING_FRAMES), NULL, flags);
+            glBufferStorage(GL_ELEMENT_ARRAY_BUFFER, (GLsizeiptr)(esize * NK_GLFW_RING_FRAMES), NULL, flags);
+            glfw->persistent_vertices = glMapBufferRange(GL_ARRAY_BUFFER, 0,
+                (GLsizeiptr)(vsize * NK_GLFW_RING_FRAMES), flags);
+            glfw->persistent_elements = glMapBufferRange(GL_ELEMENT_ARRAY_BUFFER, 0,
+                (GLsizeiptr)(esize * NK_GLFW_RING_FRAMES), flags);
+        } else {
+            glBufferData(GL_ARRAY_BUFFER, (GLsizeiptr)(vsize * NK_GLFW_RING_FRAMES), NULL, GL_STREAM_DRAW);
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, (GLsizeiptr)(esize * NK_GLFW_RING_FRAMES), NULL, GL_STREAM_DRAW);
+        }
+        glfw->section_vertex_size = vsize;
+        glfw->section_element_size = esize;
+    }
+
+    fence = &glfw->fences[glfw->section];
+    if (*fence) {
+        glClientWaitSync(*fence, GL_SYNC_FLUSH_COMMANDS_BIT, NK_GLFW_FENCE_TIMEOUT);
+        glDeleteSync(*fence);
+        *fence = 0;
+    }
+    glfw->vertex_offset = (nk_size)glfw->section * vsize;
+    glfw->element_offset = (nk_size)glfw->section * esize;
+    if (glfw->upload == NK_GLFW3_UPLOAD_PERSISTENT) {
+        *vertices = (nk_byte*)glfw->persistent_vertices + glfw->vertex_offset;
+        *elements = (nk_byte*)glfw->persistent_elements + glfw->element_offset;
+    } else {
+        /* the fence says the GPU is done with this section, so the driver
+           needn't synchronize, and the old contents needn't be kept */
+        GLbitfield access = GL_MAP_WRITE_BIT | GL_MAP_UNSYNCHRONIZED_BIT | GL_MAP_INVALIDATE_RANGE_BIT;
+        *vertices = glMapBufferRange(GL_ARRAY_BUFFER, (GLintptr)glfw->vertex_offset, (GLsizeiptr)vsize, access);
+        *elements = glMapBufferRange(GL_ELEMENT_ARRAY_BUFFER, (GLintptr)glfw->element_offset, (GLsizeiptr)esize, access);
+    }
+}
+
+NK_INTERN void
+nk_glfw3_unmap_buffers(void)
+{
+    if (glfw->upload == NK_GLFW3_UPLOAD_PERSISTENT)
+        return;
+    glUnmapBuffer(GL_ARRAY_BUFFER);
+    glUnmapBuffer(GL_ELEMENT_ARRAY_BUFFER);
+}
+
+/* segments, rounded up, limited to between NK_GLFW_LOD_MIN_SEGMENTS and
+   most */
+NK_INTERN unsigned
+nk_glfw3_lod_segments(float segments, unsigned most)
+{
+    unsigned count = (unsigned)segments + 1;
+    count = NK_MAX(count, NK_GLFW_LOD_MIN_SEGMENTS);
+    return NK_MIN(count, most);
+}
+
+/* lower the circle, arc and curve segment counts of config to the fewest
+   that keep the largest circle, arc and curve of this frame within
+   tolerance pixels of the true shape.  a circle of radius r needs about
+   pi * sqrt(r / (2 * tolerance)) segments, a curve about
+   sqrt(0.75 * d / tolerance), where d is the longer of the second
+   differences of its control points (Wang's formula).  the counts in
+   config are the most that are used */
+NK_INTERN void
+nk_glfw3_tessellation_lod(struct nk_convert_config *config, float tolerance)
+{
+    const struct nk_command *cmd;
+    float circle = 0, arc = 0, curve = 0;
+    nk_foreach(cmd, &glfw->ctx) {
+        switch (cmd->type) {
+        case NK_COMMAND_CIRCLE: {
+            const struct nk_command_circle *c = (const struct nk_command_circle*)cmd;
+            circle = NK_MAX(circle, NK_PI * nk_sqrt((float)c->w / (4.0f * tolerance)));
+        } break;
+        case NK_COMMAND_CIRCLE_FILLED: {
+            const struct nk_command_circle_filled *c = (const struct nk_command_circle_filled*)cmd;
+            circle = NK_MAX(circle, NK_PI * nk_sqrt((float)c->w / (4.0f * tolerance)));
+        } break;
+        case NK_COMMAND_ARC: {
+            const struct nk_command_arc *c = (const struct nk_command_arc*)cmd;
+            float span = NK_ABS(c->a[1] - c->a[0]);
+            arc = NK_MAX(arc, 0.5f * span * nk_sqrt((float)c->r / (2.0f * tolerance)));
+        } break;
+        case NK_COMMAND_ARC_FILLED: {
+            const struct nk_command_arc_filled *c = (const struct nk_command_arc_filled*)cmd;
+            float span = NK_ABS(c->a[1] - c->a[0]);
+            arc = NK_MAX(arc, 0.5f * span * nk_sqrt((float)c->r / (2.0f * tolerance)));
+        } break;
+        case NK_COMMAND_CURVE: {
+            const struct nk_command_curve *q = (const struct nk_command_curve*)cmd;
+            float x0 = (float)(q->begin.x - 2 * q->ctrl[0].x + q->ctrl[1].x);
+            float y0 = (float)(q->begin.y - 2 * q->ctrl[0].y + q->ctrl[1].y);
+            float x1 = (float)(q->ctrl[0].x - 2 * q->ctrl[1].x + q->end.x);
+            float y1 = (float)(q->ctrl[0].y - 2 * q->ctrl[1].y + q->end.y);
+            float d = nk_sqrt(NK_MAX(x0 * x0 + y0 * y0, x1 * x1 + y1 * y1));
+            curve = NK_MAX(curve, nk_sqrt(0.75f * d / tolerance));
+        } break;
+        default: break;
+        }
+    }
+    config->circle_segment_count = nk_glfw3_lod_segments(circle, config->circle_segment_count);
+    config->arc_segment_count = nk_glfw3_lod_segments(arc, config->arc_segment_count);
+    config->curve_segment_count = nk_glfw3_lod_segments(curve, config->curve_segment_count);
+}
+
+NK_INTERN void
+nk_glfw3_convert_config(struct nk_convert_config *config, enum nk_anti_aliasing AA)
+{
+    static const struct nk_draw_vertex_layout_element vertex_layout[] = {
+        {NK_VERTEX_POSITION, NK_FORMAT_FLOAT, NK_OFFSETOF(struct nk_glfw_vertex, position)},
+        {NK_VERTEX_TEXCOORD, NK_FORMAT_FLOAT, NK_OFFSETOF(struct nk_glfw_vertex, uv)},
+        {NK_VERTEX_COLOR, NK_FORMAT_R8G8B8A8, NK_OFFSETOF(struct nk_glfw_vertex, col)},
+        {NK_VERTEX_LAYOUT_END}
+    };
+    NK_MEMSET(config, 0, sizeof(*config));
+    config->vertex_layout = vertex_layout;
+    config->vertex_size = sizeof(struct nk_glfw_vertex);
+    config->vertex_alignment = NK_ALIGNOF(struct nk_glfw_vertex);
+    config->null = glfw->ogl.null;
+    config->circle_segment_count = NK_GLFW_SEGMENTS;
+    config->curve_segment_count = NK_GLFW_SEGMENTS;
+    config->arc_segment_count = NK_GLFW_SEGMENTS;
+    config->global_alpha = 1.0f;
+    config->shape_AA = AA;
+    config->line_AA = AA;
+    if (glfw->tessellation_set) {
+        if (glfw->line_AA >= 0) config->line_AA = (enum nk_anti_aliasing)glfw->line_AA;
+        if (glfw->shape_AA >= 0) config->shape_AA = (enum nk_anti_aliasing)glfw->shape_AA;
+        if (glfw->circle_segment_count) config->circle_segment_count = glfw->circle_segment_count;
+        if (glfw->arc_segment_count) config->arc_segment_count = glfw->arc_segment_count;
+        if (glfw->curve_segment_count) config->curve_segment_count = glfw->curve_segment_count;
+        if (glfw->lod_tolerance > 0)
+            nk_glfw3_tessellation_lod(config, glfw->lod_tolerance);
+    }
+}
+
+/* account for a frame which needed vertices and elements bytes, and
+   shrink the buffers every NK_GLFW_SHRINK_FRAMES frames */
+NK_INTERN void
+nk_glfw3_track_usage(nk_size vertices, nk_size elements)
+{
+    glfw->vertex_high_water = NK_MAX(glfw->vertex_high_water, vertices);
+    glfw->element_high_water = NK_MAX(glfw->element_high_water, elements);
+    glfw->vertex_peak = NK_MAX(glfw->vertex_peak, vertices);
+    glfw->element_peak = NK_MAX(glfw->element_peak, elements);
+    if (++glfw->peak_frames >= NK_GLFW_SHRINK_FRAMES) {
+        glfw->vertex_capacity = nk_glfw3_buffer_shrink(glfw->vertex_capacity,
+            glfw->vertex_peak, glfw->min_vertex_buffer);
+        glfw->element_capacity = nk_glfw3_buffer_shrink(glfw->element_capacity,
+            glfw->element_peak, glfw->min_element_buffer);
+        glfw->vertex_peak = 0;
+        glfw->element_peak = 0;
+        glfw->peak_frames = 0;
+    }
+}
+
+/* draw a converted frame from the bound vertex array, whose vertices and
+   elements were written at vertex_offset and element_offset */
+NK_INTERN void
+nk_glfw3_draw(const struct nk_context *ctx, const struct nk_buffer *cmds)
+{
+    struct nk_glfw_device *dev = &glfw->ogl;
+    const struct nk_draw_command *cmd;
+    const nk_draw_index *offset = NULL;
+
+    /* the buffers may have been replaced, and ring sections start
+       part way into them */
+    glBindBuffer(GL_ARRAY_BUFFER, dev->vbo);
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, dev->ebo);
+    nk_glfw3_vertex_pointers(glfw->vertex_offset);
+    offset = (const nk_draw_index*)glfw->element_offset;
+
+    /* iterate over and execute each draw command */
+    glfw->draw_command_count = 0;
+    nk_draw_foreach(cmd, ctx, cmds)
+    {
+        if (!cmd->elem_count) continue;
+        glfw->draw_command_count++;
+        glBindTexture(GL_TEXTURE_2D, (GLuint)cmd->texture.id);
+        glScissor(
+            (GLint)(cmd->clip_rect.x * glfw->fb_scale.x),
+            (GLint)((glfw->height - (GLint)(cmd->clip_rect.y + cmd->clip_rect.h)) * glfw->fb_scale.y),
+            (GLint)(cmd->clip_rect.w * glfw->fb_scale.x),
+            (GLint)(cmd->clip_rect.h * glfw->fb_scale.y));
+        glDrawElements(GL_TRIANGLES, (GLsizei)cmd->elem_count, GL_UNSIGNED_SHORT, offset);
+        offset += cmd->elem_count;
+    }
+    if (glfw->upload != NK_GLFW3_UPLOAD_ORPHAN) {
+        glfw->fences[glfw->section] = glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0);
+        glfw->section = (glfw->section + 1) % NK_GLFW_RING_FRAMES;
+    }
+}
+
+NK_INTERN void
+nk_glfw3_setup_render(void)
+{
+    struct nk_glfw_device *dev = &glfw->ogl;
     GLfloat ortho[4][4] = {
         {2.0f, 0.0f, 0.0f, 0.0f},
         {0.0f,-2.0f, 0.0f, 0.0f},
         {0.0f, 0.0f,-1.0f, 0.0f},
         {-1.0f,1.0f, 0.0f, 1.0f},
     };
-    ortho[0][0] /= (GLfloat)glfw.width;
-    ortho[1][1] /= (GLfloat)glfw.height;
+    ortho[0][0] /= (GLfloat)glfw->width;
+    ortho[1][1] /= (GLfloat)glfw->height;
 
     /* setup global state */
     glEnable(GL_BLEND);
@@ -234,69 +723,15 @@ nk_glfw3_render(enum nk_anti_aliasing AA, int max_vertex_buffer, int max_element
     glUseProgram(dev->prog);
     glUniform1i(dev->uniform_tex, 0);
     glUniformMatrix4fv(dev->uniform_proj, 1, GL_FALSE, &ortho[0][0]);
-    glViewport(0,0,(GLsizei)glfw.display_width,(GLsizei)glfw.display_height);
-    {
-        /* convert from command queue into draw list and draw to screen */
-        const struct nk_draw_command *cmd;
-        void *vertices, *elements;
-        const nk_draw_index *offset = NULL;
-
-        /* allocate vertex and element buffer */
-        glBindVertexArray(dev->vao);
-        glBindBuffer(GL_ARRAY_BUFFER, dev->vbo);
-        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, dev->ebo);
-
-        glBufferData(GL_ARRAY_BUFFER, max_vertex_buffer, NULL, GL_STREAM_DRAW);
-        glBufferData(GL_ELEMENT_ARRAY_BUFFER, max_element_buffer, NULL, GL_STREAM_DRAW);
-
-        /* load draw vertices & elements directly into vertex + element buffer */
-        vertices = glMapBuffer(GL_ARRAY_BUFFER, GL_WRITE_ONLY);
-        elements = glMapBuffer(GL_ELEMENT_ARRAY_BUFFER, GL_WRITE_ONLY);
-        {
-            /* fill convert configuration */
-            struct nk_convert_config config;
-            static const struct nk_draw_vertex_layout_element vertex_layout[] = {
-                {NK_VERTEX_POSITION, NK_FORMAT_FLOAT, NK_OFFSETOF(struct nk_glfw_vertex, position)},
-                {NK_VERTEX_TEXCOORD, NK_FORMAT_FLOAT, NK_OFFSETOF(struct nk_glfw_vertex, uv)},
-                {NK_VERTEX_COLOR, NK_FORMAT_R8G8B8A8, NK_OFFSETOF(struct nk_glfw_vertex, col)},
-                {NK_VERTEX_LAYOUT_END}
-            };
-            NK_MEMSET(&config, 0, sizeof(config));
-            config.vertex_layout = vertex_layout;
-            config.vertex_size = sizeof(struct nk_glfw_vertex);
-            config.vertex_alignment = NK_ALIGNOF(struct nk_glfw_vertex);
-            config.null = dev->null;
-            config.circle_segment_count = 22;
-            config.curve_segment_count = 22;
-            config.arc_segment_count = 22;
-            config.global_alpha = 1.0f;
-            config.shape_AA = AA;
-            config.line_AA = AA;
-
-            /* setup buffers to load vertices and elements */
-            nk_buffer_init_fixed(&vbuf, vertices, (size_t)max_vertex_buffer);
-            nk_buffer_init_fixed(&ebuf, elements, (size_t)max_element_buffer);
-            nk_convert(&glfw.ctx, &dev->cmds, &vbuf, &ebuf, &config);
-        }
-        glUnmapBuffer(GL_ARRAY_BUFFER);
-        glUnmapBuffer(GL_ELEMENT_ARRAY_BUFFER);
-
-        /* iterate over and execute each draw command */
-        nk_draw_foreach(cmd, &glfw.ctx, &dev->cmds)
-        {
-            if (!cmd->elem_count) continue;
-            glBindTexture(GL_TEXTURE_2D, (GLuint)cmd->texture.id);
-            glScissor(
-                (GLint)(cmd->clip_rect.x * glfw.fb_scale.x),
-                (GLint)((glfw.height - (GLint)(cmd->clip_rect.y + cmd->clip_rect.h)) * glfw.fb_scale.y),
-                (GLint)(cmd->clip_rect.w * glfw.fb_scale.x),
-                (GLint)(cmd->clip_rect.h * glfw.fb_scale.y));
-            glDrawElements(GL_TRIANGLES, (GLsizei)cmd->elem_count, GL_UNSIGNED_SHORT, offset);
-            offset += cmd->elem_count;
-        }
-        nk_clear(&glfw.ctx);
-    }
+    glViewport(0,0,(GLsizei)glfw->display_width,(GLsizei)glfw->display_height);
+    glBindVertexArray(dev->vao);
+    glBindBuffer(GL_ARRAY_BUFFER, dev->vbo);
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, dev->ebo);
+}
 
+NK_INTERN void
+nk_glfw3_restore_render(void)
+{
     /* default OpenGL state */
     glUseProgram(0);
     glBindBuffer(GL_ARRAY_BUFFER, 0);
@@ -306,57 +741,525 @@ nk_glfw3_render(enum nk_anti_aliasing AA, int max_vertex_buffer, int max_element
     glDisable(GL_SCISSOR_TEST);
 }
 
+/* convert the frame straight into the mapped vertex and element buffers
+   and draw it */
+NK_INTERN void
+nk_glfw3_render_serial(enum nk_anti_aliasing AA)
+{
+    struct nk_glfw_device *dev = &glfw->ogl;
+    struct nk_buffer vbuf, ebuf;
+    struct nk_convert_config config;
+    void *vertices, *elements;
+    double start, converting, uploaded;
+
+    nk_glfw3_convert_config(&config, AA);
+    glfw->convert_time = 0;
+    start = glfwGetTime();
+    for (;;) {
+        int grew = nk_false;
+
+        /* load draw vertices & elements directly into vertex + element buffer */
+        nk_glfw3_map_buffers(&vertices, &elements);
+        nk_buffer_init_fixed(&vbuf, vertices, glfw->vertex_capacity);
+        nk_buffer_init_fixed(&ebuf, elements, glfw->element_capacity);
+        converting = glfwGetTime();
+        glfw->convert_result = nk_convert(&glfw->ctx, &dev->cmds, &vbuf, &ebuf, &config);
+        glfw->convert_time += glfwGetTime() - converting;
+        glfw->vertex_count = (int)(vbuf.needed / sizeof(struct nk_glfw_vertex));
+        glfw->element_count = (int)(ebuf.needed / sizeof(nk_draw_index));
+        nk_glfw3_unmap_buffers();
+
+        /* geometry that didn't fit was dropped, so grow whichever
+           buffer was full and convert the whole frame again */
+        if ((glfw->convert_result & NK_CONVERT_VERTEX_BUFFER_FULL)
+            && glfw->vertex_capacity < NK_GLFW_BUFFER_MAX) {
+            glfw->vertex_capacity = nk_glfw3_buffer_grow(glfw->vertex_capacity, vbuf.needed);
+            grew = nk_true;
+        }
+        if ((glfw->convert_result & NK_CONVERT_ELEMENT_BUFFER_FULL)
+            && glfw->element_capacity < NK_GLFW_BUFFER_MAX) {
+            glfw->element_capacity = nk_glfw3_buffer_grow(glfw->element_capacity, ebuf.needed);
+            grew = nk_true;
+        }
+        if (!grew) break;
+        nk_draw_list_clear(&glfw->ctx.draw_list);
+    }
+    uploaded = glfwGetTime();
+    nk_glfw3_track_usage(vbuf.needed, ebuf.needed);
+    nk_glfw3_draw(&glfw->ctx, &dev->cmds);
+    nk_clear(&glfw->ctx);
+
+    /* nk_convert writes straight into the mapped buffers, so the
+       upload is the orphaning or waiting, mapping and unmapping around
+       it.  these are CPU times; the GPU finishes the work
+       asynchronously */
+    glfw->upload_time = (uploaded - start) - glfw->convert_time;
+    glfw->draw_time = glfwGetTime() - uploaded;
+}
+
+/* grow memory of capacity bytes to hold needed bytes, see
+   nk_glfw3_buffer_grow.  it is left as it is if that fails */
+NK_INTERN int
+nk_glfw3_staging_grow(void **memory, nk_size *capacity, nk_size needed)
+{
+    nk_size grown = *capacity ? nk_glfw3_buffer_grow(*capacity, needed) : needed;
+    void *larger = realloc(*memory, grown);
+    if (!larger) return nk_false;
+    *memory = larger;
+    *capacity = grown;
+    return nk_true;
+}
+
+/* runs on the worker thread, so it may only touch frame */
+NK_INTERN void
+nk_glfw3_convert_frame(struct nk_glfw_frame *frame)
+{
+    double start = glfwGetTime();
+    nk_draw_list_clear(&frame->ctx.draw_list);
+    for (;;) {
+        struct nk_buffer vbuf, ebuf;
+        int grew = nk_false;
+
+        nk_buffer_init_fixed(&vbuf, frame->vertices, frame->vertex_capacity);
+        nk_buffer_init_fixed(&ebuf, frame->elements, frame->element_capacity);
+        frame->convert_result = nk_convert(&frame->ctx, &frame->cmds, &vbuf, &ebuf, &frame->config);
+        frame->vertices_needed = vbuf.needed;
+        frame->elements_needed = ebuf.needed;
+        /* vbuf and ebuf go out of scope, the draw list only needs cmds */
+        frame->ctx.draw_list.vertices = 0;
+        frame->ctx.draw_list.elements = 0;
+
+        if ((frame->convert_result & NK_CONVERT_VERTEX_BUFFER_FULL)
+            && frame->vertex_capacity < NK_GLFW_BUFFER_MAX)
+            grew |= nk_glfw3_staging_grow(&frame->vertices, &frame->vertex_capacity, vbuf.needed);
+        if ((frame->convert_result & NK_CONVERT_ELEMENT_BUFFER_FULL)
+            && frame->element_capacity < NK_GLFW_BUFFER_MAX)
+            grew |= nk_glfw3_staging_grow(&frame->elements, &frame->element_capacity, ebuf.needed);
+        if (!grew) break;
+        nk_draw_list_clear(&frame->ctx.draw_list);
+    }
+    frame->convert_time = glfwGetTime() - start;
+}
+
+static void*
+nk_glfw3_pipeline_worker(void *arg)
+{
+    struct nk_glfw *state = (struct nk_glfw*)arg;
+    pthread_mutex_lock(&state->pipeline_lock);
+    for (;;) {
+        struct nk_glfw_frame *frame;
+        while (!state->pipeline_job && !state->pipeline_quit)
+            pthread_cond_wait(&state->pipeline_posted, &state->pipeline_lock);
+        if (!state->pipeline_job)
+            break;
+        frame = state->pipeline_job;
+        pthread_mutex_unlock(&state->pipeline_lock);
+        nk_glfw3_convert_frame(frame);
+        pthread_mutex_lock(&state->pipeline_lock);
+        state->pipeline_job = 0;
+        pthread_cond_signal(&state->pipeline_done);
+    }
+    pthread_mutex_unlock(&state->pipeline_lock);
+    return 0;
+}
+
+/* wait until the worker has converted the frame it was given */
+NK_INTERN void
+nk_glfw3_pipeline_wait(void)
+{
+    pthread_mutex_lock(&glfw->pipeline_lock);
+    while (glfw->pipeline_job)
+        pthread_cond_wait(&glfw->pipeline_done, &glfw->pipeline_lock);
+    pthread_mutex_unlock(&glfw->pipeline_lock);
+}
+
+/* the windows the frame which was just built draws: nk_convert skips
+   hidden ones and those which weren't begun this frame */
+NK_INTERN nk_uint
+nk_glfw3_window_count(const struct nk_context *ctx)
+{
+    const struct nk_window *win;
+    nk_uint count = 0;
+    for (win = ctx->begin; win; win = win->next)
+        if (!(win->flags & NK_WINDOW_HIDDEN) && win->seq == ctx->seq)
+            ++count;
+    return count;
+}
+
+/* copy the frame which was just built into frame and hand it to the
+   worker.  nk__begin links the windows' commands into one list, which
+   frame's single window then spans */
+NK_INTERN void
+nk_glfw3_pipeline_submit(struct nk_glfw_frame *frame, enum nk_anti_aliasing AA)
+{
+    const struct nk_buffer *memory = &glfw->ctx.memory;
+    const struct nk_command *first;
+
+    nk_glfw3_convert_config(&frame->config, AA);
+    first = nk__begin(&glfw->ctx);
+    if (first && memory->allocated > frame->commands_capacity) {
+        void *grown = realloc(frame->commands, memory->allocated);
+        if (grown) {
+            frame->commands = grown;
+            frame->commands_capacity = memory->allocated;
+        } else first = 0;
+    }
+    if (first) memcpy(frame->commands, memory->memory.ptr, memory->allocated);
+    frame->ctx.memory.memory.ptr = frame->commands;
+    frame->ctx.memory.allocated = first ? memory->allocated : 0;
+    frame->ctx.count = first ? 1 : 0;
+    frame->window.buffer.begin = first ?
+        (nk_size)((const nk_byte*)first - (const nk_byte*)memory->memory.ptr) : 0;
+    frame->window.buffer.end = frame->window.buffer.begin + 1;
+
+    /* the worker grows the staging buffers when a frame doesn't fit */
+    if (frame->vertex_capacity < glfw->vertex_capacity)
+        nk_glfw3_staging_grow(&frame->vertices, &frame->vertex_capacity, glfw->vertex_capacity);
+    if (frame->element_capacity < glfw->element_capacity)
+        nk_glfw3_staging_grow(&frame->elements, &frame->element_capacity, glfw->element_capacity);
+    if (!frame->vertices || !frame->elements)
+        frame->ctx.count = 0;
+
+    glfw->pipeline_width = glfw->display_width;
+    glfw->pipeline_height = glfw->display_height;
+    glfw->pipeline_windows = nk_glfw3_window_count(&glfw->ctx);
+
+    pthread_mutex_lock(&glfw->pipeline_lock);
+    glfw->pipeline_job = frame;
+    glfw->pipeline_queued = (int)(frame - glfw->pipeline_frames);
+    glfw->pipeline_drawn = nk_false;
+    glfw->pipeline_flushed = nk_false;
+    pthread_cond_signal(&glfw->pipeline_posted);
+    pthread_mutex_unlock(&glfw->pipeline_lock);
+}
+
+/* copy a frame the worker converted into the vertex and element buffers
+   and draw it.  convert_time is how long the render waited for the
+   worker, the rest of the conversion overlapped with the caller */
+NK_INTERN void
+nk_glfw3_pipeline_draw(struct nk_glfw_frame *frame, double waited)
+{
+    void *vertices, *elements;
+    nk_size vsize = NK_MIN(frame->vertices_needed, frame->vertex_capacity);
+    nk_size esize = NK_MIN(frame->elements_needed, frame->element_capacity);
+    double start = glfwGetTime(), uploaded;
+
+    if (glfw->vertex_capacity < vsize)
+        glfw->vertex_capacity = nk_glfw3_buffer_grow(glfw->vertex_capacity, vsize);
+    if (glfw->element_capacity < esize)
+        glfw->element_capacity = nk_glfw3_buffer_grow(glfw->element_capacity, esize);
+    nk_glfw3_map_buffers(&vertices, &elements);
+    memcpy(vertices, frame->vertices, vsize);
+    memcpy(elements, frame->elements, esize);
+    nk_glfw3_unmap_buffers();
+    uploaded = glfwGetTime();
+
+    nk_glfw3_track_usage(vsize, esize);
+    nk_glfw3_draw(&frame->ctx, &frame->cmds);
+    if (frame == &glfw->pipeline_frames[glfw->pipeline_queued])
+        glfw->pipeline_drawn = nk_true;
+    glfw->convert_result = frame->convert_result;
+    glfw->vertex_count = (int)(frame->vertices_needed / sizeof(struct nk_glfw_vertex));
+    glfw->element_count = (int)(frame->elements_needed / sizeof(nk_draw_index));
+    glfw->convert_time = waited;
+    glfw->upload_time = uploaded - start;
+    glfw->draw_time = glfwGetTime() - uploaded;
+}
+
+/* whether the frame last handed to the worker no longer fits the one
+   which was just built: the framebuffer was resized, or a window was
+   opened or closed.  drawing it would show the old layout for a frame */
+NK_INTERN int
+nk_glfw3_pipeline_stale(void)
+{
+    return glfw->pipeline_width != glfw->display_width
+        || glfw->pipeline_height != glfw->display_height
+        || glfw->pipeline_windows != nk_glfw3_window_count(&glfw->ctx);
+}
+
+/* hand this frame to the worker, and draw the one it converted during
+   the previous render, so conversion overlaps with building the next
+   frame.  the very first frame, one after the previous was already
+   drawn by nk_glfw3_render_flush, and one after the previous went
+   stale, are waited for and drawn at once */
+NK_INTERN void
+nk_glfw3_render_pipelined(enum nk_anti_aliasing AA)
+{
+    struct nk_glfw_frame *ready = 0;
+    double start = glfwGetTime();
+
+    nk_glfw3_pipeline_wait();
+    if (glfw->pipeline_queued >= 0 && !glfw->pipeline_flushed && !nk_glfw3_pipeline_stale())
+        ready = &glfw->pipeline_frames[glfw->pipeline_queued];
+    nk_glfw3_pipeline_submit(ready == &glfw->pipeline_frames[0] ?
+        &glfw->pipeline_frames[1] : &glfw->pipeline_frames[0], AA);
+    nk_clear(&glfw->ctx);
+    if (!ready) {
+        nk_glfw3_pipeline_wait();
+        ready = &glfw->pipeline_frames[glfw->pipeline_queued];
+    }
+    nk_glfw3_pipeline_draw(ready, glfwGetTime() - start);
+}
+
+/* max_vertex_buffer and max_element_buffer are the initial and smallest
+   sizes of the vertex and element buffers in bytes.  a frame which
+   doesn't fit is converted again with bigger buffers, up to
+   NK_GLFW_BUFFER_MAX, see nk_glfw3_buffer_stats.  sizes below one
+   vertex or one element are raised to that, as empty buffers can't be
+   mapped */
+NK_API void
+nk_glfw3_render(enum nk_anti_aliasing AA, int max_vertex_buffer, int max_element_buffer)
+{
+    if (glfw->track_changes) {
+        nk_glfw3_snapshot_commands();
+        glfw->input_arrived = nk_false;
+    }
+    glfw->min_vertex_buffer = (nk_size)NK_MAX(max_vertex_buffer, (int)sizeof(struct nk_glfw_vertex));
+    glfw->min_element_buffer = (nk_size)NK_MAX(max_element_buffer, (int)sizeof(nk_draw_index));
+    glfw->vertex_capacity = NK_MAX(glfw->vertex_capacity, glfw->min_vertex_buffer);
+    glfw->element_capacity = NK_MAX(glfw->element_capacity, glfw->min_element_buffer);
+
+    nk_glfw3_setup_render();
+    if (glfw->pipelined)
+        nk_glfw3_render_pipelined(AA);
+    else nk_glfw3_render_serial(AA);
+    nk_glfw3_restore_render();
+}
+
+/* whether a pipelined render handed the worker a frame which hasn't been
+   drawn yet.  a loop which skips rendering unchanged frames calls
+   nk_glfw3_render_flush instead, then swaps buffers, so that the last
+   frame built is the one shown */
+NK_API int
+nk_glfw3_render_pending(void)
+{
+    return glfw->pipelined && glfw->pipeline_queued >= 0 && !glfw->pipeline_drawn;
+}
+
+/* draw the last frame handed to the worker without handing it a new one */
+NK_API void
+nk_glfw3_render_flush(void)
+{
+    double start = glfwGetTime();
+    if (!nk_glfw3_render_pending()) return;
+    nk_glfw3_setup_render();
+    nk_glfw3_pipeline_wait();
+    nk_glfw3_pipeline_draw(&glfw->pipeline_frames[glfw->pipeline_queued], glfwGetTime() - start);
+    glfw->pipeline_flushed = nk_true;
+    nk_glfw3_restore_render();
+}
+
+NK_API void
+nk_glfw3_render_timings(double *convert, double *upload, double *draw)
+{
+    if (convert) *convert = glfw->convert_time;
+    if (upload) *upload = glfw->upload_time;
+    if (draw) *draw = glfw->draw_time;
+}
+
+NK_API void
+nk_glfw3_render_stats(int *vertices, int *elements, int *draw_commands, int *convert_result)
+{
+    if (vertices) *vertices = glfw->vertex_count;
+    if (elements) *elements = glfw->element_count;
+    if (draw_commands) *draw_commands = glfw->draw_command_count;
+    if (convert_result) *convert_result = (int)glfw->convert_result;
+}
+
+/* the font texture's white pixel, for converting frames with a
+   nk_convert_config of one's own */
+NK_API void
+nk_glfw3_null_texture(struct nk_draw_null_texture *null)
+{
+    *null = glfw->ogl.null;
+}
+
+/* the current sizes of the vertex and element buffers in bytes, and the
+   most either has needed since nk_glfw3_init */
+NK_API void
+nk_glfw3_buffer_stats(int *vertex_capacity, int *element_capacity,
+    int *vertex_high_water, int *element_high_water)
+{
+    if (vertex_capacity) *vertex_capacity = (int)glfw->vertex_capacity;
+    if (element_capacity) *element_capacity = (int)glfw->element_capacity;
+    if (vertex_high_water) *vertex_high_water = (int)glfw->vertex_high_water;
+    if (element_high_water) *element_high_water = (int)glfw->element_high_water;
+}
+
+NK_INTERN int
+nk_glfw3_buffer_storage_supported(void)
+{
+    GLint i, count = 0;
+    if (gl3w_is_supported(4, 4))
+        return nk_true;
+    glGetIntegerv(GL_NUM_EXTENSIONS, &count);
+    for (i = 0; i < count; ++i)
+        if (!strcmp((const char*)glGetStringi(GL_EXTENSIONS, (GLuint)i), "GL_ARB_buffer_storage"))
+            return nk_true;
+    return nk_false;
+}
+
+/* choose how nk_glfw3_render streams vertices and elements, see enum
+   nk_glfw_upload.  returns the upload which will be used: without buffer
+   storage, persistent mapping falls back to the ring */
+NK_API int
+nk_glfw3_set_upload(enum nk_glfw_upload upload)
+{
+    if (upload == NK_GLFW3_UPLOAD_PERSISTENT && !nk_glfw3_buffer_storage_supported())
+        upload = NK_GLFW3_UPLOAD_RING;
+    if (upload != glfw->upload) {
+        nk_glfw3_release_buffers();
+        glfw->upload = upload;
+    }
+    return upload;
+}
+
+/* how finely nk_glfw3_render tessellates, from the next render on.
+   line_AA and shape_AA are NK_ANTI_ALIASING_OFF or _ON, or -1 to follow
+   the render's anti-aliasing argument.  segment counts of 0 are
+   NK_GLFW_SEGMENTS.  a lod_tolerance above 0 lowers the segment counts
+   each frame to keep shapes within that many pixels, see
+   nk_glfw3_tessellation_lod */
+NK_API void
+nk_glfw3_set_tessellation(int line_AA, int shape_AA,
+    unsigned circle_segments, unsigned arc_segments, unsigned curve_segments,
+    float lod_tolerance)
+{
+    glfw->tessellation_set = nk_true;
+    glfw->line_AA = line_AA;
+    glfw->shape_AA = shape_AA;
+    glfw->circle_segment_count = circle_segments;
+    glfw->arc_segment_count = arc_segments;
+    glfw->curve_segment_count = curve_segments;
+    glfw->lod_tolerance = lod_tolerance;
+}
+
+NK_INTERN int
+nk_glfw3_pipeline_start(void)
+{
+    int i;
+    for (i = 0; i < 2; ++i) {
+        struct nk_glfw_frame *frame = &glfw->pipeline_frames[i];
+        nk_draw_list_init(&frame->ctx.draw_list);
+        nk_buffer_init_default(&frame->cmds);
+        frame->ctx.begin = &frame->window;
+        frame->ctx.build = nk_true;
+    }
+    glfw->pipeline_job = 0;
+    glfw->pipeline_quit = nk_false;
+    glfw->pipeline_queued = -1;
+    pthread_mutex_init(&glfw->pipeline_lock, NULL);
+    pthread_cond_init(&glfw->pipeline_posted, NULL);
+    pthread_cond_init(&glfw->pipeline_done, NULL);
+    if (pthread_create(&glfw->pipeline_worker, NULL, nk_glfw3_pipeline_worker, glfw)) {
+        pthread_cond_destroy(&glfw->pipeline_done);
+        pthread_cond_destroy(&glfw->pipeline_posted);
+        pthread_mutex_destroy(&glfw->pipeline_lock);
+        for (i = 0; i < 2; ++i)
+            nk_buffer_free(&glfw->pipeline_frames[i].cmds);
+        NK_MEMSET(glfw->pipeline_frames, 0, sizeof(glfw->pipeline_frames));
+        return nk_false;
+    }
+    return nk_true;
+}
+
+/* the worker finishes the frame it has, if any, and exits.  that frame
+   is dropped */
+NK_INTERN void
+nk_glfw3_pipeline_stop(void)
+{
+    int i;
+    pthread_mutex_lock(&glfw->pipeline_lock);
+    glfw->pipeline_quit = nk_true;
+    pthread_cond_signal(&glfw->pipeline_posted);
+    pthread_mutex_unlock(&glfw->pipeline_lock);
+    pthread_join(glfw->pipeline_worker, NULL);
+    pthread_cond_destroy(&glfw->pipeline_done);
+    pthread_cond_destroy(&glfw->pipeline_posted);
+    pthread_mutex_destroy(&glfw->pipeline_lock);
+    for (i = 0; i < 2; ++i) {
+        struct nk_glfw_frame *frame = &glfw->pipeline_frames[i];
+        nk_buffer_free(&frame->cmds);
+        free(frame->commands);
+        free(frame->vertices);
+        free(frame->elements);
+    }
+    NK_MEMSET(glfw->pipeline_frames, 0, sizeof(glfw->pipeline_frames));
+    glfw->pipeline_queued = -1;
+}
+
+/* with pipelined on, nk_glfw3_render copies the frame's command buffer
+   and hands it to a worker thread to convert, then draws the frame the
+   worker converted during the previous render.  the caller builds the
+   next frame while the worker converts, at the cost of showing each
+   frame one render later.  after a resize, or when a window opens or
+   closes, the frame is converted and drawn at once instead.  returns whether frames are pipelined, which
+   they aren't if the thread couldn't be started */
+NK_API int
+nk_glfw3_set_pipelined(int pipelined)
+{
+    if (pipelined && !glfw->pipelined)
+        glfw->pipelined = nk_glfw3_pipeline_start();
+    else if (!pipelined && glfw->pipelined) {
+        nk_glfw3_pipeline_stop();
+        glfw->pipelined = nk_false;
+    }
+    return glfw->pipelined;
+}
+
 NK_API void
 nk_glfw3_char_callback(GLFWwindow *win, unsigned int codepoint)
 {
-    (void)win;
-    if (glfw.text_len < NK_GLFW_TEXT_MAX)
-        glfw.text[glfw.text_len++] = codepoint;
+    struct nk_glfw *glfw = nk_glfw3_backend(win);
+    if (glfw->text_len < NK_GLFW_TEXT_MAX)
+        glfw->text[glfw->text_len++] = codepoint;
 }
 
 NK_API void
 nk_gflw3_scroll_callback(GLFWwindow *win, double xoff, double yoff)
 {
-    (void)win; (void)xoff;
-    glfw.scroll.x += (float)xoff;
-    glfw.scroll.y += (float)yoff;
+    struct nk_glfw *glfw = nk_glfw3_backend(win);
+    glfw->scroll.x += (float)xoff;
+    glfw->scroll.y += (float)yoff;
 }
 
 NK_API void
 nk_glfw3_mouse_button_callback(GLFWwindow* window, int button, int action, int mods)
 {
+    struct nk_glfw *glfw = nk_glfw3_backend(window);
     double x, y;
+    NK_UNUSED(mods);
     if (button != GLFW_MOUSE_BUTTON_LEFT) return;
     glfwGetCursorPos(window, &x, &y);
     if (action == GLFW_PRESS)  {
-        double dt = glfwGetTime() - glfw.last_button_click;
+        double dt = glfwGetTime() - glfw->last_button_click;
         if (dt > NK_GLFW_DOUBLE_CLICK_LO && dt < NK_GLFW_DOUBLE_CLICK_HI) {
-            glfw.is_double_click_down = nk_true;
-            glfw.double_click_pos = nk_vec2((float)x, (float)y);
+            glfw->is_double_click_down = nk_true;
+            glfw->double_click_pos = nk_vec2((float)x, (float)y);
         }
-        glfw.last_button_click = glfwGetTime();
-    } else glfw.is_double_click_down = nk_false;
+        glfw->last_button_click = glfwGetTime();
+    } else glfw->is_double_click_down = nk_false;
 }
 
 NK_INTERN void
 nk_glfw3_clipbard_paste(nk_handle usr, struct nk_text_edit *edit)
 {
-    const char *text = glfwGetClipboardString(glfw.win);
+    const struct nk_glfw *glfw = (const struct nk_glfw*)usr.ptr;
+    const char *text = glfwGetClipboardString(glfw->win);
     if (text) nk_textedit_paste(edit, text, nk_strlen(text));
-    (void)usr;
 }
 
 NK_INTERN void
 nk_glfw3_clipbard_copy(nk_handle usr, const char *text, int len)
 {
+    const struct nk_glfw *glfw = (const struct nk_glfw*)usr.ptr;
     char *str = 0;
-    (void)usr;
     if (!len) return;
     str = (char*)malloc((size_t)len+1);
     if (!str) return;
     memcpy(str, text, (size_t)len);
     str[len] = '\0';
-    glfwSetClipboardString(glfw.win, str);
+    glfwSetClipboardString(glfw->win, str);
     free(str);
 }
 
@@ -371,42 +1274,74 @@ nk_glfw3_init(GLFWwindow *win, enum nk_glfw_init_state init_state)
     {
         printf("Could not init glew\n");
     }
-    glfw.win = win;
+    glfw->win = win;
     if (init_state == NK_GLFW3_INSTALL_CALLBACKS) {
         glfwSetScrollCallback(win, nk_gflw3_scroll_callback);
         glfwSetCharCallback(win, nk_glfw3_char_callback);
         glfwSetMouseButtonCallback(win, nk_glfw3_mouse_button_callback);
     }
-    nk_init_default(&glfw.ctx, 0);
-    glfw.ctx.clip.copy = nk_glfw3_clipbard_copy;
-    glfw.ctx.clip.paste = nk_glfw3_clipbard_paste;
-    glfw.ctx.clip.userdata = nk_handle_ptr(0);
-    glfw.last_button_click = 0;
+    nk_init_default(&glfw->ctx, 0);
+    glfw->ctx.clip.copy = nk_glfw3_clipbard_copy;
+    glfw->ctx.clip.paste = nk_glfw3_clipbard_paste;
+    glfw->ctx.clip.userdata = nk_handle_ptr(glfw);
+    glfw->last_button_click = 0;
     nk_glfw3_device_create();
 
-    glfw.is_double_click_down = nk_false;
-    glfw.double_click_pos = nk_vec2(0, 0);
+    glfw->is_double_click_down = nk_false;
+    glfw->double_click_pos = nk_vec2(0, 0);
 
-    return &glfw.ctx;
+    glfw->next = nk_glfw_backends;
+    nk_glfw_backends = glfw;
+    return &glfw->ctx;
 }
 
 NK_API void
 nk_glfw3_font_stash_begin(struct nk_font_atlas **atlas)
 {
-    nk_font_atlas_init_default(&glfw.atlas);
-    nk_font_atlas_begin(&glfw.atlas);
-    *atlas = &glfw.atlas;
+    nk_font_atlas_init_default(&glfw->atlas);
+    nk_font_atlas_begin(&glfw->atlas);
+    *atlas = &glfw->atlas;
 }
 
 NK_API void
 nk_glfw3_font_stash_end(void)
 {
     const void *image; int w, h;
-    image = nk_font_atlas_bake(&glfw.atlas, &w, &h, NK_FONT_ATLAS_RGBA32);
+    image = nk_font_atlas_bake(&glfw->atlas, &w, &h, NK_FONT_ATLAS_RGBA32);
     nk_glfw3_device_upload_atlas(image, w, h);
-    nk_font_atlas_end(&glfw.atlas, nk_handle_id((int)glfw.ogl.font_tex), &glfw.ogl.null);
-    if (glfw.atlas.default_font)
-        nk_style_set_font(&glfw.ctx, &glfw.atlas.default_font->handle);
+    nk_font_atlas_end(&glfw->atlas, nk_handle_id((int)glfw->ogl.font_tex), &glfw->ogl.null);
+    if (glfw->atlas.default_font)
+        nk_style_set_font(&glfw->ctx, &glfw->atlas.default_font->handle);
+}
+
+/* instead of baking fonts of its own, use the fonts and font texture of
+   source, whose GL context must share objects with this backend's (the
+   share argument of glfwCreateWindow).  source must outlive this backend */
+NK_API void
+nk_glfw3_font_stash_share(const struct nk_glfw *source)
+{
+    glfw->ogl.font_tex = source->ogl.font_tex;
+    glfw->ogl.null = source->ogl.null;
+    glfw->shared_font = nk_true;
+    if (source->atlas.default_font)
+        nk_style_set_font(&glfw->ctx, &source->atlas.default_font->handle);
+}
+
+NK_INTERN int
+nk_glfw3_input_arrived(const struct nk_input *in)
+{
+    int i;
+    if (in->mouse.delta.x != 0 || in->mouse.delta.y != 0)
+        return nk_true;
+    if (in->mouse.scroll_delta.x != 0 || in->mouse.scroll_delta.y != 0)
+        return nk_true;
+    if (in->keyboard.text_len)
+        return nk_true;
+    for (i = 0; i < NK_BUTTON_MAX; ++i)
+        if (in->mouse.buttons[i].clicked) return nk_true;
+    for (i = 0; i < NK_KEY_MAX; ++i)
+        if (in->keyboard.keys[i].clicked) return nk_true;
+    return nk_false;
 }
 
 NK_API void
@@ -414,24 +1349,29 @@ nk_glfw3_new_frame(void)
 {
     int i;
     double x, y;
-    struct nk_context *ctx = &glfw.ctx;
-    struct GLFWwindow *win = glfw.win;
+    struct nk_context *ctx = &glfw->ctx;
+    struct GLFWwindow *win = glfw->win;
+    int width = glfw->width, height = glfw->height;
+    int display_width = glfw->display_width, display_height = glfw->display_height;
 
-    glfwGetWindowSize(win, &glfw.width, &glfw.height);
-    glfwGetFramebufferSize(win, &glfw.display_width, &glfw.display_height);
-    glfw.fb_scale.x = (float)glfw.display_width/(float)glfw.width;
-    glfw.fb_scale.y = (float)glfw.display_height/(float)glfw.height;
+    glfwGetWindowSize(win, &glfw->width, &glfw->height);
+    glfwGetFramebufferSize(win, &glfw->display_width, &glfw->display_height);
+    if (width != glfw->width || height != glfw->height ||
+        display_width != glfw->display_width || display_height != glfw->display_height)
+        glfw->input_arrived = nk_true;
+    glfw->fb_scale.x = (float)glfw->display_width/(float)glfw->width;
+    glfw->fb_scale.y = (float)glfw->display_height/(float)glfw->height;
 
     nk_input_begin(ctx);
-    for (i = 0; i < glfw.text_len; ++i)
-        nk_input_unicode(ctx, glfw.text[i]);
+    for (i = 0; i < glfw->text_len; ++i)
+        nk_input_unicode(ctx, glfw->text[i]);
 
 #ifdef NK_GLFW_GL3_MOUSE_GRABBING
     /* optional grabbing behavior */
     if (ctx->input.mouse.grab)
-        glfwSetInputMode(glfw.win, GLFW_CURSOR, GLFW_CURSOR_HIDDEN);
+        glfwSetInputMode(glfw->win, GLFW_CURSOR, GLFW_CURSOR_HIDDEN);
     else if (ctx->input.mouse.ungrab)
-        glfwSetInputMode(glfw.win, GLFW_CURSOR, GLFW_CURSOR_NORMAL);
+        glfwSetInputMode(glfw->win, GLFW_CURSOR, GLFW_CURSOR_NORMAL);
 #endif
 
     nk_input_key(ctx, NK_KEY_DEL, glfwGetKey(win, GLFW_KEY_DELETE) == GLFW_PRESS);
@@ -473,7 +1413,7 @@ nk_glfw3_new_frame(void)
     nk_input_motion(ctx, (int)x, (int)y);
 #ifdef NK_GLFW_GL3_MOUSE_GRABBING
     if (ctx->input.mouse.grabbed) {
-        glfwSetCursorPos(glfw.win, ctx->input.mouse.prev.x, ctx->input.mouse.prev.y);
+        glfwSetCursorPos(glfw->win, ctx->input.mouse.prev.x, ctx->input.mouse.prev.y);
         ctx->input.mouse.pos.x = ctx->input.mouse.prev.x;
         ctx->input.mouse.pos.y = ctx->input.mouse.prev.y;
     }
@@ -481,20 +1421,64 @@ nk_glfw3_new_frame(void)
     nk_input_button(ctx, NK_BUTTON_LEFT, (int)x, (int)y, glfwGetMouseButton(win, GLFW_MOUSE_BUTTON_LEFT) == GLFW_PRESS);
     nk_input_button(ctx, NK_BUTTON_MIDDLE, (int)x, (int)y, glfwGetMouseButton(win, GLFW_MOUSE_BUTTON_MIDDLE) == GLFW_PRESS);
     nk_input_button(ctx, NK_BUTTON_RIGHT, (int)x, (int)y, glfwGetMouseButton(win, GLFW_MOUSE_BUTTON_RIGHT) == GLFW_PRESS);
-    nk_input_button(ctx, NK_BUTTON_DOUBLE, (int)glfw.double_click_pos.x, (int)glfw.double_click_pos.y, glfw.is_double_click_down);
-    nk_input_scroll(ctx, glfw.scroll);
-    nk_input_end(&glfw.ctx);
-    glfw.text_len = 0;
-    glfw.scroll = nk_vec2(0,0);
+    nk_input_button(ctx, NK_BUTTON_DOUBLE, (int)glfw->double_click_pos.x, (int)glfw->double_click_pos.y, glfw->is_double_click_down);
+    nk_input_scroll(ctx, glfw->scroll);
+    nk_input_end(&glfw->ctx);
+    /* input is remembered until a frame is rendered, so that idle frame
+       detection doesn't miss input which arrived on a skipped frame */
+    if (nk_glfw3_input_arrived(&ctx->input))
+        glfw->input_arrived = nk_true;
+    glfw->text_len = 0;
+    glfw->scroll = nk_vec2(0,0);
 }
 
 NK_API
 void nk_glfw3_shutdown(void)
 {
-    nk_font_atlas_clear(&glfw.atlas);
-    nk_free(&glfw.ctx);
+    struct nk_glfw **it;
+    for (it = &nk_glfw_backends; *it; it = &(*it)->next) {
+        if (*it == glfw) {
+            *it = glfw->next;
+            break;
+        }
+    }
+    if (glfw->pipelined)
+        nk_glfw3_pipeline_stop();
+    if (!glfw->shared_font)
+        nk_font_atlas_clear(&glfw->atlas);
+    nk_free(&glfw->ctx);
     nk_glfw3_device_destroy();
-    memset(&glfw, 0, sizeof(glfw));
+    free(glfw->last_cmds);
+    memset(glfw, 0, sizeof(*glfw));
+}
+
+/* a backend for another window, see nk_glfw3_make_current */
+NK_API struct nk_glfw*
+nk_glfw3_create(void)
+{
+    return (struct nk_glfw*)calloc(1, sizeof(struct nk_glfw));
+}
+
+/* make backend the one nk_glfw3_* work on, or the default one if it is
+   NULL.  its window's GL context must be current as well */
+NK_API void
+nk_glfw3_make_current(struct nk_glfw *backend)
+{
+    glfw = backend ? backend : &nk_glfw_default;
+}
+
+/* shut down a backend from nk_glfw3_create, if it was initialized, and
+   free it.  its window's GL context must be current */
+NK_API void
+nk_glfw3_destroy(struct nk_glfw *backend)
+{
+    struct nk_glfw *current = (glfw == backend) ? &nk_glfw_default : glfw;
+    if (!backend || backend == &nk_glfw_default) return;
+    glfw = backend;
+    if (backend->win)
+        nk_glfw3_shutdown();
+    glfw = current;
+    free(backend);
 }
 
 #endif
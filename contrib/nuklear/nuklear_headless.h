@@ -0,0 +1,249 @@
+/*
+ * Nuklear - 1.32.0 - public domain
+ * no warrenty implied; use at your own risk.
+ * authored from 2015-2016 by Micha Mettke
+ */
+/*
+ * ==============================================================
+ *
+ *                              API
+ *
+ * ===============================================================
+ */
+#ifndef NK_HEADLESS_H_
+#define NK_HEADLESS_H_
+
+/* a backend without a window or a GPU.  input is passed in explicitly
+ * each frame, and nk_headless_convert converts the frame's commands into
+ * caller provided vertex, element and draw command buffers, which the
+ * caller rasterizes however it likes (nuklearHeadless.py uses NumPy).
+ * the counts it stores are what the frame needs, and when any of them
+ * don't fit the frame isn't cleared, so it can be converted again into
+ * bigger buffers. */
+
+struct nk_headless_vertex {
+    float position[2];
+    float uv[2];
+    nk_byte col[4];
+};
+
+struct nk_headless_draw_command {
+    float clip_rect[4];
+    unsigned int elem_count;
+    int texture;
+};
+
+#define NK_HEADLESS_FONT_TEXTURE 1
+
+NK_API struct nk_context*   nk_headless_init(void);
+NK_API void                 nk_headless_shutdown(void);
+NK_API void                 nk_headless_font_stash_begin(struct nk_font_atlas **atlas);
+NK_API void                 nk_headless_font_stash_end(void);
+NK_API const void*          nk_headless_font_image(int *width, int *height);
+NK_API void                 nk_headless_char(unsigned int codepoint);
+NK_API void                 nk_headless_new_frame(float mouse_x, float mouse_y, int buttons, float scroll);
+NK_API void                 nk_headless_null_texture(struct nk_draw_null_texture *null);
+NK_API nk_flags             nk_headless_convert(enum nk_anti_aliasing,
+                                                struct nk_headless_vertex *vertices, int max_vertices,
+                                                nk_draw_index *elements, int max_elements,
+                                                struct nk_headless_draw_command *commands, int max_commands,
+                                                int *vertex_count, int *element_count, int *command_count);
+
+#endif
+/*
+ * ==============================================================
+ *
+ *                          IMPLEMENTATION
+ *
+ * ===============================================================
+ */
+#ifdef NK_HEADLESS_IMPLEMENTATION
+
+#ifndef NK_HEADLESS_TEXT_MAX
+#define NK_HEADLESS_TEXT_MAX 256
+#endif
+
+static struct nk_headless {
+    struct nk_context ctx;
+    struct nk_font_atlas atlas;
+    struct nk_draw_null_texture null;
+    struct nk_buffer cmds, vertices, elements;
+    void *font_image;
+    int font_width, font_height;
+    unsigned int text[NK_HEADLESS_TEXT_MAX];
+    int text_len;
+} headless;
+
+NK_API struct nk_context*
+nk_headless_init(void)
+{
+    nk_init_default(&headless.ctx, 0);
+    nk_buffer_init_default(&headless.cmds);
+    nk_buffer_init_default(&headless.vertices);
+    nk_buffer_init_default(&headless.elements);
+    return &headless.ctx;
+}
+
+NK_API void
+nk_headless_font_stash_begin(struct nk_font_atlas **atlas)
+{
+    nk_font_atlas_init_default(&headless.atlas);
+    nk_font_atlas_begin(&headless.atlas);
+    *atlas = &headless.atlas;
+}
+
+NK_API void
+nk_headless_font_stash_end(void)
+{
+    const void *image; int w, h;
+    image = nk_font_atlas_bake(&headless.atlas, &w, &h, NK_FONT_ATLAS_RGBA32);
+
+    /* nk_font_atlas_end frees the baked image, keep a copy to sample */
+    free(headless.font_image);
+    headless.font_image = malloc((size_t)(w * h * 4));
+    memcpy(headless.font_image, image, (size_t)(w * h * 4));
+    headless.font_width = w;
+    headless.font_height = h;
+
+    nk_font_atlas_end(&headless.atlas, nk_handle_id(NK_HEADLESS_FONT_TEXTURE), &headless.null);
+    if (headless.atlas.default_font)
+        nk_style_set_font(&headless.ctx, &headless.atlas.default_font->handle);
+}
+
+NK_API const void*
+nk_headless_font_image(int *width, int *height)
+{
+    *width = headless.font_width;
+    *height = headless.font_height;
+    return headless.font_image;
+}
+
+NK_API void
+nk_headless_char(unsigned int codepoint)
+{
+    if (headless.text_len < NK_HEADLESS_TEXT_MAX)
+        headless.text[headless.text_len++] = codepoint;
+}
+
+/* buttons is a bit mask, 1 << NK_BUTTON_LEFT etc. */
+NK_API void
+nk_headless_new_frame(float mouse_x, float mouse_y, int buttons, float scroll)
+{
+    int i;
+    struct nk_context *ctx = &headless.ctx;
+    int x = (int)mouse_x, y = (int)mouse_y;
+
+    nk_input_begin(ctx);
+    for (i = 0; i < headless.text_len; ++i)
+        nk_input_unicode(ctx, headless.text[i]);
+    headless.text_len = 0;
+
+    nk_input_motion(ctx, x, y);
+    nk_input_button(ctx, NK_BUTTON_LEFT, x, y, (buttons & (1 << NK_BUTTON_LEFT)) != 0);
+    nk_input_button(ctx, NK_BUTTON_MIDDLE, x, y, (buttons & (1 << NK_BUTTON_MIDDLE)) != 0);
+    nk_input_button(ctx, NK_BUTTON_RIGHT, x, y, (buttons & (1 << NK_BUTTON_RIGHT)) != 0);
+    nk_input_scroll(ctx, nk_vec2(0, scroll));
+    nk_input_end(ctx);
+}
+
+/* the font texture's white pixel, for converting frames with a
+   nk_convert_config of one's own */
+NK_API void
+nk_headless_null_texture(struct nk_draw_null_texture *null)
+{
+    *null = headless.null;
+}
+
+NK_API nk_flags
+nk_headless_convert(enum nk_anti_aliasing AA,
+                    struct nk_headless_vertex *vertices, int max_vertices,
+                    nk_draw_index *elements, int max_elements,
+                    struct nk_headless_draw_command *commands, int max_commands,
+                    int *vertex_count, int *element_count, int *command_count)
+{
+    const struct nk_draw_command *cmd;
+    struct nk_convert_config config;
+    static const struct nk_draw_vertex_layout_element vertex_layout[] = {
+        {NK_VERTEX_POSITION, NK_FORMAT_FLOAT, NK_OFFSETOF(struct nk_headless_vertex, position)},
+        {NK_VERTEX_TEXCOORD, NK_FORMAT_FLOAT, NK_OFFSETOF(struct nk_headless_vertex, uv)},
+        {NK_VERTEX_COLOR, NK_FORMAT_R8G8B8A8, NK_OFFSETOF(struct nk_headless_vertex, col)},
+        {NK_VERTEX_LAYOUT_END}
+    };
+    nk_flags result;
+    int count = 0;
+    nk_size vertex_bytes, element_bytes;
+
+    NK_MEMSET(&config, 0, sizeof(config));
+    config.vertex_layout = vertex_layout;
+    config.vertex_size = sizeof(struct nk_headless_vertex);
+    config.vertex_alignment = NK_ALIGNOF(struct nk_headless_vertex);
+    config.null = headless.null;
+    config.circle_segment_count = 22;
+    config.curve_segment_count = 22;
+    config.arc_segment_count = 22;
+    config.global_alpha = 1.0f;
+    config.shape_AA = AA;
+    config.line_AA = AA;
+
+    /* nuklear asserts when a fixed vertex buffer fills up part way
+       through an anti-aliased line, so the frame is converted into
+       buffers which grow, and copied out when it fits */
+    nk_draw_list_clear(&headless.ctx.draw_list);
+    nk_buffer_clear(&headless.vertices);
+    nk_buffer_clear(&headless.elements);
+    nk_buffer_clear(&headless.cmds);
+    result = nk_convert(&headless.ctx, &headless.cmds, &headless.vertices, &headless.elements, &config);
+
+    vertex_bytes = headless.vertices.allocated;
+    element_bytes = headless.elements.allocated;
+    *vertex_count = (int)(vertex_bytes / sizeof(struct nk_headless_vertex));
+    *element_count = (int)(element_bytes / sizeof(nk_draw_index));
+    if (*vertex_count > max_vertices)
+        result |= NK_CONVERT_VERTEX_BUFFER_FULL;
+    else
+        NK_MEMCPY(vertices, nk_buffer_memory_const(&headless.vertices), vertex_bytes);
+    if (*element_count > max_elements)
+        result |= NK_CONVERT_ELEMENT_BUFFER_FULL;
+    else
+        NK_MEMCPY(elements, nk_buffer_memory_const(&headless.elements), element_bytes);
+
+    /* every command is counted, even those which don't fit */
+    nk_draw_foreach(cmd, &headless.ctx, &headless.cmds)
+    {
+        if (!cmd->elem_count) continue;
+        if (count < max_commands) {
+            commands[count].clip_rect[0] = cmd->clip_rect.x;
+            commands[count].clip_rect[1] = cmd->clip_rect.y;
+            commands[count].clip_rect[2] = cmd->clip_rect.w;
+            commands[count].clip_rect[3] = cmd->clip_rect.h;
+            commands[count].elem_count = cmd->elem_count;
+            commands[count].texture = cmd->texture.id;
+        } else {
+            result |= NK_CONVERT_COMMAND_BUFFER_FULL;
+        }
+        count++;
+    }
+    *command_count = count;
+    nk_draw_list_clear(&headless.ctx.draw_list);
+
+    /* a frame which didn't fit is kept, to be converted again into
+       bigger buffers */
+    if (!(result & (NK_CONVERT_VERTEX_BUFFER_FULL | NK_CONVERT_ELEMENT_BUFFER_FULL |
+                    NK_CONVERT_COMMAND_BUFFER_FULL)))
+        nk_clear(&headless.ctx);
+    return result;
+}
+
+NK_API void
+nk_headless_shutdown(void)
+{
+    nk_font_atlas_clear(&headless.atlas);
+    nk_buffer_free(&headless.cmds);
+    nk_buffer_free(&headless.vertices);
+    nk_buffer_free(&headless.elements);
+    nk_free(&headless.ctx);
+    free(headless.font_image);
+    memset(&headless, 0, sizeof(headless));
+}
+
+#endif
@@ -65,7 +65,7 @@ glfw.glfwMakeContextCurrent(window)
 ctx = nkGLFW3.glfw3_init(window, nkGLFW3.GLFW3_INSTALL_CALLBACKS)
 nuklear = nk.NuklearContext(ctx)
 
-fontAtlas = nkGLFW3.FontAtlas()
+fontAtlas = ctypes.POINTER(nkGLFW3.FontAtlas)()
 nkGLFW3.glfw3_font_stash_begin(ctypes.byref(fontAtlas))
 nkGLFW3.glfw3_font_stash_end()
 
@@ -100,27 +100,10 @@ camera = Camera()
 #property = ctypes.c_int(20)
 
 
-# Loop until the user closes the window
-while not glfw.glfwWindowShouldClose(window):
-    # Render here
-
-    # Poll for and process events
-    glfw.glfwPollEvents()
-    nkGLFW3.glfw3_new_frame()
-
-    width, height = glfw.glfwGetFramebufferSize(window)
-    gl.glViewport(0, 0, width, height)
-    gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
-
-    ms.setToIdentityMatrix(ms.MatrixStack.model)
-    ms.setToIdentityMatrix(ms.MatrixStack.view)
-    ms.setToIdentityMatrix(ms.MatrixStack.projection)
-
-    # set the projection matrix to be perspective
-    ms.perspective(fov= 45.0,
-                   aspectRatio= width / height,
-                   nearZ= 0.1,
-                   farZ= 10000.0)
+# build the UI for one frame.  the camera is not drawn, so nothing animates
+# and the loop only needs to draw after input
+def build():
+    global op, prop, background
 
     # # get input from keyboard for camera movement
     # if not nuklear.item_is_any_active():
@@ -139,25 +122,6 @@ while not glfw.glfwWindowShouldClose(window):
     #         camera.x += math.sin(camera.rotationY)
     #         camera.z += math.cos(camera.rotationY)
 
-    # # move the camera to the correct position, which means
-    # # updating the view stack
-    # ms.rotateX(ms.MatrixStack.view,
-    #            camera.rotationX)
-    # ms.rotateY(ms.MatrixStack.view,
-    #            -camera.rotationY)
-    # ms.translate(ms.MatrixStack.view,
-    #              -camera.x,
-    #              -camera.y,
-    #              -camera.z)
-
-    # # render the models
-
-    # triangle.render()
-
-    # MAX_VERTEX_BUFFER = 512 * 1024
-    # MAX_ELEMENT_BUFFER = 128 * 1024
-
-
     if(nuklear.begin(title="Demonstration",
                      bounds=nk.Rect(10.0,10.0,230.0,250.0),
                      flags=nk.WINDOW_BORDER
@@ -262,11 +226,44 @@ while not glfw.glfwWindowShouldClose(window):
 
     overview(nuklear)
 
-    nkGLFW3.glfw3_render(nk.ANTI_ALIASING_ON)
+    return False
+
+
+def draw(width, height):
+    gl.glViewport(0, 0, width, height)
+    gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
+
+    ms.setToIdentityMatrix(ms.MatrixStack.model)
+    ms.setToIdentityMatrix(ms.MatrixStack.view)
+    ms.setToIdentityMatrix(ms.MatrixStack.projection)
+
+    # set the projection matrix to be perspective
+    ms.perspective(fov= 45.0,
+                   aspectRatio= width / height,
+                   nearZ= 0.1,
+                   farZ= 10000.0)
+
+    # # move the camera to the correct position, which means
+    # # updating the view stack
+    # ms.rotateX(ms.MatrixStack.view,
+    #            camera.rotationX)
+    # ms.rotateY(ms.MatrixStack.view,
+    #            -camera.rotationY)
+    # ms.translate(ms.MatrixStack.view,
+    #              -camera.x,
+    #              -camera.y,
+    #              -camera.z)
+
+    # # render the models
+
+    # triangle.render()
+
+    # MAX_VERTEX_BUFFER = 512 * 1024
+    # MAX_ELEMENT_BUFFER = 128 * 1024
+
 
-    # done with frame, flush and swap buffers
-    # Swap front and back buffers
-    glfw.glfwSwapBuffers(window)
+# Loop until the user closes the window, sleeping while nothing changes
+nkGLFW3.run(window, ctx, build, draw)
 
 
 glfw.glfwTerminate()
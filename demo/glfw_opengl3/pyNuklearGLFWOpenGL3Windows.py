@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+#Copyright (c) 2017-2018 William Emerison Six
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+
+# two windows, each with a backend of its own, sharing one font texture
+
+import sys
+import os
+import OpenGL.GL as gl
+import glfw.glfw as glfw
+import ctypes
+
+import builtins
+pwd = os.path.dirname(os.path.abspath(__file__))
+builtins.NUKLEAR_PATH = ctypes.CDLL(os.path.join(pwd, '..', '..', 'contrib', 'nuklear', 'nuklearGLFWOpenGL3.so'))
+
+import nuklear as nk
+import nuklearGLFW3 as nkGLFW3
+from demo.overview import *
+
+
+
+if __name__ != '__main__':
+    sys.exit(1)
+
+
+
+# Initialize the library
+if not glfw.glfwInit():
+    sys.exit()
+
+glfw.glfwWindowHint(glfw.GLFW_CONTEXT_VERSION_MAJOR,3)
+glfw.glfwWindowHint(glfw.GLFW_CONTEXT_VERSION_MINOR,3)
+glfw.glfwWindowHint(glfw.GLFW_OPENGL_PROFILE,glfw.GLFW_OPENGL_CORE_PROFILE)
+#for osx
+glfw.glfwWindowHint(glfw.GLFW_OPENGL_FORWARD_COMPAT, gl.GL_TRUE)
+
+
+# the second window's GL context shares objects with the first's, so its
+# backend can use the first's font texture
+first = glfw.glfwCreateWindow(800, 800, str.encode("pyNuklear demo - overview"), None, None)
+second = glfw.glfwCreateWindow(400, 300, str.encode("pyNuklear demo - second window"), None, first)
+if not first or not second:
+    glfw.glfwTerminate()
+    sys.exit()
+
+overviewBackend = nkGLFW3.Backend(first)
+counterBackend = nkGLFW3.Backend(second, share=overviewBackend)
+
+# Install a key handler
+def on_key(window, key, scancode, action, mods):
+    if key == glfw.GLFW_KEY_ESCAPE and action == glfw.GLFW_PRESS:
+        glfw.glfwSetWindowShouldClose(window,1)
+glfw.glfwSetKeyCallback(first, on_key)
+glfw.glfwSetKeyCallback(second, on_key)
+
+clicks = 0
+
+def build_counter(nuklear):
+    global clicks
+    if(nuklear.begin(title="Counter",
+                     bounds=nk.Rect(10.0,10.0,300.0,200.0),
+                     flags=nk.WINDOW_BORDER
+                       |nk.WINDOW_MOVABLE
+                       |nk.WINDOW_TITLE)):
+        nuklear.layout_row_dynamic(height=30.0,
+                                   cols=1)
+        if nuklear.button_label(title="click"):
+            clicks += 1
+        nuklear.label(text="clicked %d times" % clicks,
+                      alignment=nk.TEXT_LEFT)
+    nuklear.end()
+
+windows = ((overviewBackend, overview), (counterBackend, build_counter))
+
+while not glfw.glfwWindowShouldClose(first) and not glfw.glfwWindowShouldClose(second):
+    glfw.glfwPollEvents()
+
+    # each window's frame is built, rendered and swapped with its backend
+    # and GL context current
+    for backend, build in windows:
+        backend.make_current()
+        nkGLFW3.glfw3_new_frame()
+        build(backend.nuklear)
+
+        width, height = glfw.glfwGetFramebufferSize(backend.window)
+        gl.glViewport(0, 0, width, height)
+        gl.glClearColor(0.1, 0.18, 0.24, 1.0)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        nkGLFW3.glfw3_render(nk.ANTI_ALIASING_ON, 128 * 1024, 32 * 1024)
+        glfw.glfwSwapBuffers(backend.window)
+
+# the backend sharing the font texture goes first
+counterBackend.destroy()
+overviewBackend.destroy()
+glfw.glfwTerminate()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+#Copyright (c) 2017-2018 William Emerison Six
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+
+import sys
+import os
+import ctypes
+
+import builtins
+pwd = os.path.dirname(os.path.abspath(__file__))
+builtins.NUKLEAR_PATH = ctypes.CDLL(os.path.join(pwd, '..', '..', 'contrib', 'nuklear', 'nuklearHeadless.so'))
+
+import nuklear as nk
+import nuklearHeadless as nkHeadless
+from demo.overview import *
+
+
+
+if __name__ != '__main__':
+    sys.exit(1)
+
+
+# renders one frame of the overview without a window or a GPU, and
+# writes it to the file named on the command line (overview.ppm by
+# default)
+path = sys.argv[1] if len(sys.argv) > 1 else 'overview.ppm'
+
+ctx = nkHeadless.init()
+nuklear = nk.NuklearContext(ctx)
+framebuffer = nkHeadless.Framebuffer(1000, 1000)
+
+# nuklear lays windows out over a couple of frames, so only the last of
+# these is kept
+for frame in range(3):
+    nkHeadless.new_frame()
+    overview(nuklear)
+    image = framebuffer.render()
+
+height, width = image.shape[:2]
+with open(path, 'wb') as f:
+    f.write(b"P6\n%d %d\n255\n" % (width, height))
+    f.write(image[:, :, :3].tobytes())
+
+nkHeadless.headless_shutdown()
@@ -28,6 +28,10 @@ if __name__ == '__main__':
 import nuklear as nk
 import math
 
+# column widths for the basic widgets, built once.  nuklear reads the
+# ratios until the row is full, so they have to outlive layout_row
+ratio = nk.RowTemplate([120.0, 150.0])
+
 def overview(nuklear):
     # show overview
     # simulate a local static variable
@@ -333,15 +337,10 @@ def overview(nuklear):
                                             active= basicOption == C): basicOption = C
 
 
-                    #TODO -- figure out why this code isn't working quite correctly
-                    # nuklear.layout_row(layout_format=nk.STATIC,
-                    #                    height=30.0,
-                    #                    cols=2,
-                    #                    ratio=[120.0,150.0])
-                    # once I figure that out, delete the subsequent 3 lines
-                    nuklear.layout_row_static(height=30.0,
-                                              item_width=100,
-                                              cols=2)
+                    nuklear.layout_row(layout_format=nk.STATIC,
+                                       height=30.0,
+                                       cols=2,
+                                       ratio=ratio)
                     global basicSlider
                     try:
                         basicSlider
@@ -364,12 +363,10 @@ def overview(nuklear):
                                                                   value=floatSlider,
                                                                   maxV=5.0,
                                                                   step=0.5)
-                    #TODO -- figure out why this code isn't working quite correctly
-                    # nuklear.layout_row(NK_STATIC, 25, 2, ratio);
-                    # once I figure that out, delete the subsequent 3 lines
-                    nuklear.layout_row_static(height=25.0,
-                                              item_width=150,
-                                              cols=2)
+                    nuklear.layout_row(layout_format=nk.STATIC,
+                                       height=25.0,
+                                       cols=2,
+                                       ratio=ratio)
                     global basicFloat
                     try:
                         basicFloat
@@ -517,11 +514,9 @@ def overview(nuklear):
                                        minV=-1.0,
                                        maxV=1.0):
                     numberOfPoints = 32
-                    hoveredIndex = -1
-                    for x in range(32) :
-                        res = nuklear.chart_push(math.cos( x * (2*3.141592654) / numberOfPoints ))
-                        if res & nk.CHART_HOVERING:
-                            hoveredIndex = x
+                    # push all of the points in one call
+                    hoveredIndex, clickedIndex = nuklear.chart_push_values([math.cos( x * (2*3.141592654) / numberOfPoints )
+                                                                            for x in range(numberOfPoints)])
 
                     nuklear.chart_end()
 
@@ -426,6 +426,9 @@ glfwGetWindowUserPointer       = _glfw.glfwGetWindowUserPointer
 # glfwSetFramebufferSizeCallback = _glfw.glfwSetFramebufferSizeCallback
 glfwPollEvents                 = _glfw.glfwPollEvents
 glfwWaitEvents                 = _glfw.glfwWaitEvents
+glfwWaitEventsTimeout          = _glfw.glfwWaitEventsTimeout
+glfwWaitEventsTimeout.argtypes = [c_double]
+glfwPostEmptyEvent             = _glfw.glfwPostEmptyEvent
 
 # --- Input -------------------------------------------------------------------
 glfwGetInputMode               = _glfw.glfwGetInputMode
@@ -20,10 +20,15 @@
 
 import os
 import sys
+import gc
+import math
+import time
+import struct
 import ctypes.util
-from ctypes import (Structure, POINTER, CFUNCTYPE, byref, c_char_p, c_int, c_short,
-                    c_uint, c_double, c_float, c_ushort, c_byte, c_ubyte)
-import inspect
+import numpy as np
+from ctypes import (Structure, Union, POINTER, CFUNCTYPE, byref, c_char_p, c_int, c_short,
+                    c_uint, c_double, c_float, c_ushort, c_byte, c_ubyte, c_size_t,
+                    c_void_p)
 import builtins
 
 if __name__ == '__main__':
@@ -40,19 +45,207 @@ else:
     sys.exit(1)
 _nuklear = NUKLEAR_PATH
 
+# the same library, called without releasing the GIL.  a ctypes.CDLL
+# call releases the GIL and takes it back afterwards, which costs more
+# than most nuklear procedures do
+_nuklearHoldingGIL = ctypes.PyDLL(_nuklear._name, handle=_nuklear._handle)
+
+# procedures which still release the GIL, because they may block, or run
+# long enough that other Python threads should run meanwhile: rendering,
+# converting, baking fonts, and the GL setup and teardown of the
+# backends.  every other procedure keeps the GIL.  a
+# builtins.NUKLEAR_RELEASE_GIL dict of procedure names to True or False,
+# set before importing nuklear, overrides entries of this table
+RELEASE_GIL = {
+    'nkWrapper_replay': True,
+    'nkWrapper_commands': True,
+    'nkWrapper_convert': True,
+    'nk_glfw3_init': True,
+    'nk_glfw3_shutdown': True,
+    'nk_glfw3_destroy': True,
+    'nk_glfw3_device_create': True,
+    'nk_glfw3_device_destroy': True,
+    'nk_glfw3_font_stash_end': True,
+    'nk_glfw3_render': True,
+    'nk_glfw3_render_flush': True,
+    'nk_glfw3_set_upload': True,
+    'nk_glfw3_set_pipelined': True,
+    'nk_headless_shutdown': True,
+    'nk_headless_font_stash_end': True,
+    'nk_headless_convert': True,
+}
+if hasattr(builtins, "NUKLEAR_RELEASE_GIL"):
+    RELEASE_GIL.update(builtins.NUKLEAR_RELEASE_GIL)
+
+
+# look up a procedure in the nuklear shared library and declare
+# its C signature.  ctypes only checks and converts arguments
+# for procedures which have argtypes set; without them every
+# call goes through slow generic conversion, and python floats
+# have to be wrapped in c_float by hand.  restype defaults to
+# None for void procedures.  see RELEASE_GIL for which library
+# handle the procedure is called through.  each call makes a function
+# object of its own, so a procedure may be declared more than once, with
+# different argtypes.
+def prototype(name, argtypes, restype=None):
+    if RELEASE_GIL.get(name, False):
+        procedure = _nuklear[name]
+    else:
+        procedure = _nuklearHoldingGIL[name]
+    procedure.argtypes = argtypes
+    procedure.restype = restype
+    return procedure
 
 
 
 # nuklear needs to uniquely identify widgets, and one
-# way to do so is to inspect the function caller's frame info
-# such as filename and line number.
+# way to do so is to hash the function caller's filename
+# together with its line number.
 #
-# since callerFrameInfo is a procedure called from an method called
-# from a c-wrapper procedure, we need the frame info
+# inspect.getframeinfo reads the caller's source from disk on
+# every call, which is far too slow for something done per widget
+# per frame.  Instead, the call site is identified by the caller's
+# filename plus a seed (the line number, unless an explicit id
+# is provided), and the hash is computed only the first time that
+# call site is seen.  the hashes are kept in two generations, like
+# StringCache's strings, so that ids generated at run time don't
+# grow the cache without bound.
+#
+# since callerFrameKey is a procedure called from an method called
+# from a c-wrapper procedure, we need the frame
 # from the caller which is three back.
-def callerFrameInfo():
-    previous_frame = inspect.currentframe().f_back.f_back.f_back
-    return inspect.getframeinfo(previous_frame)
+__call_site_hashes_max__ = 4096
+__call_site_hashes__ = {}
+__call_site_hashes_previous__ = {}
+
+def callerFrameKey(seed=None):
+    global __call_site_hashes__, __call_site_hashes_previous__
+    frame = sys._getframe(3)
+    if seed is None:
+        seed = frame.f_lineno
+    key = (frame.f_code.co_filename, seed)
+    try:
+        return __call_site_hashes__[key]
+    except KeyError:
+        pass
+    hashed = __call_site_hashes_previous__.pop(key, None)
+    if hashed is None:
+        filename = str.encode(key[0])
+        hashed = c_uint(__murmur_hash__(filename, len(filename), c_uint(seed)))
+    if len(__call_site_hashes__) >= __call_site_hashes_max__ // 2:
+        __call_site_hashes_previous__ = __call_site_hashes__
+        __call_site_hashes__ = {}
+    __call_site_hashes__[key] = hashed
+    return hashed
+
+
+# nuklear takes C strings, so every title and label has to be encoded
+# before it is handed over, and most of them are the same from one frame
+# to the next.  stringCache keeps the encoded bytes so that a static
+# label is only encoded once.
+#
+# the cache is bounded by keeping two generations of strings.  when the
+# current generation fills up it becomes the previous one, strings found
+# in the previous generation are moved back into the current one, and
+# strings which are not used before the next rollover are dropped.  this
+# approximates least recently used eviction without any bookkeeping on a
+# hit.
+#
+# bytes are already encoded, so they are passed through untouched.
+class StringCache:
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.clear()
+
+    def clear(self):
+        self.current = {}
+        self.previous = {}
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, s):
+        if type(s) is bytes:
+            return s
+        try:
+            b = self.current[s]
+        except KeyError:
+            b = self.previous.pop(s, None)
+            if b is None:
+                self.misses += 1
+                b = str.encode(s)
+            else:
+                self.hits += 1
+            if len(self.current) >= self.maxsize // 2:
+                self.previous = self.current
+                self.current = {}
+            self.current[s] = b
+            return b
+        self.hits += 1
+        return b
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self.current) + len(self.previous),
+                'maxsize': self.maxsize}
+
+stringCache = StringCache()
+__encode__ = stringCache.encode
+
+
+# the widths measured by NuklearContext.get_text_width, keyed by the
+# font, font height and button padding they were measured with as well
+# as the string, so pushing and popping a font doesn't lose them.  the
+# least recently used widths are evicted like StringCache's strings.
+class TextWidthCache:
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self.clear()
+
+    def clear(self):
+        self.current = {}
+        self.previous = {}
+        self.hits = 0
+        self.misses = 0
+
+    # the cached width, or None
+    def get(self, key):
+        try:
+            width = self.current[key]
+        except KeyError:
+            width = self.previous.pop(key, None)
+            if width is None:
+                self.misses += 1
+                return None
+            self.put(key, width)
+        self.hits += 1
+        return width
+
+    def put(self, key, width):
+        if len(self.current) >= self.maxsize // 2:
+            self.previous = self.current
+            self.current = {}
+        self.current[key] = width
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self.current) + len(self.previous),
+                'maxsize': self.maxsize}
+
+# a rebuilt font atlas may put a font with different metrics at the
+# address of an old one, so the backends call fontsRebuilt from their
+# font_stash_end, and get_text_width drops every cached width when
+# fontGeneration has changed since it last looked
+fontGeneration = 0
+
+def fontsRebuilt():
+    global fontGeneration
+    fontGeneration += 1
 
 
 
@@ -88,8 +281,8 @@ class Vec2(Structure):
                  ('y',  c_float)]
 
     def __init__(self,x,y):
-        self.x = ctypes.c_float(x)
-        self.y = ctypes.c_float(y)
+        self.x = x
+        self.y = y
 
 
 class Vec2i(Structure):
@@ -233,8 +426,7 @@ SYMBOL_MAX=13
 # int nk_init_fixed(struct nk_context*, void *memory, nk_size size, const struct nk_user_font*);
 # int nk_init(struct nk_context*, struct nk_allocator*, const struct nk_user_font*);
 # int nk_init_custom(struct nk_context*, struct nk_buffer *cmds, struct nk_buffer *pool, const struct nk_user_font*);
-clear = _nuklear.nk_clear
-clear.arglist = [POINTER(Context)]
+clear = prototype('nk_clear', [POINTER(Context)])
 # void nk_free(struct nk_context*);
 # void nk_set_user_data(struct nk_context*, nk_handle handle);
 
@@ -281,20 +473,15 @@ BUTTON_DOUBLE=3
 BUTTON_MAX=4
 
 #TODO
-input_begin = _nuklear.nk_input_begin
-input_begin.arglist = [POINTER(Context)]
+input_begin = prototype('nk_input_begin', [POINTER(Context)])
 
-input_motion = _nuklear.nk_input_motion
-input_motion.arglist = [POINTER(Context), c_int, c_int]
+input_motion = prototype('nk_input_motion', [POINTER(Context), c_int, c_int])
 
-input_key = _nuklear.nk_input_key
-input_key.arglist = [POINTER(Context), c_int, c_int]
+input_key = prototype('nk_input_key', [POINTER(Context), c_int, c_int])
 
-input_button = _nuklear.nk_input_button
-input_button.arglist = [POINTER(Context), c_int, c_int, c_int, c_int]
+input_button = prototype('nk_input_button', [POINTER(Context), c_int, c_int, c_int, c_int])
 
-input_scroll = _nuklear.nk_input_scroll
-input_scroll.arglist = [POINTER(Context), Vec2]
+input_scroll = prototype('nk_input_scroll', [POINTER(Context), Vec2])
 
 # TODO
 # input_char = _nuklear.nk_input_char
@@ -309,8 +496,7 @@ input_scroll.arglist = [POINTER(Context), Vec2]
 # input_unicode = _nuklear.nk_input_unicode
 # input_unicode.arglist = [POINTER(Context, Rune)]
 
-input_end = _nuklear.nk_input_end
-input_end.arglist = [POINTER(Context)]
+input_end = prototype('nk_input_end', [POINTER(Context)])
 
 # Drawing
 ANTI_ALIASING_OFF=0
@@ -318,28 +504,58 @@ ANTI_ALIASING_ON=1
 
 CONVERT_SUCCESS = 0
 CONVERT_INVALID_PARAM = 1
-CONVERT_COMMAND_BUFFER_FULL = 1 << 0
-CONVERT_VERTEX_BUFFER_FULL = 1 << 1
-CONVERT_ELEMENT_BUFFER_FULL = 1 << 2
-
-
-#TODO
-# struct nk_draw_null_texture {
-#     nk_handle texture; /* texture handle to a texture with a white pixel */
-#     struct nk_vec2 uv; /* coordinates to a white pixel in the texture  */
-# };
-# struct nk_convert_config {
-#     float global_alpha; /* global alpha value */
-#     enum nk_anti_aliasing line_AA; /* line anti-aliasing flag can be turned off if you are tight on memory */
-#     enum nk_anti_aliasing shape_AA; /* shape anti-aliasing flag can be turned off if you are tight on memory */
-#     unsigned circle_segment_count; /* number of segments used for circles: default to 22 */
-#     unsigned arc_segment_count; /* number of segments used for arcs: default to 22 */
-#     unsigned curve_segment_count; /* number of segments used for curves: default to 22 */
-#     struct nk_draw_null_texture null; /* handle to texture with a white pixel for shape drawing */
-#     const struct nk_draw_vertex_layout_element *vertex_layout; /* describes the vertex output format and packing */
-#     nk_size vertex_size; /* sizeof one vertex for vertex packing */
-#     nk_size vertex_alignment; /* vertex alignment: Can be obtained by NK_ALIGNOF */
-# };
+CONVERT_COMMAND_BUFFER_FULL = 1 << 1
+CONVERT_VERTEX_BUFFER_FULL = 1 << 2
+CONVERT_ELEMENT_BUFFER_FULL = 1 << 3
+
+
+# nk_handle, either a pointer or an integer id such as an OpenGL texture
+class TextureHandle(Union):
+    _fields_ = [ ('ptr',  c_void_p),
+                 ('id',  c_int)]
+
+# a texture with a white pixel at uv, which nk_convert uses for every
+# shape that isn't text or an image.  nk_font_atlas_end fills it in, the
+# backends return theirs with nk_glfw3_null_texture etc.
+class DrawNullTexture(Structure):
+    _fields_ = [ ('texture',  TextureHandle),
+                 ('uv',  Vec2)]
+
+class DrawVertexLayoutElement(Structure):
+    _fields_ = [ ('attribute',  c_int),
+                 ('format',  c_int),
+                 ('offset',  c_size_t)]
+
+class ConvertConfig(Structure):
+    _fields_ = [ ('global_alpha',  c_float),
+                 ('line_AA',  c_int),
+                 ('shape_AA',  c_int),
+                 ('circle_segment_count',  c_uint),
+                 ('arc_segment_count',  c_uint),
+                 ('curve_segment_count',  c_uint),
+                 ('null',  DrawNullTexture),
+                 ('vertex_layout',  POINTER(DrawVertexLayoutElement)),
+                 ('vertex_size',  c_size_t),
+                 ('vertex_alignment',  c_size_t)]
+
+    # vertex is a NumPy structured dtype whose fields are the position, uv
+    # and color of a vertex, see vertexLayout.  null is the backend's
+    # DrawNullTexture
+    def __init__(self, vertex, null,
+                 anti_aliasing=ANTI_ALIASING_ON,
+                 global_alpha=1.0,
+                 segment_count=22):
+        self.global_alpha = global_alpha
+        self.line_AA = anti_aliasing
+        self.shape_AA = anti_aliasing
+        self.circle_segment_count = segment_count
+        self.arc_segment_count = segment_count
+        self.curve_segment_count = segment_count
+        self.null = null
+        # the structure keeps the layout array alive
+        self.vertex_layout = vertexLayout(vertex)
+        self.vertex_size = vertex.itemsize
+        self.vertex_alignment = max(vertex.fields[name][0].base.alignment for name in vertex.names)
 
 # const struct nk_command* nk__begin(struct nk_context*);
 # const struct nk_command* nk__next(struct nk_context*, const struct nk_command*);
@@ -363,191 +579,115 @@ WINDOW_BACKGROUND        = 1 << 8
 WINDOW_SCALE_LEFT        = 1 << 9
 WINDOW_NO_INPUT          = 1 << 10
 
-__begin__ = _nuklear.nk_begin
-__begin__.arglist = [POINTER(Context), c_char_p, Rect, c_uint]
-__begin__.restype = c_int
+__begin__ = prototype('nk_begin', [POINTER(Context), c_char_p, Rect, c_uint], c_int)
 
 
-__begin_titled__ = _nuklear.nk_begin_titled
-__begin_titled__.arglist = [POINTER(Context), c_char_p, c_char_p, Rect, c_int]
-__begin_titled__.restype = c_int
+__begin_titled__ = prototype('nk_begin_titled', [POINTER(Context), c_char_p, c_char_p, Rect, c_int], c_int)
 
-__end__            = _nuklear.nk_end
-__end__.arglist    = [POINTER(Context)]
+__end__ = prototype('nk_end', [POINTER(Context)])
 # struct nk_window *nk_window_find(POINTER(Context), c_char_p name);
-__window_get_bounds__ = _nuklear.nk_window_get_bounds
-__window_get_bounds__.arglist = [POINTER(Context)]
-__window_get_bounds__.restype = Rect
+__window_get_bounds__ = prototype('nk_window_get_bounds', [POINTER(Context)], Rect)
 
-__window_get_position__ = _nuklear.nk_window_get_position
-__window_get_position__.arglist = [POINTER(Context)]
-__window_get_position__.restype = Vec2
+__window_get_position__ = prototype('nk_window_get_position', [POINTER(Context)], Vec2)
 
-__window_get_size__ = _nuklear.nk_window_get_size
-__window_get_size__.arglist = [POINTER(Context)]
-__window_get_size__.restype = Vec2
+__window_get_size__ = prototype('nk_window_get_size', [POINTER(Context)], Vec2)
 
-__window_get_width__ = _nuklear.nk_window_get_width
-__window_get_width__.arglist = [POINTER(Context)]
-__window_get_width__.restype = c_float
+__window_get_width__ = prototype('nk_window_get_width', [POINTER(Context)], c_float)
 
-__window_get_height__ = _nuklear.nk_window_get_height
-__window_get_height__.arglist = [POINTER(Context)]
-__window_get_height__.restype = c_float
+__window_get_height__ = prototype('nk_window_get_height', [POINTER(Context)], c_float)
 
 # struct nk_panel* nk_window_get_panel(POINTER(Context));
 
-__nk_window_get_content_region__ = _nuklear.nk_window_get_content_region
-__nk_window_get_content_region__.arglist = [POINTER(Context)]
-__nk_window_get_content_region__.restype = Rect
+__nk_window_get_content_region__ = prototype('nk_window_get_content_region', [POINTER(Context)], Rect)
 
-__nk_window_get_content_region_min__ = _nuklear.nk_window_get_content_region_min
-__nk_window_get_content_region_min__.arglist = [POINTER(Context)]
-__nk_window_get_content_region_min__.restype = Vec2
+__nk_window_get_content_region_min__ = prototype('nk_window_get_content_region_min', [POINTER(Context)], Vec2)
 
-__nk_window_get_content_region_max__ = _nuklear.nk_window_get_content_region_max
-__nk_window_get_content_region_max__.arglist = [POINTER(Context)]
-__nk_window_get_content_region_max__.restype = Vec2
+__nk_window_get_content_region_max__ = prototype('nk_window_get_content_region_max', [POINTER(Context)], Vec2)
 
 # Vec2 nk_window_get_content_region_size(POINTER(Context));
 # struct nk_command_buffer* nk_window_get_canvas(POINTER(Context));
 
-__window_has_focus__ = _nuklear.nk_window_has_focus
-__window_has_focus__.arglist = [POINTER(Context)]
-__window_has_focus__.restype = c_int
+__window_has_focus__ = prototype('nk_window_has_focus', [POINTER(Context)], c_int)
 
-__window_is_collapsed__ = _nuklear.nk_window_is_collapsed
-__window_is_collapsed__.arglist = [POINTER(Context), c_char_p]
-__window_is_collapsed__.restype = c_int
+__window_is_collapsed__ = prototype('nk_window_is_collapsed', [POINTER(Context), c_char_p], c_int)
 
-__window_is_closed__ = _nuklear.nk_window_is_closed
-__window_is_closed__.arglist = [POINTER(Context), c_char_p]
-__window_is_closed__.restype = c_int
+__window_is_closed__ = prototype('nk_window_is_closed', [POINTER(Context), c_char_p], c_int)
 
-__window_is_hidden__ = _nuklear.nk_window_is_hidden
-__window_is_hidden__.arglist = [POINTER(Context), c_char_p]
-__window_is_hidden__.restype = c_int
+__window_is_hidden__ = prototype('nk_window_is_hidden', [POINTER(Context), c_char_p], c_int)
 
-__window_is_active__ = _nuklear.nk_window_is_active
-__window_is_active__.arglist = [POINTER(Context), c_char_p]
-__window_is_active__.restype = c_int
+__window_is_active__ = prototype('nk_window_is_active', [POINTER(Context), c_char_p], c_int)
 
-__window_is_hovered__ = _nuklear.nk_window_is_hovered
-__window_is_hovered__.arglist = [POINTER(Context)]
-__window_is_hovered__.restype = c_int
+__window_is_hovered__ = prototype('nk_window_is_hovered', [POINTER(Context)], c_int)
 
-__window_is_any_hovered__ = _nuklear.nk_window_is_any_hovered
-__window_is_any_hovered__.arglist = [POINTER(Context)]
-__window_is_any_hovered__.restype = c_int
+__window_is_any_hovered__ = prototype('nk_window_is_any_hovered', [POINTER(Context)], c_int)
 
 
-__item_is_any_active__ = _nuklear.nk_item_is_any_active
-__item_is_any_active__.arglist = [POINTER(Context)]
-__item_is_any_active__.restype = c_int
+__item_is_any_active__ = prototype('nk_item_is_any_active', [POINTER(Context)], c_int)
 
-__window_set_bounds__ = _nuklear.nk_window_set_bounds
-__window_set_bounds__.arglist = [POINTER(Context), c_char_p, Rect]
+__window_set_bounds__ = prototype('nk_window_set_bounds', [POINTER(Context), c_char_p, Rect])
 
-__window_set_position__ = _nuklear.nk_window_set_position
-__window_set_position__.arglist = [POINTER(Context), c_char_p, Vec2]
+__window_set_position__ = prototype('nk_window_set_position', [POINTER(Context), c_char_p, Vec2])
 
-__window_set_size__ = _nuklear.nk_window_set_size
-__window_set_size__.arglist = [POINTER(Context), c_char_p, Vec2]
+__window_set_size__ = prototype('nk_window_set_size', [POINTER(Context), c_char_p, Vec2])
 
-__window_set_focus__ = _nuklear.nk_window_set_focus
-__window_set_focus__.arglist = [POINTER(Context), c_char_p]
+__window_set_focus__ = prototype('nk_window_set_focus', [POINTER(Context), c_char_p])
 
-__window_close__ = _nuklear.nk_window_close
-__window_close__.arglist = [POINTER(Context), c_char_p]
+__window_close__ = prototype('nk_window_close', [POINTER(Context), c_char_p])
 
-__window_collapse__ = _nuklear.nk_window_collapse
-__window_collapse__.arglist = [POINTER(Context), c_char_p, c_int]
+__window_collapse__ = prototype('nk_window_collapse', [POINTER(Context), c_char_p, c_int])
 
-__window_collapse_if__ = _nuklear.nk_window_collapse_if
-__window_collapse_if__.arglist = [POINTER(Context), c_char_p, c_int, c_int]
+__window_collapse_if__ = prototype('nk_window_collapse_if', [POINTER(Context), c_char_p, c_int, c_int])
 
-__window_show__ = _nuklear.nk_window_show
-__window_show__.arglist = [POINTER(Context), c_char_p, c_int]
+__window_show__ = prototype('nk_window_show', [POINTER(Context), c_char_p, c_int])
 
-__window_show_if__ = _nuklear.nk_window_show_if
-__window_show_if__.arglist = [POINTER(Context), c_char_p, c_int, c_int]
+__window_show_if__ = prototype('nk_window_show_if', [POINTER(Context), c_char_p, c_int, c_int])
 
 # Layout
-__layout_set_min_row_height__ = _nuklear.nk_layout_set_min_row_height
-__layout_set_min_row_height__.arglist = [POINTER(Context), c_float]
+__layout_set_min_row_height__ = prototype('nk_layout_set_min_row_height', [POINTER(Context), c_float])
 
-__layout_reset_min_row_height__ = _nuklear.nk_layout_reset_min_row_height
-__layout_reset_min_row_height__.arglist = [POINTER(Context)]
+__layout_reset_min_row_height__ = prototype('nk_layout_reset_min_row_height', [POINTER(Context)])
 
-__layout_widget_bounds__ = _nuklear.nk_layout_widget_bounds
-__layout_widget_bounds__.arglist = [POINTER(Context)]
-__layout_widget_bounds__.restype = Rect
+__layout_widget_bounds__ = prototype('nk_layout_widget_bounds', [POINTER(Context)], Rect)
 
-__layout_ratio_from_pixel__ = _nuklear.nk_layout_ratio_from_pixel
-__layout_ratio_from_pixel__.arglist = [POINTER(Context), c_float]
-__layout_ratio_from_pixel__.restype = c_float
+__layout_ratio_from_pixel__ = prototype('nk_layout_ratio_from_pixel', [POINTER(Context), c_float], c_float)
 
-__layout_row_dynamic__ = _nuklear.nk_layout_row_dynamic
-__layout_row_dynamic__.arglist = [POINTER(Context), c_float, c_int]
+__layout_row_dynamic__ = prototype('nk_layout_row_dynamic', [POINTER(Context), c_float, c_int])
 
-__layout_row_static__ = _nuklear.nk_layout_row_static
-__layout_row_static__.arglist = [POINTER(Context), c_float, c_int, c_int]
+__layout_row_static__ = prototype('nk_layout_row_static', [POINTER(Context), c_float, c_int, c_int])
 
-__layout_row_begin__ = _nuklear.nk_layout_row_begin
-__layout_row_begin__.arglist = [POINTER(Context), c_int, c_float, c_int]
+__layout_row_begin__ = prototype('nk_layout_row_begin', [POINTER(Context), c_int, c_float, c_int])
 
-__layout_row_push__ = _nuklear.nk_layout_row_push
-__layout_row_push__.arglist = [POINTER(Context), c_float]
+__layout_row_push__ = prototype('nk_layout_row_push', [POINTER(Context), c_float])
 
-__layout_row_end__ = _nuklear.nk_layout_row_end
-__layout_row_end__.arglist = [POINTER(Context)]
+__layout_row_end__ = prototype('nk_layout_row_end', [POINTER(Context)])
 
-__layout_row__ = _nuklear.nk_layout_row
-__layout_row__.arglist = [POINTER(Context), c_int, c_float, c_int, POINTER(c_float)]
+__layout_row__ = prototype('nk_layout_row', [POINTER(Context), c_int, c_float, c_int, c_void_p])
 
-__layout_row_template_begin__ = _nuklear.nk_layout_row_template_begin
-__layout_row_template_begin__.arglist = [POINTER(Context), c_float]
+__layout_row_template_begin__ = prototype('nk_layout_row_template_begin', [POINTER(Context), c_float])
 
-__layout_row_template_push_dynamic__ = _nuklear.nk_layout_row_template_push_dynamic
-__layout_row_template_push_dynamic__.arglist = [POINTER(Context)]
+__layout_row_template_push_dynamic__ = prototype('nk_layout_row_template_push_dynamic', [POINTER(Context)])
 
-__layout_row_template_push_variable__ = _nuklear.nk_layout_row_template_push_variable
-__layout_row_template_push_variable__.arglist = [POINTER(Context), c_float ]
+__layout_row_template_push_variable__ = prototype('nk_layout_row_template_push_variable', [POINTER(Context), c_float])
 
-__layout_row_template_push_static__ = _nuklear.nk_layout_row_template_push_static
-__layout_row_template_push_static__.arglist = [POINTER(Context), c_float]
+__layout_row_template_push_static__ = prototype('nk_layout_row_template_push_static', [POINTER(Context), c_float])
 
-__layout_row_template_end__ = _nuklear.nk_layout_row_template_end
-__layout_row_template_end__.arglist = [POINTER(Context)]
+__layout_row_template_end__ = prototype('nk_layout_row_template_end', [POINTER(Context)])
 
-__layout_space_begin__ = _nuklear.nk_layout_space_begin
-__layout_space_begin__.arglist = [POINTER(Context), c_int, c_float, c_int]
+__layout_space_begin__ = prototype('nk_layout_space_begin', [POINTER(Context), c_int, c_float, c_int])
 
-__layout_space_push__ = _nuklear.nk_layout_space_push
-__layout_space_push__.arglist = [POINTER(Context), Rect]
+__layout_space_push__ = prototype('nk_layout_space_push', [POINTER(Context), Rect])
 
-__layout_space_end__ = _nuklear.nk_layout_space_end
-__layout_space_end__.arglist = [POINTER(Context)]
+__layout_space_end__ = prototype('nk_layout_space_end', [POINTER(Context)])
 
-__layout_space_bounds__ = _nuklear.nk_layout_space_bounds
-__layout_space_bounds__.arglist = [POINTER(Context)]
-__layout_space_bounds__.restype = Rect
+__layout_space_bounds__ = prototype('nk_layout_space_bounds', [POINTER(Context)], Rect)
 
-__layout_space_to_screen__ = _nuklear.nk_layout_space_to_screen
-__layout_space_to_screen__.arglist = [POINTER(Context), Vec2]
-__layout_space_to_screen__.restype = Vec2
+__layout_space_to_screen__ = prototype('nk_layout_space_to_screen', [POINTER(Context), Vec2], Vec2)
 
-__layout_space_to_local__ = _nuklear.nk_layout_space_to_local
-__layout_space_to_local__.arglist = [POINTER(Context), Vec2]
-__layout_space_to_local__.restype = Vec2
+__layout_space_to_local__ = prototype('nk_layout_space_to_local', [POINTER(Context), Vec2], Vec2)
 
-__layout_space_rect_to_screen__ = _nuklear.nk_layout_space_rect_to_screen
-__layout_space_rect_to_screen__.arglist = [POINTER(Context), Rect]
-__layout_space_rect_to_screen__.restype = Rect
+__layout_space_rect_to_screen__ = prototype('nk_layout_space_rect_to_screen', [POINTER(Context), Rect], Rect)
 
-__layout_space_rect_to_local__ = _nuklear.nk_layout_space_rect_to_local
-__layout_space_rect_to_local__.arglist = [POINTER(Context), Rect]
-__layout_space_rect_to_local__.restype = Rect
+__layout_space_rect_to_local__ = prototype('nk_layout_space_rect_to_local', [POINTER(Context), Rect], Rect)
 
 
 
@@ -561,38 +701,34 @@ __layout_space_rect_to_local__.restype = Rect
 
 # List View
 
-# struct nk_list_view {
-# /* public: */
-#     int begin, end, count;
-# /* private: */
-#     int total_height;
-#     struct nk_context *ctx;
-#     nk_uint *scroll_pointer;
-#     nk_uint scroll_value;
-# };
-# int nk_list_view_begin(struct nk_context*, struct nk_list_view *out, const char *id, nk_flags, int row_height, int row_count);
-# void nk_list_view_end(struct nk_list_view*);
+# only the rows in [begin, end) are visible, the rest of the list is
+# represented by the scrollbar.
+class ListView(Structure):
+    _fields_ = [ ('begin',  c_int),
+                 ('end',  c_int),
+                 ('count',  c_int),
+                 ('total_height',  c_int),
+                 ('ctx',  c_void_p),
+                 ('scroll_pointer',  POINTER(c_uint)),
+                 ('scroll_value',  c_uint)]
+
+__list_view_begin__ = prototype('nk_list_view_begin', [POINTER(Context), POINTER(ListView), c_char_p, c_uint, c_int, c_int], c_int)
+
+__list_view_end__ = prototype('nk_list_view_end', [POINTER(ListView)])
 
 # Tree
-__tree_push_hashed__ = _nuklear.nk_tree_push_hashed
-__tree_push_hashed__.arglist = [POINTER(Context), c_int, c_char_p, c_int, c_char_p,c_int,c_int]
-__tree_push_hashed__.restype = c_int
+__tree_push_hashed__ = prototype('nk_tree_push_hashed', [POINTER(Context), c_int, c_char_p, c_int, c_char_p, c_int, c_int], c_int)
 
 def __tree_push__(ctx, theType, title, state):
-    (filename, line_number,
-     function_name, lines, index) = callerFrameInfo()
-    return __tree_push_hashed__(ctx, theType, str.encode(title), state, filename, len(filename),line_number)
+    return __tree_push_hash__(ctx, theType, __encode__(title), state, callerFrameKey())
 
 def __tree_push_id__(ctx, theType, title, state, id):
-    (filename, line_number,
-     function_name, lines, index) = callerFrameInfo()
-    return __tree_push_hashed__(ctx, theType, str.encode(title), state, filename, len(filename),id)
+    return __tree_push_hash__(ctx, theType, __encode__(title), state, callerFrameKey(id))
 
 
 # int nk_tree_image_push_hashed(struct nk_context*, enum nk_tree_type, struct nk_image, const char *title, enum nk_collapse_states initial_state, const char *hash, int len,int seed);
 
-__tree_pop__ = _nuklear.nk_tree_pop
-__tree_pop__.arglist = [POINTER(Context)]
+__tree_pop__ = prototype('nk_tree_pop', [POINTER(Context)])
 
 # int nk_tree_state_push(struct nk_context*, enum nk_tree_type, const char *title, enum nk_collapse_states *state);
 # int nk_tree_state_image_push(struct nk_context*, enum nk_tree_type, struct nk_image, const char *title, enum nk_collapse_states *state);
@@ -617,22 +753,16 @@ WIDGET_STATE_ACTIVE      = WIDGET_STATE_ACTIVED|WIDGET_STATE_MODIFIED
 
 # enum nk_widget_layout_states nk_widget(struct nk_rect*, const struct nk_context*);
 # enum nk_widget_layout_states nk_widget_fitting(struct nk_rect*, struct nk_context*, struct nk_vec2);
-__widget_bounds__ = _nuklear.nk_widget_bounds
-__widget_bounds__.arglist = [POINTER(Context)]
-__widget_bounds__.restype = Rect
+__widget_bounds__ = prototype('nk_widget_bounds', [POINTER(Context)], Rect)
 # struct nk_vec2 nk_widget_position(struct nk_context*);
 # struct nk_vec2 nk_widget_size(struct nk_context*);
-__widget_width__ = _nuklear.nk_widget_width
-__widget_width__.arglist = [POINTER(Context)]
-__widget_width__.restype = c_float
+__widget_width__ = prototype('nk_widget_width', [POINTER(Context)], c_float)
 
-__widget_height__ = _nuklear.nk_widget_height
-__widget_height__.arglist = [POINTER(Context)]
-__widget_height__.restype = c_float
+__widget_height__ = prototype('nk_widget_height', [POINTER(Context)], c_float)
 # int nk_widget_is_hovered(struct nk_context*);
 # int nk_widget_is_mouse_clicked(struct nk_context*, enum nk_buttons);
 # int nk_widget_has_mouse_click_down(struct nk_context*, enum nk_buttons, int down);
-# void nk_spacing(struct nk_context*, int cols);
+__spacing__ = prototype('nk_spacing', [POINTER(Context), c_int])
 
 
 # Text
@@ -649,21 +779,17 @@ TEXT_CENTERED    = TEXT_ALIGN_MIDDLE|TEXT_ALIGN_CENTERED
 TEXT_RIGHT       = TEXT_ALIGN_MIDDLE|TEXT_ALIGN_RIGHT
 
 
-__text__ = _nuklear.nk_text
-__text__.arglist = [POINTER(Context), c_char_p, c_int, c_int]
+__text__ = prototype('nk_text', [POINTER(Context), c_char_p, c_int, c_int])
 
 # void nk_text_colored(struct nk_context*, const char*, int, nk_flags, struct nk_color);
 # void nk_text_wrap(struct nk_context*, const char*, int);
 # void nk_text_wrap_colored(struct nk_context*, const char*, int, struct nk_color);
 
-__label__ = _nuklear.nk_label
-__label__.arglist = [POINTER(Context), c_char_p, c_uint]
+__label__ = prototype('nk_label', [POINTER(Context), c_char_p, c_uint])
 
-__label_colored__ = _nuklear.nk_label_colored
-__label_colored__.arglist = [POINTER(Context), c_char_p, c_int, Color]
+__label_colored__ = prototype('nk_label_colored', [POINTER(Context), c_char_p, c_int, Color])
 
-__label_wrap__ = _nuklear.nk_label_wrap
-__label_wrap__.arglist = [POINTER(Context), c_char_p]
+__label_wrap__ = prototype('nk_label_wrap', [POINTER(Context), c_char_p])
 
 
 # void nk_label_colored_wrap(struct nk_context*, const char*, struct nk_color);
@@ -688,24 +814,16 @@ __label_wrap__.arglist = [POINTER(Context), c_char_p]
 # Button
 
 # int nk_button_text(struct nk_context*, const char *title, int len);
-__button_label__ = _nuklear.nk_button_label
-__button_label__.arglist = [POINTER(Context), c_char_p]
-__button_label__.restype     = c_int
+__button_label__ = prototype('nk_button_label', [POINTER(Context), c_char_p], c_int)
 
 
-__button_color__ = _nuklear.nk_button_color
-__button_color__.arglist = [POINTER(Context), Color]
-__button_color__.restype = c_int
+__button_color__ = prototype('nk_button_color', [POINTER(Context), Color], c_int)
 
-__button_symbol__ = _nuklear.nk_button_symbol
-__button_symbol__.arglist = [POINTER(Context), c_int]
-__button_symbol__.restype = c_int
+__button_symbol__ = prototype('nk_button_symbol', [POINTER(Context), c_int], c_int)
 
 # int nk_button_image(struct nk_context*, struct nk_image img);
 
-__button_symbol_label__ = _nuklear.nk_button_symbol_label
-__button_symbol_label__.arglist = [POINTER(Context), c_int, c_char_p, c_int]
-__button_symbol_label__.restype = c_int
+__button_symbol_label__ = prototype('nk_button_symbol_label', [POINTER(Context), c_int, c_char_p, c_int], c_int)
 
 # int nk_button_symbol_text(struct nk_context*, enum nk_symbol_type, const char*, int, nk_flags alignment);
 # int nk_button_image_label(struct nk_context*, struct nk_image img, const char*, nk_flags text_alignment);
@@ -720,8 +838,7 @@ __button_symbol_label__.restype = c_int
 # int nk_button_image_text_styled(struct nk_context*,const struct nk_style_button*, struct nk_image img, const char*, int, nk_flags alignment);
 
 
-__button_set_behavior__ = _nuklear.nk_button_set_behavior
-__button_set_behavior__.arglist = [POINTER(Context), c_int]
+__button_set_behavior__ = prototype('nk_button_set_behavior', [POINTER(Context), c_int])
 
 # int nk_button_push_behavior(struct nk_context*, enum nk_button_behavior);
 # int nk_button_pop_behavior(struct nk_context*);
@@ -733,9 +850,7 @@ __button_set_behavior__.arglist = [POINTER(Context), c_int]
 # unsigned nk_check_flags_label(struct nk_context*, const char*, unsigned int flags, unsigned int value);
 # unsigned nk_check_flags_text(struct nk_context*, const char*, int, unsigned int flags, unsigned int value);
 
-__checkbox_label__ = _nuklear.nk_checkbox_label
-__checkbox_label__.arglist = [POINTER(Context), c_char_p, POINTER(c_int)]
-__checkbox_label__.restype = c_int
+__checkbox_label__ = prototype('nk_checkbox_label', [POINTER(Context), c_char_p, POINTER(c_int)], c_int)
 
 
 
@@ -749,16 +864,12 @@ __checkbox_label__.restype = c_int
 # int nk_radio_label(struct nk_context*, const char*, int *active);
 # int nk_radio_text(struct nk_context*, const char*, int, int *active);
 
-__option_label__ = _nuklear.nk_option_label
-__option_label__.arglist = [POINTER(Context), c_char_p, c_int]
-__option_label__.restype = c_int
+__option_label__ = prototype('nk_option_label', [POINTER(Context), c_char_p, c_int], c_int)
 
 
 # int nk_option_text(struct nk_context*, const char*, int, int active);
 
-__selectable_label__ = _nuklear.nk_selectable_label
-__selectable_label__.arglist = [POINTER(Context), c_char_p, c_int, POINTER(c_int)]
-__selectable_label__.restype = c_int
+__selectable_label__ = prototype('nk_selectable_label', [POINTER(Context), c_char_p, c_int, POINTER(c_int)], c_int)
 
 
 # Selectable
@@ -776,20 +887,18 @@ __selectable_label__.restype = c_int
 # float nk_slide_float(struct nk_context*, float min, float val, float max, float step);
 # int nk_slide_int(struct nk_context*, int min, int val, int max, int step);
 
-__slider_float__ = _nuklear.nk_slider_float
-__slider_float__.arglist = [POINTER(Context), c_float, POINTER(c_float), c_float, c_float]
-__slider_float__.restype = c_int
+__slider_float__ = prototype('nk_slider_float', [POINTER(Context), c_float, POINTER(c_float), c_float, c_float], c_int)
+
 
+__slider_int__ = prototype('nk_slider_int', [POINTER(Context), c_int, POINTER(c_int), c_int, c_int], c_int)
 
-__slider_int__ = _nuklear.nk_slider_int
-__slider_int__.arglist = [POINTER(Context), c_int, POINTER(c_int), c_int, c_int]
-__slider_int__.restype = c_int
+# the same, taking the address of the value, for slider_at
+__slider_float_at__ = prototype('nk_slider_float', [POINTER(Context), c_float, c_void_p, c_float, c_float], c_int)
+__slider_int_at__ = prototype('nk_slider_int', [POINTER(Context), c_int, c_void_p, c_int, c_int], c_int)
 
 
 
-__progress__ = _nuklear.nk_progress
-__progress__.arglist = [POINTER(Context), POINTER(c_int), c_int, c_int]
-__progress__.restype = c_int
+__progress__ = prototype('nk_progress', [POINTER(Context), POINTER(c_size_t), c_size_t, c_int], c_int)
 
 
 # ProgressBar
@@ -797,30 +906,28 @@ __progress__.restype = c_int
 # nk_size nk_prog(struct nk_context*, nk_size cur, nk_size max, int modifyable);
 
 # ColorPicker#
-__color_picker__ = _nuklear.nk_color_picker
-__color_picker__.arglist = [POINTER(Context), ColorF, c_int]
-__color_picker__.restype = ColorF
+__color_picker__ = prototype('nk_color_picker', [POINTER(Context), ColorF, c_int], ColorF)
 # int nk_color_pick(struct nk_context*, struct nk_colorf*, enum nk_color_format);
 
 
 # Properties
 
-__property_int__ = _nuklear.nk_property_int
-__property_int__.arglist = [POINTER(Context), c_char_p, c_int, c_int, c_int, c_int, c_float]
+__property_int__ = prototype('nk_property_int', [POINTER(Context), c_char_p, c_int, POINTER(c_int), c_int, c_int, c_float])
+
 
+__property_float__ = prototype('nk_property_float', [POINTER(Context), c_char_p, c_float, POINTER(c_float), c_float, c_float, c_float])
 
-__property_float__ = _nuklear.nk_property_float
-__property_float__.arglist = [POINTER(Context), c_char_p, c_float, POINTER(c_float), c_float, c_float, c_float]
+# the same, taking the address of the value, for property_at
+__property_int_at__ = prototype('nk_property_int', [POINTER(Context), c_char_p, c_int, c_void_p, c_int, c_int, c_float])
+__property_float_at__ = prototype('nk_property_float', [POINTER(Context), c_char_p, c_float, c_void_p, c_float, c_float, c_float])
+
+__property_grid__ = prototype('nkWrapper_property_grid', [POINTER(Context), c_void_p, c_int, c_int, POINTER(c_char_p), c_void_p, c_float, c_void_p], c_int)
 # void nk_property_double(struct nk_context*, const char *name, double min, double *val, double max, double step, float inc_per_pixel);
 
-__propertyi__ = _nuklear.nk_propertyi
-__propertyi__.arglist = [POINTER(Context), c_char_p, c_int, c_int, c_int, c_int, c_float]
-__propertyi__.restype = c_int
+__propertyi__ = prototype('nk_propertyi', [POINTER(Context), c_char_p, c_int, c_int, c_int, c_int, c_float], c_int)
 
 
-__propertyf__ = _nuklear.nk_propertyf
-__propertyf__.arglist = [POINTER(Context), c_char_p, c_float, c_float, c_float, c_float, c_float]
-__propertyf__.restype = c_float
+__propertyf__ = prototype('nk_propertyf', [POINTER(Context), c_char_p, c_float, c_float, c_float, c_float, c_float], c_float)
 # double nk_propertyd(struct nk_context*, const char *name, double min, double val, double max, double step, float inc_per_pixel);
 
 
@@ -861,50 +968,221 @@ EDIT_COMMITED    = 1 << 4
 # void nk_edit_unfocus(struct nk_context*);
 
 # Chart
-__chart_begin__ = _nuklear.nk_chart_begin
-__chart_begin__.arglist = [POINTER(Context), c_int, c_int, c_float, c_float]
-__chart_begin__.restype = c_int
+__chart_begin__ = prototype('nk_chart_begin', [POINTER(Context), c_int, c_int, c_float, c_float], c_int)
 
 # int nk_chart_begin_colored(struct nk_context*, enum nk_chart_type, struct nk_color, struct nk_color active, int num, float min, float max);
 # void nk_chart_add_slot(struct nk_context *ctx, const enum nk_chart_type, int count, float min_value, float max_value);
 # void nk_chart_add_slot_colored(struct nk_context *ctx, const enum nk_chart_type, struct nk_color, struct nk_color active, int count, float min_value, float max_value);
 
-__chart_push__ = _nuklear.nk_chart_push
-__chart_push__.arglist = [POINTER(Context), float]
-__chart_push__.restype = c_int
+__chart_push__ = prototype('nk_chart_push', [POINTER(Context), c_float], c_int)
+
+__chart_push_slot__ = prototype('nk_chart_push_slot', [POINTER(Context), c_float, c_int], c_uint)
 
-# nk_flags nk_chart_push_slot(struct nk_context*, float, int);
+__chart_push_slot_values__ = prototype('nkWrapper_chart_push_slot_values', [POINTER(Context), c_void_p, c_int, c_int, POINTER(c_int)], c_int)
 
-__chart_end__ = _nuklear.nk_chart_end
-__chart_end__.arglist = [POINTER(Context)]
+__chart_end__ = prototype('nk_chart_end', [POINTER(Context)])
+
+__plot__ = prototype('nk_plot', [POINTER(Context), c_int, c_void_p, c_int, c_int])
 
-# void nk_plot(struct nk_context*, enum nk_chart_type, const float *values, int count, int offset);
 # void nk_plot_function(struct nk_context*, enum nk_chart_type, void *userdata, float(*value_getter)(void* user, int index), int count, int offset);
 
 
+# the address and length of a sequence of float32 values, for passing
+# whole arrays to nuklear in one call.  float32 NumPy arrays and writable
+# buffers of C floats (array.array('f'), ...) are passed without copying,
+# anything else is copied into a temporary float array.  the returned
+# keepalive object must be held until nuklear is done with the values.
+__float32_typestr__ = ('<' if sys.byteorder == 'little' else '>') + 'f4'
+
+def floatBuffer(values):
+    interface = getattr(values, '__array_interface__', None)
+    if (interface is not None
+        and interface['typestr'] == __float32_typestr__
+        and interface['strides'] is None
+        and len(interface['shape']) == 1):
+        return interface['data'][0], interface['shape'][0], values
+    try:
+        view = memoryview(values)
+    except TypeError:
+        view = None
+    if (view is not None
+        and view.format == 'f'
+        and view.c_contiguous
+        and not view.readonly):
+        array = (c_float * (view.nbytes // view.itemsize)).from_buffer(view)
+        return array, len(array), array
+    array = (c_float * len(values))(*values)
+    return array, len(array), array
+
+
+# the address and size in bytes of memory nuklear will write into, such as
+# a NumPy array or a bytearray.  it is used in place, so it must be writable
+# and contiguous.  the returned keepalive object must be held until nuklear
+# is done writing.
+def writableBuffer(buffer):
+    interface = getattr(buffer, '__array_interface__', None)
+    if (interface is not None
+        and not interface['data'][1]
+        and interface['strides'] is None):
+        return interface['data'][0], buffer.nbytes, buffer
+    view = memoryview(buffer)
+    if view.readonly or not view.c_contiguous:
+        raise ValueError("nuklear needs a writable, contiguous buffer")
+    array = (ctypes.c_char * view.nbytes).from_buffer(view)
+    return ctypes.addressof(array), view.nbytes, array
+
+
+# a value which a widget edits in place, passed instead of a plain value
+# to checkbox_label, selectable_label, slider_float, slider_int, progress,
+# property_int or property_float.  the widget writes through a pointer
+# made once, so a frame of such widgets makes no ctypes values or result
+# tuples.  ctype is the C type the widget edits: c_int for checkbox_label,
+# selectable_label, slider_int and property_int, c_float for slider_float
+# and property_float, c_size_t for progress.  cell.value is the value.
+class Ref:
+    def __init__(self, ctype, value=0):
+        self.cell = ctype(value)
+        self.pointer = byref(self.cell)
+
+    # a Ref to an element of a NumPy array of int32, float32 or uintp,
+    # which the widget edits in the array itself.  index is an int, or a
+    # tuple of ints for arrays of more dimensions
+    @classmethod
+    def at(cls, array, index):
+        ctype = __ref_ctypes__.get(array.dtype)
+        if ctype is None:
+            raise ValueError("unsupported type for Ref: " + str(array.dtype))
+        ref = cls.__new__(cls)
+        ref.cell = ctype.from_address(elementAddress(array, index))
+        ref.pointer = byref(ref.cell)
+        ref.array = array
+        return ref
+
+__ref_ctypes__ = {np.dtype(np.int32): c_int,
+                  np.dtype(np.float32): c_float,
+                  np.dtype(np.uintp): c_size_t}
+
+# the address of array[index], for nuklear to edit in place.  index is an
+# int, or a tuple of ints for arrays of more dimensions
+def elementAddress(array, index):
+    if not array.flags.writeable:
+        raise ValueError("nuklear needs a writable array")
+    if type(index) is not tuple:
+        index = (index,)
+    if len(index) != array.ndim:
+        raise IndexError("nuklear needs an index per dimension of the array")
+    # range checks and wraps negative indices like array[index] would
+    offset = 0
+    for i, length, stride in zip(index, array.shape, array.strides):
+        offset += range(length)[i] * stride
+    return array.ctypes.data + offset
+
+__no_changes__ = np.zeros(0, dtype=np.intp)
+
+
+# the column ratios (or widths) for layout_row, converted to a C float
+# array once and reused every frame.  nuklear keeps a pointer to the
+# ratios until the row is full, so they must outlive the layout_row call;
+# layout_row keeps whatever it was given alive until the next call.
+class RowTemplate:
+    def __init__(self, ratio):
+        self.pointer, self.cols, self.keepalive = floatBuffer(ratio)
+
+    def __len__(self):
+        return self.cols
+
+# a signal too long to chart point by point.  nuklear tessellates every
+# pushed value, so only about two values per horizontal pixel are pushed:
+# the minimum and the maximum of the samples under that pixel.
+#
+# to make this independent of the number of samples, a pyramid of
+# minimums and maximums is built once.  level k holds the min and max of
+# each block of 2**k samples, and decimation reads the coarsest level whose
+# blocks still fit inside one pixel, so panning and zooming cost
+# O(pixels), not O(samples).
+class ChartSignal:
+    def __init__(self, values, min_level_size=256):
+        values = np.ascontiguousarray(values, dtype=np.float32)
+        self.values = values
+        self.mins = [values]
+        self.maxs = [values]
+        while len(self.mins[-1]) > min_level_size:
+            pairs = np.arange(0, len(self.mins[-1]), 2)
+            self.mins.append(np.minimum.reduceat(self.mins[-1], pairs))
+            self.maxs.append(np.maximum.reduceat(self.maxs[-1], pairs))
+
+    def __len__(self):
+        return len(self.values)
+
+    # the samples in [start, end) reduced to interleaved min, max pairs
+    # for at most buckets buckets.  returns the values and the number of
+    # samples each bucket covers.  short ranges are returned as they are,
+    # one sample per bucket.
+    def decimate(self, start, end, buckets):
+        start = max(int(start), 0)
+        end = min(int(end), len(self.values))
+        span = end - start
+        buckets = max(int(buckets), 1)
+        if span <= 2 * buckets:
+            return self.values[start:end], 1.0
+        samplesPerBucket = span / buckets
+
+        # the coarsest level whose blocks fit inside a bucket
+        level = min(int(math.log2(samplesPerBucket)), len(self.mins) - 1)
+        blockSize = 1 << level
+        first = start >> level
+        last = -(-end // blockSize)
+        edges = np.linspace(first, last, buckets + 1)[:-1].astype(np.intp)
+        edges = np.unique(edges) - first
+
+        # the first and last blocks may stick out of [start, end), so
+        # theirs are taken from the samples themselves
+        mins = self.mins[level][first:last].copy()
+        maxs = self.maxs[level][first:last].copy()
+        head = self.values[start:min((first + 1) << level, end)]
+        tail = self.values[max((last - 1) << level, start):end]
+        mins[0], maxs[0] = head.min(), head.max()
+        mins[-1], maxs[-1] = tail.min(), tail.max()
+
+        decimated = np.empty(2 * len(edges), dtype=np.float32)
+        decimated[0::2] = np.minimum.reduceat(mins, edges)
+        decimated[1::2] = np.maximum.reduceat(maxs, edges)
+        return decimated, span / len(edges)
+
+
 # Popup
 
-__popup_begin__ = _nuklear.nk_popup_begin
-__popup_begin__.arglist= [POINTER(Context), c_int, c_char_p, c_int,Rect]
-__popup_begin__.restype = c_int
+__popup_begin__ = prototype('nk_popup_begin', [POINTER(Context), c_int, c_char_p, c_int, Rect], c_int)
 
 
 # void nk_popup_close(struct nk_context*);
 
-__popup_end__ = _nuklear.nk_popup_end
-__popup_end__.arglist= [POINTER(Context)]
+__popup_end__ = prototype('nk_popup_end', [POINTER(Context)])
 
 
 # void nk_popup_end(struct nk_context*);
 
 
 # ComboBox
-__combo__ = _nuklear.nk_combo
-__combo__.arglist = [POINTER(Context), POINTER(POINTER(c_char_p)), c_int, c_int, c_int, Vec2]
-__combo__.restype = c_int
+__combo__ = prototype('nk_combo', [POINTER(Context), POINTER(c_char_p), c_int, c_int, c_int, Vec2], c_int)
+
+__combo_separator__ = prototype('nk_combo_separator', [POINTER(Context), c_char_p, c_int, c_int, c_int, c_int, Vec2], c_int)
+
+__combo_string__ = prototype('nk_combo_string', [POINTER(Context), c_char_p, c_int, c_int, c_int, Vec2], c_int)
+
+# the items of a combo box, encoded once into the array of strings
+# nk_combo takes.  build one when the items are known up front, and
+# pass it to combo() every frame instead of the list.  the items are
+# encoded here rather than by the shared string cache, so a long list
+# doesn't push the labels of every frame out of it
+class ComboItems:
+    def __init__(self, items):
+        self.encoded = [item if isinstance(item, bytes) else str.encode(item) for item in items]
+        self.array = (c_char_p * len(self.encoded))(*self.encoded)
+
+    def __len__(self):
+        return len(self.encoded)
 
-# int nk_combo_separator(struct nk_context*, const char *items_separated_by_separator, int separator, int selected, int count, int item_height, struct nk_vec2 size);
-# int nk_combo_string(struct nk_context*, const char *items_separated_by_zeros, int selected, int count, int item_height, struct nk_vec2 size);
 # int nk_combo_callback(struct nk_context*, void(*item_getter)(void*, int, const char**), void *userdata, int selected, int count, int item_height, struct nk_vec2 size);
 # void nk_combobox(struct nk_context*, const char **items, int count, int *selected, int item_height, struct nk_vec2 size);
 # void nk_combobox_string(struct nk_context*, const char *items_separated_by_zeros, int *selected, int count, int item_height, struct nk_vec2 size);
@@ -915,9 +1193,7 @@ __combo__.restype = c_int
 # Abstract Combobox
 # int nk_combo_begin_text(struct nk_context*, const char *selected, int, struct nk_vec2 size);
 # int nk_combo_begin_label(struct nk_context*, const char *selected, struct nk_vec2 size);
-__combo_begin_color__ = _nuklear.nk_combo_begin_color
-__combo_begin_color__.arglist = [POINTER(Context), Color, Vec2]
-__combo_begin_color__.restype = c_int
+__combo_begin_color__ = prototype('nk_combo_begin_color', [POINTER(Context), Color, Vec2], c_int)
 # int nk_combo_begin_symbol(struct nk_context*,  enum nk_symbol_type,  struct nk_vec2 size);
 # int nk_combo_begin_symbol_label(struct nk_context*, const char *selected, enum nk_symbol_type, struct nk_vec2 size);
 # int nk_combo_begin_symbol_text(struct nk_context*, const char *selected, int, enum nk_symbol_type, struct nk_vec2 size);
@@ -931,28 +1207,21 @@ __combo_begin_color__.restype = c_int
 # int nk_combo_item_symbol_label(struct nk_context*, enum nk_symbol_type, const char*, nk_flags alignment);
 # int nk_combo_item_symbol_text(struct nk_context*, enum nk_symbol_type, const char*, int, nk_flags alignment);
 # void nk_combo_close(struct nk_context*);
-__combo_end__ = _nuklear.nk_combo_end
-__combo_end__.arglist = [POINTER(Context)]
+__combo_end__ = prototype('nk_combo_end', [POINTER(Context)])
 
 # Contextual
-__contextual_begin__  = _nuklear.nk_contextual_begin
-__contextual_begin__.arglist = [POINTER(Context), c_int, Vec2, Rect]
-__contextual_begin__.restype = c_int
+__contextual_begin__ = prototype('nk_contextual_begin', [POINTER(Context), c_int, Vec2, Rect], c_int)
 # int nk_contextual_item_text(struct nk_context*, const char*, int,nk_flags align);
-__contextual_item_label__ = _nuklear.nk_contextual_item_label
-__contextual_item_label__.arglist = [POINTER(Context), c_char_p, c_int]
-__contextual_item_label__.restype = c_int
+__contextual_item_label__ = prototype('nk_contextual_item_label', [POINTER(Context), c_char_p, c_int], c_int)
 # int nk_contextual_item_image_label(struct nk_context*, struct nk_image, const char*, nk_flags alignment);
 # int nk_contextual_item_image_text(struct nk_context*, struct nk_image, const char*, int len, nk_flags alignment);
 # int nk_contextual_item_symbol_label(struct nk_context*, enum nk_symbol_type, const char*, nk_flags alignment);
 # int nk_contextual_item_symbol_text(struct nk_context*, enum nk_symbol_type, const char*, int, nk_flags alignment);
 # void nk_contextual_close(struct nk_context*);
-__contextual_end__ = _nuklear.nk_contextual_end
-__contextual_end__.arglist = [POINTER(Context)]
+__contextual_end__ = prototype('nk_contextual_end', [POINTER(Context)])
 
 # Tooltip
-__tooltip__ = _nuklear.nk_tooltip
-__tooltip__.arglist = [POINTER(Context), c_char_p]
+__tooltip__ = prototype('nk_tooltip', [POINTER(Context), c_char_p])
 
 # void nk_tooltipf(struct nk_context*, const char*, ...);
 # int nk_tooltip_begin(struct nk_context*, float width);
@@ -960,17 +1229,13 @@ __tooltip__.arglist = [POINTER(Context), c_char_p]
 
 
 # Menu
-__menubar_begin__ = _nuklear.nk_menubar_begin
-__menubar_begin__.arglist = [POINTER(Context)]
+__menubar_begin__ = prototype('nk_menubar_begin', [POINTER(Context)])
 
-__menubar_end__ = _nuklear.nk_menubar_end
-__menubar_end__.arglist = [POINTER(Context)]
+__menubar_end__ = prototype('nk_menubar_end', [POINTER(Context)])
 
 # int nk_menu_begin_text(struct nk_context*, const char* title, int title_len, nk_flags align, struct nk_vec2 size);
 
-__menu_begin_label__ = _nuklear.nk_menu_begin_label
-__menu_begin_label__.arglist = [POINTER(Context), c_char_p, c_int, Vec2]
-__menu_begin_label__.restype = c_int
+__menu_begin_label__ = prototype('nk_menu_begin_label', [POINTER(Context), c_char_p, c_int, Vec2], c_int)
 
 
 # int nk_menu_begin_image(struct nk_context*, const char*, struct nk_image, struct nk_vec2 size);
@@ -981,9 +1246,7 @@ __menu_begin_label__.restype = c_int
 # int nk_menu_begin_symbol_label(struct nk_context*, const char*, nk_flags align,enum nk_symbol_type, struct nk_vec2 size);
 # int nk_menu_item_text(struct nk_context*, const char*, int,nk_flags align);
 
-__menu_item_label__ = _nuklear.nk_menu_item_label
-__menu_item_label__.arglist = [POINTER(Context), c_char_p, c_int]
-__menu_item_label__.restype = c_int
+__menu_item_label__ = prototype('nk_menu_item_label', [POINTER(Context), c_char_p, c_int], c_int)
 
 # int nk_menu_item_image_label(struct nk_context*, struct nk_image, const char*, nk_flags alignment);
 # int nk_menu_item_image_text(struct nk_context*, struct nk_image, const char*, int len, nk_flags alignment);
@@ -991,8 +1254,7 @@ __menu_item_label__.restype = c_int
 # int nk_menu_item_symbol_label(struct nk_context*, enum nk_symbol_type, const char*, nk_flags alignment);
 # void nk_menu_close(struct nk_context*);
 
-__menu_end__ = _nuklear.nk_menu_end
-__menu_end__.arglist = [POINTER(Context)]
+__menu_end__ = prototype('nk_menu_end', [POINTER(Context)])
 
 
 # Style
@@ -1054,29 +1316,17 @@ CURSOR_COUN=7
 # int nk_style_push_flags(struct nk_context*, nk_flags*, nk_flags);
 # int nk_style_push_color(struct nk_context*, struct nk_color*, struct nk_color);
 
-__style_pop_font__ = _nuklear.nk_style_pop_font
-__style_pop_font__.arglist = [POINTER(Context)]
-__style_pop_font__.restype = c_int
+__style_pop_font__ = prototype('nk_style_pop_font', [POINTER(Context)], c_int)
 
-__style_pop_float__ = _nuklear.nk_style_pop_float
-__style_pop_float__.arglist = [POINTER(Context)]
-__style_pop_float__.restype = c_int
+__style_pop_float__ = prototype('nk_style_pop_float', [POINTER(Context)], c_int)
 
-__style_pop_vec2__ = _nuklear.nk_style_pop_vec2
-__style_pop_vec2__.arglist = [POINTER(Context)]
-__style_pop_vec2__.restype = c_int
+__style_pop_vec2__ = prototype('nk_style_pop_vec2', [POINTER(Context)], c_int)
 
-__style_pop_style_item__ = _nuklear.nk_style_pop_style_item
-__style_pop_style_item__.arglist = [POINTER(Context)]
-__style_pop_style_item__.restype = c_int
+__style_pop_style_item__ = prototype('nk_style_pop_style_item', [POINTER(Context)], c_int)
 
-__style_pop_flags__ = _nuklear.nk_style_pop_flags
-__style_pop_flags__.arglist = [POINTER(Context)]
-__style_pop_flags__.restype = c_int
+__style_pop_flags__ = prototype('nk_style_pop_flags', [POINTER(Context)], c_int)
 
-__style_pop_color__ = _nuklear.nk_style_pop_color
-__style_pop_color__.arglist = [POINTER(Context)]
-__style_pop_color__.restype = c_int
+__style_pop_color__ = prototype('nk_style_pop_color', [POINTER(Context)], c_int)
 
 
 
@@ -1089,9 +1339,7 @@ __style_pop_color__.restype = c_int
 # struct nk_color nk_rgb_bv(const nk_byte* rgb);
 # struct nk_color nk_rgb_f(float r, float g, float b);
 # struct nk_color nk_rgb_fv(const float *rgb);
-__rgb_cf__ = _nuklear.nk_rgb_cf
-__rgb_cf__.arglist = [ColorF]
-__rgb_cf__.restype = Color
+__rgb_cf__ = prototype('nk_rgb_cf', [ColorF], Color)
 # struct nk_color nk_rgb_hex(const char *rgb);
 # struct nk_color nk_rgba(int r, int g, int b, int a);
 # struct nk_color nk_rgba_u32(nk_uint);
@@ -1150,7 +1398,9 @@ __rgb_cf__.restype = Color
 # struct nk_image nk_subimage_handle(nk_handle, unsigned short w, unsigned short h, struct nk_rect sub_region);
 
 
-# Math# nk_hash nk_murmur_hash(const void *key, int len, nk_hash seed);
+# Math
+__murmur_hash__ = prototype('nk_murmur_hash', [c_char_p, c_int, c_uint], c_uint)
+
 # void nk_triangle_from_direction(struct nk_vec2 *result, struct nk_rect r, float pad_x, float pad_y, enum nk_heading);
 # struct nk_vec2 nk_vec2(float x, float y);
 # struct nk_vec2 nk_vec2i(int x, int y);
@@ -1787,40 +2037,57 @@ VERTEX_TEXCOORD=2
 VERTEX_ATTRIBUTE_COUNT=3
 
 
-# enum nk_draw_vertex_layout_format {
-#     NK_FORMAT_SCHAR,
-#     NK_FORMAT_SSHORT,
-#     NK_FORMAT_SINT,
-#     NK_FORMAT_UCHAR,
-#     NK_FORMAT_USHORT,
-#     NK_FORMAT_UINT,
-#     NK_FORMAT_FLOAT,
-#     NK_FORMAT_DOUBLE,
-
-# NK_FORMAT_COLOR_BEGIN,
-#     NK_FORMAT_R8G8B8 = NK_FORMAT_COLOR_BEGIN,
-#     NK_FORMAT_R16G15B16,
-#     NK_FORMAT_R32G32B32,
-
-#     NK_FORMAT_R8G8B8A8,
-#     NK_FORMAT_B8G8R8A8,
-#     NK_FORMAT_R16G15B16A16,
-#     NK_FORMAT_R32G32B32A32,
-#     NK_FORMAT_R32G32B32A32_FLOAT,
-#     NK_FORMAT_R32G32B32A32_DOUBLE,
-
-#     NK_FORMAT_RGB32,
-#     NK_FORMAT_RGBA32,
-# NK_FORMAT_COLOR_END = NK_FORMAT_RGBA32,
-#     NK_FORMAT_COUNT
-# };
-
-# #define NK_VERTEX_LAYOUT_END NK_VERTEX_ATTRIBUTE_COUNT,NK_FORMAT_COUNT,0
-# struct nk_draw_vertex_layout_element {
-#     enum nk_draw_vertex_layout_attribute attribute;
-#     enum nk_draw_vertex_layout_format format;
-#     nk_size offset;
-# };
+FORMAT_SCHAR=0
+FORMAT_SSHORT=1
+FORMAT_SINT=2
+FORMAT_UCHAR=3
+FORMAT_USHORT=4
+FORMAT_UINT=5
+FORMAT_FLOAT=6
+FORMAT_DOUBLE=7
+FORMAT_R8G8B8=8
+FORMAT_R16G15B16=9
+FORMAT_R32G32B32=10
+FORMAT_R8G8B8A8=11
+FORMAT_B8G8R8A8=12
+FORMAT_R16G15B16A16=13
+FORMAT_R32G32B32A32=14
+FORMAT_R32G32B32A32_FLOAT=15
+FORMAT_R32G32B32A32_DOUBLE=16
+FORMAT_RGB32=17
+FORMAT_RGBA32=18
+FORMAT_COUNT=19
+
+# the vertex attribute each field name of a vertex dtype stands for
+__vertex_attributes__ = {'position': VERTEX_POSITION,
+                         'pos': VERTEX_POSITION,
+                         'uv': VERTEX_TEXCOORD,
+                         'texcoord': VERTEX_TEXCOORD,
+                         'col': VERTEX_COLOR,
+                         'color': VERTEX_COLOR}
+
+# the nk_draw_vertex_layout_element array, ended by NK_VERTEX_LAYOUT_END,
+# which tells nk_convert to write vertices of the NumPy structured dtype
+# vertex.  positions and uvs are two float32s, colors are four uint8s or
+# four float32s.
+def vertexLayout(vertex):
+    elements = []
+    for name in vertex.names:
+        fieldType, offset = vertex.fields[name][:2]
+        if name not in __vertex_attributes__:
+            raise ValueError("unknown vertex field " + repr(name))
+        attribute = __vertex_attributes__[name]
+        if attribute == VERTEX_COLOR and fieldType == np.dtype((np.uint8, 4)):
+            layoutFormat = FORMAT_R8G8B8A8
+        elif attribute == VERTEX_COLOR and fieldType == np.dtype((np.float32, 4)):
+            layoutFormat = FORMAT_R32G32B32A32_FLOAT
+        elif attribute != VERTEX_COLOR and fieldType == np.dtype((np.float32, 2)):
+            layoutFormat = FORMAT_FLOAT
+        else:
+            raise ValueError("unsupported type for vertex field " + repr(name) + ": " + str(fieldType))
+        elements.append((attribute, layoutFormat, offset))
+    elements.append((VERTEX_ATTRIBUTE_COUNT, FORMAT_COUNT, 0))
+    return (DrawVertexLayoutElement * len(elements))(*elements)
 
 # struct nk_draw_command {
 #     unsigned int elem_count;
@@ -2685,282 +2952,1063 @@ WINDOW_REMOVE_ROM    = 1 << 16
 
 # because I don't want to recreate all of the nuklear data structures,
 # I have made some wrapper procedures
-__set_style_window_header_align__ = _nuklear.nkWrapper_context_set_style_window_header_align
-__set_style_window_header_align__.arglist = [POINTER(Context), c_int]
-__set_style_window_header_align__.restype = c_int
+__set_style_window_header_align__ = prototype('nkWrapper_context_set_style_window_header_align', [POINTER(Context), c_int])
 
 
-__input_is_mouse_hovering_rect__ = _nuklear.nkWrapper_input_is_mouse_hovering_rect
-__input_is_mouse_hovering_rect__.arglist = [POINTER(Context), Rect]
-__input_is_mouse_hovering_rect__.restype = c_int
+__input_is_mouse_hovering_rect__ = prototype('nkWrapper_input_is_mouse_hovering_rect', [POINTER(Context), Rect], c_int)
 
-__style_push_window_spacing__ = _nuklear.nkWrapper_style_push_window_spacing
-__style_push_window_spacing__.arglist = [POINTER(Context), Vec2]
-__style_push_window_spacing__.restype = c_int
+__style_push_window_spacing__ = prototype('nkWrapper_style_push_window_spacing', [POINTER(Context), Vec2], c_int)
 
-__style_push_button_rounding__ = _nuklear.nkWrapper_style_push_button_rounding
-__style_push_button_rounding__.arglist = [POINTER(Context), c_float]
-__style_push_button_rounding__.restype = c_int
+__style_push_button_rounding__ = prototype('nkWrapper_style_push_button_rounding', [POINTER(Context), c_float], c_int)
 
 
-__get_text_width__ = _nuklear.nkWrapper_get_text_width
-__get_text_width__.arglist = [POINTER(Context), c_char_p]
-__get_text_width__.restype = c_float
+__get_text_width__ = prototype('nkWrapper_get_text_width', [POINTER(Context), c_char_p], c_float)
+
+__text_width_font__ = prototype('nkWrapper_text_width_font', [POINTER(Context), POINTER(c_float)], c_void_p)
+
+__text_widths__ = prototype('nkWrapper_text_widths', [POINTER(Context), POINTER(c_char_p), c_int, c_void_p])
+
+__tree_push_hash__ = prototype('nkWrapper_tree_push_hash', [POINTER(Context), c_int, c_char_p, c_int, c_uint], c_int)
+
+__replay__ = prototype('nkWrapper_replay', [POINTER(Context), c_char_p, c_int])
+
+__commands__ = prototype('nkWrapper_commands', [POINTER(Context), c_void_p, c_int, c_void_p, c_int, POINTER(c_int)], c_int)
+
+# one drawing command, as flattened by nkWrapper_commands; this must match
+# struct nkWrapper_command.  rect is the shape's bounds, except for lines
+# and curves, where it runs from the begin point (x, y) to the end point
+# (x + w, y + h).  the text of a text command is text_length bytes at
+# text_offset in the text buffer, other commands have a text_offset of -1
+COMMAND = np.dtype([('type', np.int32),
+                    ('rect', np.float32, 4),
+                    ('color', np.uint8, 4),
+                    ('thickness', np.float32),
+                    ('rounding', np.float32),
+                    ('text_offset', np.int32),
+                    ('text_length', np.int32)])
+
+__convert__ = prototype('nkWrapper_convert',
+                        [POINTER(Context), POINTER(ConvertConfig),
+                         c_void_p, c_int,
+                         c_void_p, c_int,
+                         c_void_p, c_int,
+                         POINTER(c_int), POINTER(c_int), POINTER(c_int)],
+                        c_uint)
+
+# one draw call produced by convert: elem_count elements, clipped to
+# clip_rect (x, y, w, h), with the texture whose id is texture.  this must
+# match struct nkWrapper_draw_command
+DRAW_COMMAND = np.dtype([('clip_rect', np.float32, 4),
+                         ('elem_count', np.uint32),
+                         ('texture', np.int32)])
+# nk_draw_index
+ELEMENT = np.uint16
+
+# the GLFW OpenGL 3 backend counts what nk_convert produced in the last
+# render, which perf_overlay shows when it is available
+if hasattr(_nuklear, 'nk_glfw3_render_stats'):
+    __render_stats__ = prototype('nk_glfw3_render_stats', [POINTER(c_int), POINTER(c_int), POINTER(c_int), POINTER(c_int)])
+else:
+    __render_stats__ = None
+
+# and the sizes its vertex and element buffers have grown or shrunk to
+if hasattr(_nuklear, 'nk_glfw3_buffer_stats'):
+    __buffer_stats__ = prototype('nk_glfw3_buffer_stats', [POINTER(c_int), POINTER(c_int), POINTER(c_int), POINTER(c_int)])
+else:
+    __buffer_stats__ = None
+
+
+# a size in bytes as a short label, such as b"512K"
+def __format_bytes__(size):
+    if size >= 1024 * 1024:
+        return b"%.1fM" % (size / (1024.0 * 1024.0))
+    if size >= 1024:
+        return b"%dK" % (size // 1024)
+    return b"%d" % size
+
+
+# what perf_overlay measures from one call to the next.  frame times
+# are kept in milliseconds for the last history frames.
+class PerfStats:
+    def __init__(self, history=120):
+        self.frame_times = np.zeros(history, dtype=np.float32)
+        self.frames = 0
+        self.last_time = None
+        self.last_calls = 0
+        self.last_blocks = sys.getallocatedblocks()
+        self.last_collections = self.collections()
+        self.calls = 0
+        self.net_blocks = 0
+        self.gc_collections = 0
+        self.vertices = c_int()
+        self.elements = c_int()
+        self.draw_commands = c_int()
+        self.convert_result = c_int()
+        self.vertex_capacity = c_int()
+        self.element_capacity = c_int()
+        self.vertex_high_water = c_int()
+        self.element_high_water = c_int()
+
+    def collections(self):
+        return sum(generation['collections'] for generation in gc.get_stats())
+
+    def update(self, ffi_calls):
+        now = time.perf_counter()
+        if self.last_time is not None:
+            self.frame_times[self.frames % len(self.frame_times)] = (now - self.last_time) * 1000.0
+            self.frames += 1
+        self.last_time = now
+        self.calls = ffi_calls - self.last_calls
+        self.last_calls = ffi_calls
+        blocks = sys.getallocatedblocks()
+        self.net_blocks = blocks - self.last_blocks
+        self.last_blocks = blocks
+        collections = self.collections()
+        self.gc_collections = collections - self.last_collections
+        self.last_collections = collections
+        if __render_stats__:
+            __render_stats__(byref(self.vertices), byref(self.elements),
+                             byref(self.draw_commands), byref(self.convert_result))
+        if __buffer_stats__:
+            __buffer_stats__(byref(self.vertex_capacity), byref(self.element_capacity),
+                             byref(self.vertex_high_water), byref(self.element_high_water))
+
+    # the recorded frame times, oldest first
+    def history(self):
+        if self.frames <= len(self.frame_times):
+            return self.frame_times[:self.frames]
+        return np.roll(self.frame_times, -(self.frames % len(self.frame_times)))
+
+
+# while a NuklearContext is recording, calls which don't return anything
+# are packed into an opcode buffer instead of being made one at a time,
+# and the whole buffer is handed to nkWrapper_replay in a single call.
+# these must match enum nkWrapper_opcode in nuklearWrappers.c
+__op_end__ = 1
+__op_layout_row_dynamic__ = 2
+__op_layout_row_static__ = 3
+__op_layout_row_begin__ = 4
+__op_layout_row_push__ = 5
+__op_layout_row_end__ = 6
+__op_spacing__ = 7
+__op_text__ = 8
+__op_label_colored__ = 9
+__op_label_wrap__ = 10
+__op_tooltip__ = 11
+__op_tree_pop__ = 12
+__op_menubar_begin__ = 13
+__op_menubar_end__ = 14
+__op_menu_end__ = 15
+__op_combo_end__ = 16
+__op_contextual_end__ = 17
+__op_popup_end__ = 18
+__op_button_set_behavior__ = 19
+__op_set_style_window_header_align__ = 20
+__op_style_push_window_spacing__ = 21
+__op_style_push_button_rounding__ = 22
+__op_style_pop_font__ = 23
+__op_style_pop_float__ = 24
+__op_style_pop_vec2__ = 25
+__op_style_pop_style_item__ = 26
+__op_style_pop_flags__ = 27
+__op_style_pop_color__ = 28
+
+# operands are packed in native byte order without padding.  strings
+# are packed as their length, and are followed by their bytes and a
+# terminating zero
+__pack_int__ = struct.Struct('=Bi')
+__pack_float__ = struct.Struct('=Bf')
+__pack_float_float__ = struct.Struct('=Bff')
+__pack_float_int__ = struct.Struct('=Bfi')
+__pack_float_int_int__ = struct.Struct('=Bfii')
+__pack_int_float_int__ = struct.Struct('=Bifi')
+__pack_text__ = struct.Struct('=BIi')
+__pack_label_colored__ = struct.Struct('=BI4Bi')
 
 
 
 # because average programmers who are English speakers like Subject-Verb-Object
 # word ordering, create an object that holds the nuklear context.
+#
+# if "recording" is true, calls which have no return value are buffered
+# and sent to nuklear in one batch, which happens whenever a call needs
+# a return value, when a window ends, or when flush is called.  style
+# pushes and pops are buffered too, and return 1 while recording
+# (nuklear asserts on a style stack overflow).
 class NuklearContext:
-    def __init__(self,ctx):
+    def __init__(self,ctx,recording=False):
         self.ctx = ctx
+        self.recording = recording
+        self.ops = bytearray()
+        # reused by list_rows
+        self.list_view = ListView()
+        # encoded combo, property_grid and text_widths items, keyed by
+        # a tuple of the items, least recently used first
+        self.combo_items = {}
+        # see get_text_width.  text_width_font is the font, font height
+        # and button padding of the current style, or None when they
+        # may have changed since they were last asked for
+        self.text_widths_cache = TextWidthCache()
+        self.text_widths_generation = fontGeneration
+        self.text_width_font = None
+        self.text_width_metrics = (c_float * 2)()
+        # reused by property_grid
+        self.grid_changed = np.zeros(64, dtype=np.uint8)
+        # the ratios of the current layout_row, which nuklear points into
+        self.layout_ratio = None
+        # calls into nuklear, see perf_overlay
+        self.ffi_calls = 0
+        self.perf_stats = None
+        # reused by commands
+        self.command_records = np.zeros(1024, dtype=COMMAND)
+        self.command_text = np.zeros(16 * 1024, dtype=np.uint8)
+        # reused by convert
+        self.draw_command_records = np.zeros(256, dtype=DRAW_COMMAND)
+
+    # send any buffered calls to nuklear
+    def flush(self):
+        if self.ops:
+            self.ffi_calls += 1
+            __replay__(self.ctx, bytes(self.ops), len(self.ops))
+            del self.ops[:]
+
+    def __record_string__(self, b):
+        self.ops += b
+        self.ops.append(0)
 
     def begin(self, title, bounds, flags):
-        return __begin__(self.ctx, str.encode(title), bounds, flags)
+        self.flush()
+        self.text_width_font = None
+        self.ffi_calls += 1
+        return __begin__(self.ctx, __encode__(title), bounds, flags)
 
     # if two windows are going to have the same title, you need to provide
     # a unique string "name" so that nuklear can identify it
     def begin_titled(self, name, title, bounds, flags):
+        self.flush()
+        self.text_width_font = None
+        self.ffi_calls += 1
         return __begin_titled__(self.ctx,
-                                str.encode(name),
-                                str.encode(title),
+                                __encode__(name),
+                                __encode__(title),
                                 bounds,
                                 flags)
 
     def layout_widget_bounds(self):
+        self.flush()
+        self.ffi_calls += 1
         return __layout_widget_bounds__(self.ctx)
 
     def layout_row_dynamic(self,height,cols):
-        __layout_row_dynamic__(self.ctx,ctypes.c_float(height), cols)
+        if self.recording:
+            self.ops += __pack_float_int__.pack(__op_layout_row_dynamic__, height, cols)
+        else:
+            self.ffi_calls += 1
+            __layout_row_dynamic__(self.ctx, height, cols)
 
     def layout_row_static(self,height,item_width,cols):
-        __layout_row_static__(self.ctx,ctypes.c_float(height), item_width,cols)
+        if self.recording:
+            self.ops += __pack_float_int_int__.pack(__op_layout_row_static__, height, item_width, cols)
+        else:
+            self.ffi_calls += 1
+            __layout_row_static__(self.ctx, height, item_width, cols)
 
     def text(self, text, length, alignment):
-        __text__(self.ctx,str.encode(text),length, alignment)
+        if self.recording:
+            b = __encode__(text)[:length]
+            self.ops += __pack_text__.pack(__op_text__, alignment, len(b))
+            self.__record_string__(b)
+        else:
+            self.ffi_calls += 1
+            __text__(self.ctx,__encode__(text),length, alignment)
 
     def label(self, text, alignment):
-        __label__(self.ctx, str.encode(text), alignment)
+        if self.recording:
+            b = __encode__(text)
+            self.ops += __pack_text__.pack(__op_text__, alignment, len(b))
+            self.__record_string__(b)
+        else:
+            self.ffi_calls += 1
+            __label__(self.ctx, __encode__(text), alignment)
 
     def label_colored(self, text, align, color):
-        __label_colored__(self.ctx,str.encode(text),align,color)
+        if self.recording:
+            b = __encode__(text)
+            self.ops += __pack_label_colored__.pack(__op_label_colored__, align,
+                                                    color.r, color.g, color.b, color.a,
+                                                    len(b))
+            self.__record_string__(b)
+        else:
+            self.ffi_calls += 1
+            __label_colored__(self.ctx,__encode__(text),align,color)
 
     def label_wrap(self, text):
-        __label_wrap__(self.ctx,str.encode(text))
+        if self.recording:
+            b = __encode__(text)
+            self.ops += __pack_int__.pack(__op_label_wrap__, len(b))
+            self.__record_string__(b)
+        else:
+            self.ffi_calls += 1
+            __label_wrap__(self.ctx,__encode__(text))
+
+    def spacing(self, cols):
+        if self.recording:
+            self.ops += __pack_int__.pack(__op_spacing__, cols)
+        else:
+            self.ffi_calls += 1
+            __spacing__(self.ctx, cols)
 
     def button_label(self, title):
-        return __button_label__(self.ctx, str.encode(title))
-
+        self.flush()
+        self.ffi_calls += 1
+        return __button_label__(self.ctx, __encode__(title))
+
+    # active may be a Ref, which is edited in place; only whether it
+    # changed is returned then.  the same goes for selectable_label,
+    # slider_float, slider_int and progress, and for property_int and
+    # property_float, which return nothing for a Ref
     def checkbox_label(self, text, active):
+        self.flush()
+        if type(active) is Ref:
+            self.ffi_calls += 1
+            return __checkbox_label__(self.ctx, __encode__(text), active.pointer)
         a = ctypes.c_int(active)
-        wasModified = __checkbox_label__(self.ctx,str.encode(text),ctypes.byref(a))
+        self.ffi_calls += 1
+        wasModified = __checkbox_label__(self.ctx,__encode__(text),ctypes.byref(a))
         return (wasModified, a.value)
 
     def option_label(self, label, active):
-        return __option_label__(self.ctx, str.encode(label), active)
+        self.flush()
+        self.ffi_calls += 1
+        return __option_label__(self.ctx, __encode__(label), active)
 
     def selectable_label(self, label, align, value):
+        self.flush()
+        if type(value) is Ref:
+            self.ffi_calls += 1
+            return __selectable_label__(self.ctx, __encode__(label), align, value.pointer)
         a = ctypes.c_int(value)
-        wasModified = __selectable_label__(self.ctx, str.encode(label), align, ctypes.byref(a))
+        self.ffi_calls += 1
+        wasModified = __selectable_label__(self.ctx, __encode__(label), align, ctypes.byref(a))
         return (wasModified, a.value)
 
     def slider_float(self, minV, value, maxV, step):
+        self.flush()
+        if type(value) is Ref:
+            self.ffi_calls += 1
+            return __slider_float__(self.ctx, minV, value.pointer, maxV, step)
         v = ctypes.c_float(value)
-        wasModified = __slider_float__(self.ctx, c_float(minV), ctypes.byref(v), c_float(maxV), c_float(step))
+        self.ffi_calls += 1
+        wasModified = __slider_float__(self.ctx, minV, ctypes.byref(v), maxV, step)
         return (wasModified,v.value)
 
     def slider_int(self, minV, value, maxV, step):
+        self.flush()
+        if type(value) is Ref:
+            self.ffi_calls += 1
+            return __slider_int__(self.ctx, minV, value.pointer, maxV, step)
         v = ctypes.c_int(value)
+        self.ffi_calls += 1
         wasModified = __slider_int__(self.ctx, minV, ctypes.byref(v), maxV, step)
         return (wasModified,v.value)
 
     def progress(self, cur, max, is_modifyable):
-        v = ctypes.c_int(cur)
+        self.flush()
+        if type(cur) is Ref:
+            self.ffi_calls += 1
+            return __progress__(self.ctx, cur.pointer, max, is_modifyable)
+        v = ctypes.c_size_t(cur)
+        self.ffi_calls += 1
         wasModified = __progress__(self.ctx, ctypes.byref(v), max, is_modifyable)
         return (wasModified, v.value)
 
     def property_int(self, name, minV, val, maxV, step, inc_per_pixel):
+        self.flush()
+        if type(val) is Ref:
+            self.ffi_calls += 1
+            __property_int__(self.ctx, __encode__(name), minV, val.pointer, maxV, step, inc_per_pixel)
+            return
         v = ctypes.c_int(val)
+        self.ffi_calls += 1
         __property_int__(self.ctx,
-                                 str.encode(name),
+                                 __encode__(name),
                                  minV,
                                  ctypes.byref(v),
                                  maxV,
                                  step,
-                                 c_float(inc_per_pixel))
+                                 inc_per_pixel)
         return v.value
 
+    # view is a ListView, which is filled in with the range of visible
+    # rows.  only call list_view_end if this returns true
+    def list_view_begin(self, view, id, flags, row_height, row_count):
+        self.flush()
+        self.ffi_calls += 1
+        return __list_view_begin__(self.ctx, byref(view), __encode__(id), flags, row_height, row_count)
+
+    def list_view_end(self, view):
+        self.flush()
+        self.ffi_calls += 1
+        __list_view_end__(byref(view))
+
+    # draw a scrolling list of rows, where only the visible rows are
+    # touched, so the cost per frame does not depend on len(rows).
+    # rows may be a NumPy structured array, with one column per field,
+    # or any sequence, whose items are tuples (one column per element)
+    # or single values.  format turns one value into a label and
+    # defaults to str.  returns the range of visible rows.
+    def list_rows(self, id, rows, row_height, flags=WINDOW_BORDER, format=str, alignment=TEXT_LEFT):
+        view = self.list_view
+        if not self.list_view_begin(view, id, flags, row_height, len(rows)):
+            return 0, 0
+        begin = view.begin
+        end = min(view.end, len(rows))
+        if hasattr(rows, 'dtype'):
+            # one slice and one conversion to python for all visible rows
+            visible = rows[begin:end].tolist()
+            cols = len(rows.dtype.names) if rows.dtype.names else 1
+        else:
+            visible = [rows[i] for i in range(begin, end)]
+            cols = len(visible[0]) if visible and isinstance(visible[0], tuple) else 1
+        self.layout_row_dynamic(row_height, cols)
+        for row in visible:
+            if cols == 1 and not isinstance(row, tuple):
+                self.label(format(row), alignment)
+            else:
+                for value in row:
+                    self.label(format(value), alignment)
+        self.list_view_end(view)
+        return begin, end
+
     def chart_begin(self,chart_type,count,minV,maxV):
-        return __chart_begin__(self.ctx,chart_type,count,c_float(minV),c_float(maxV))
+        self.flush()
+        self.ffi_calls += 1
+        return __chart_begin__(self.ctx,chart_type,count,minV,maxV)
 
     def chart_push(self,value):
-        return __chart_push__(self.ctx,c_float(value))
+        self.flush()
+        self.ffi_calls += 1
+        return __chart_push__(self.ctx,value)
+
+    def chart_push_slot(self,value,slot):
+        self.flush()
+        self.ffi_calls += 1
+        return __chart_push_slot__(self.ctx,value,slot)
+
+    # push every value in one call, see floatBuffer for what values
+    # may be.  returns the indices of the hovered and the clicked
+    # value, -1 for none
+    def chart_push_values(self,values,slot=0):
+        self.flush()
+        pointer, count, keepalive = floatBuffer(values)
+        clicked = ctypes.c_int(-1)
+        self.ffi_calls += 1
+        hovered = __chart_push_slot_values__(self.ctx,pointer,count,slot,ctypes.byref(clicked))
+        return hovered, clicked.value
+
+    # chart the samples of signal, a ChartSignal, in [start, end), decimated
+    # to the width of the next widget.  minV and maxV default to the range
+    # of the visible samples.  returns the index of the hovered sample, or
+    # -1
+    def chart_signal(self,signal,start=0,end=None,chart_type=CHART_LINES,minV=None,maxV=None):
+        if end is None:
+            end = len(signal)
+        values, samplesPerBucket = signal.decimate(start, end, self.widget_width())
+        if len(values) == 0:
+            return -1
+        if minV is None:
+            minV = float(values.min())
+        if maxV is None:
+            maxV = float(values.max())
+        if maxV <= minV:
+            maxV = minV + 1.0
+        hovered = -1
+        if self.chart_begin(chart_type,len(values),minV,maxV):
+            hoveredValue, clickedValue = self.chart_push_values(values)
+            self.chart_end()
+            if hoveredValue != -1:
+                if samplesPerBucket == 1.0:
+                    hovered = max(int(start), 0) + hoveredValue
+                else:
+                    hovered = max(int(start), 0) + int((hoveredValue // 2) * samplesPerBucket)
+        return hovered
 
     def chart_end(self):
+        self.flush()
+        self.ffi_calls += 1
         __chart_end__(self.ctx)
 
+    # draw a whole chart from values in one call, see floatBuffer for
+    # what values may be.  offset is the index of the first value drawn
+    # plots values[offset:].  nothing is drawn when that is empty
+    def plot(self,chart_type,values,offset=0):
+        self.flush()
+        pointer, count, keepalive = floatBuffer(values)
+        if not 0 <= offset <= count:
+            raise IndexError("plot offset out of range")
+        if offset == count:
+            return
+        self.ffi_calls += 1
+        __plot__(self.ctx,chart_type,pointer,count - offset,offset)
+
     def property_float(self, name, minV, val, maxV, step, inc_per_pixel):
+        self.flush()
+        if type(val) is Ref:
+            self.ffi_calls += 1
+            __property_float__(self.ctx, __encode__(name), minV, val.pointer, maxV, step, inc_per_pixel)
+            return
         v = ctypes.c_float(val)
+        self.ffi_calls += 1
         __property_float__(self.ctx,
-                           str.encode(name),
-                           c_float(minV),
+                           __encode__(name),
+                           minV,
                            ctypes.byref(v),
-                           c_float(maxV),
-                           c_float(step),
-                           c_float(inc_per_pixel))
+                           maxV,
+                           step,
+                           inc_per_pixel)
         return v.value
 
+    # slider_float or slider_int on array[index] itself, for a float32 or
+    # int32 NumPy array, see elementAddress.  returns whether it changed
+    def slider_at(self, minV, array, index, maxV, step):
+        self.flush()
+        if array.dtype == np.float32:
+            self.ffi_calls += 1
+            return __slider_float_at__(self.ctx, minV, elementAddress(array, index), maxV, step)
+        if array.dtype == np.int32:
+            self.ffi_calls += 1
+            return __slider_int_at__(self.ctx, minV, elementAddress(array, index), maxV, step)
+        raise ValueError("unsupported type for slider_at: " + str(array.dtype))
+
+    # property_float or property_int on array[index] itself, like slider_at
+    def property_at(self, name, minV, array, index, maxV, step, inc_per_pixel):
+        self.flush()
+        if array.dtype == np.float32:
+            self.ffi_calls += 1
+            __property_float_at__(self.ctx, __encode__(name), minV, elementAddress(array, index), maxV, step, inc_per_pixel)
+        elif array.dtype == np.int32:
+            self.ffi_calls += 1
+            __property_int_at__(self.ctx, __encode__(name), minV, elementAddress(array, index), maxV, step, inc_per_pixel)
+        else:
+            raise ValueError("unsupported type for property_at: " + str(array.dtype))
+
+    # a property for every element of a contiguous float32 or int32 NumPy
+    # array, in one call, laid out by the current row layout.  labels is a
+    # ComboItems or a list of names, one per element, which must differ
+    # (names starting with '#' aren't shown).  ranges is one (min, max,
+    # step) for all elements, or one row of them per element.  dragging
+    # changes values by inc_per_pixel per pixel, or by the step if it is 0.
+    # returns the indices of the elements which changed
+    def property_grid(self, array, labels, ranges, inc_per_pixel=0.0):
+        self.flush()
+        if array.dtype == np.float32:
+            integer = 0
+        elif array.dtype == np.int32:
+            integer = 1
+        else:
+            raise ValueError("unsupported type for property_grid: " + str(array.dtype))
+        pointer, nbytes, keepalive = writableBuffer(array)
+        count = array.size
+        labels = self.__combo_items__(labels)
+        if len(labels) != count:
+            raise ValueError("property_grid needs a label per element")
+        ranges = np.asarray(ranges, dtype=np.float32)
+        if ranges.shape != (count, 3):
+            ranges = np.broadcast_to(ranges, (count, 3))
+        ranges = np.ascontiguousarray(ranges)
+        if len(self.grid_changed) < count:
+            self.grid_changed = np.zeros(count, dtype=np.uint8)
+        self.ffi_calls += 1
+        changes = __property_grid__(self.ctx, pointer, integer, count, labels.array,
+                                    ranges.ctypes.data, inc_per_pixel, self.grid_changed.ctypes.data)
+        if not changes:
+            return __no_changes__
+        return np.flatnonzero(self.grid_changed[:count])
+
     def propertyi(self, name, minVal, val, maxVal, step, inc_per_pixel):
+        self.flush()
+        self.ffi_calls += 1
         return __propertyi__(self.ctx,
-                             str.encode(name),
+                             __encode__(name),
                              minVal,
                              val,
                              maxVal,
                              step,
-                             ctypes.c_float(inc_per_pixel))
+                             inc_per_pixel)
 
     def propertyf(self, name, minVal, val, maxVal, step, inc_per_pixel):
+        self.flush()
+        self.ffi_calls += 1
         return __propertyf__(self.ctx,
-                             str.encode(name),
-                             c_float(minVal),
-                             c_float(val),
-                             c_float(maxVal),
-                             c_float(step),
-                             c_float(inc_per_pixel))
+                             __encode__(name),
+                             minVal,
+                             val,
+                             maxVal,
+                             step,
+                             inc_per_pixel)
 
     def popup_begin(self, theType, title, flags, rect):
-        return __popup_begin__(self.ctx, theType, str.encode(title), flags, rect)
+        self.flush()
+        self.ffi_calls += 1
+        return __popup_begin__(self.ctx, theType, __encode__(title), flags, rect)
 
     def menu_begin_label(self,text,align,size):
-        return __menu_begin_label__(self.ctx,str.encode(text),align,size)
+        self.flush()
+        self.ffi_calls += 1
+        return __menu_begin_label__(self.ctx,__encode__(text),align,size)
 
     def menu_item_label(self, label, align):
-        return __menu_item_label__(self.ctx,str.encode(label), align)
+        self.flush()
+        self.ffi_calls += 1
+        return __menu_item_label__(self.ctx,__encode__(label), align)
 
 
     def item_is_any_active(self):
         '''returns if any window or widgets is currently hovered or active'''
+        self.flush()
+        self.ffi_calls += 1
         return __item_is_any_active__(self.ctx)
 
     def combo_begin_color(self, color, size):
+        self.flush()
+        self.ffi_calls += 1
         return __combo_begin_color__(self.ctx, color, size)
 
     def color_picker(self, color, format):
+        self.flush()
+        self.ffi_calls += 1
         return __color_picker__(self.ctx, color, format)
 
     def combo_end(self):
-        __combo_end__(self.ctx)
+        if self.recording:
+            self.ops.append(__op_combo_end__)
+        else:
+            self.ffi_calls += 1
+            __combo_end__(self.ctx)
 
     def contextual_begin(self,flags, size, triggerBounds):
+        self.flush()
+        self.ffi_calls += 1
         return __contextual_begin__(self.ctx,flags, size, triggerBounds)
 
     def contextual_item_label(self, text, align):
-        return __contextual_item_label__(self.ctx, str.encode(text), align)
+        self.flush()
+        self.ffi_calls += 1
+        return __contextual_item_label__(self.ctx, __encode__(text), align)
 
     def contextual_end(self):
-        __contextual_end__(self.ctx)
+        if self.recording:
+            self.ops.append(__op_contextual_end__)
+        else:
+            self.ffi_calls += 1
+            __contextual_end__(self.ctx)
 
     def end(self):
-        __end__(self.ctx)
+        if self.recording:
+            self.ops.append(__op_end__)
+            self.flush()
+        else:
+            self.ffi_calls += 1
+            __end__(self.ctx)
 
     def tooltip(self, text):
-        __tooltip__(self.ctx, str.encode(text))
+        if self.recording:
+            b = __encode__(text)
+            self.ops += __pack_int__.pack(__op_tooltip__, len(b))
+            self.__record_string__(b)
+        else:
+            self.ffi_calls += 1
+            __tooltip__(self.ctx, __encode__(text))
 
     def menubar_begin(self):
-        __menubar_begin__(self.ctx)
-
+        if self.recording:
+            self.ops.append(__op_menubar_begin__)
+        else:
+            self.ffi_calls += 1
+            __menubar_begin__(self.ctx)
+
+    # ratio is a RowTemplate, or anything floatBuffer takes; a float32
+    # NumPy array is used without copying
     def layout_row(self, layout_format, height, cols, ratio):
-        ctypesList = []
-        for x in range(len(ratio)):
-            ctypesList.append(ctypes.c_float(ratio[x]))
-        arr = (ctypes.c_float * len(ctypesList))(*ctypesList)
-        __layout_row__(self.ctx, layout_format, ctypes.c_float(height), cols, arr)
+        self.flush()
+        if not isinstance(ratio, RowTemplate):
+            ratio = RowTemplate(ratio)
+        self.layout_ratio = ratio
+        self.ffi_calls += 1
+        __layout_row__(self.ctx, layout_format, height, cols, ratio.pointer)
+
+    # nuklear's own row templates; every row until the next template
+    # is laid out with the columns pushed between begin and end
+    def layout_row_template_begin(self, height):
+        self.flush()
+        self.ffi_calls += 1
+        __layout_row_template_begin__(self.ctx, height)
+
+    def layout_row_template_push_dynamic(self):
+        self.flush()
+        self.ffi_calls += 1
+        __layout_row_template_push_dynamic__(self.ctx)
+
+    def layout_row_template_push_variable(self, min_width):
+        self.flush()
+        self.ffi_calls += 1
+        __layout_row_template_push_variable__(self.ctx, min_width)
+
+    def layout_row_template_push_static(self, width):
+        self.flush()
+        self.ffi_calls += 1
+        __layout_row_template_push_static__(self.ctx, width)
+
+    def layout_row_template_end(self):
+        self.flush()
+        self.ffi_calls += 1
+        __layout_row_template_end__(self.ctx)
 
     def layout_row_begin(self, fmt, row_height, cols):
-        __layout_row_begin__(self.ctx,ctypes.c_int(fmt), ctypes.c_float(row_height), ctypes.c_int(cols))
+        if self.recording:
+            self.ops += __pack_int_float_int__.pack(__op_layout_row_begin__, fmt, row_height, cols)
+        else:
+            self.ffi_calls += 1
+            __layout_row_begin__(self.ctx, fmt, row_height, cols)
 
     def layout_row_push(self, ratio_or_width):
-        __layout_row_push__(self.ctx, ctypes.c_float(ratio_or_width))
+        if self.recording:
+            self.ops += __pack_float__.pack(__op_layout_row_push__, ratio_or_width)
+        else:
+            self.ffi_calls += 1
+            __layout_row_push__(self.ctx, ratio_or_width)
+
+    def layout_row_end(self):
+        if self.recording:
+            self.ops.append(__op_layout_row_end__)
+        else:
+            self.ffi_calls += 1
+            __layout_row_end__(self.ctx)
 
     def menu_end(self):
-        __menu_end__(self.ctx)
+        if self.recording:
+            self.ops.append(__op_menu_end__)
+        else:
+            self.ffi_calls += 1
+            __menu_end__(self.ctx)
 
     def style_pop_font(self):
+        self.text_width_font = None
+        if self.recording:
+            self.ops.append(__op_style_pop_font__)
+            return 1
+        self.ffi_calls += 1
         return __style_pop_font__(self.ctx)
 
     def style_pop_float(self):
+        if self.recording:
+            self.ops.append(__op_style_pop_float__)
+            return 1
+        self.ffi_calls += 1
         return __style_pop_float__(self.ctx)
 
     def style_pop_vec2(self):
+        self.text_width_font = None
+        if self.recording:
+            self.ops.append(__op_style_pop_vec2__)
+            return 1
+        self.ffi_calls += 1
         return __style_pop_vec2__(self.ctx)
 
     def style_pop_style_item(self):
+        if self.recording:
+            self.ops.append(__op_style_pop_style_item__)
+            return 1
+        self.ffi_calls += 1
         return __style_pop_style_item__(self.ctx)
 
     def style_pop_flags(self):
+        if self.recording:
+            self.ops.append(__op_style_pop_flags__)
+            return 1
+        self.ffi_calls += 1
         return __style_pop_flags__(self.ctx)
 
     def style_pop_color(self):
+        if self.recording:
+            self.ops.append(__op_style_pop_color__)
+            return 1
+        self.ffi_calls += 1
         return __style_pop_color__(self.ctx)
 
 
     def rgb_cf(self,colorf):
-        return __rgb_cf__(self.ctx, colorf)
+        return __rgb_cf__(colorf)
 
     def menubar_end(self):
-        __menubar_end__(self.ctx)
+        if self.recording:
+            self.ops.append(__op_menubar_end__)
+        else:
+            self.ffi_calls += 1
+            __menubar_end__(self.ctx)
 
     def popup_end(self):
-        __popup_end__(self.ctx)
-
+        if self.recording:
+            self.ops.append(__op_popup_end__)
+        else:
+            self.ffi_calls += 1
+            __popup_end__(self.ctx)
+
+    # items is a ComboItems, or a sequence of strings.  the encoded items
+    # of the last 64 different sequences are cached
     def combo(self, items, selected, item_height, size):
-        count = len(items)
-
-        ctypesList = []
-        for x in range(count):
-            ctypesList.append(str.encode(items[x]))
-        arr = (ctypes.c_char_p * len(ctypesList)) (*ctypesList)
-
-        return __combo__(self.ctx, arr, count, selected, item_height, size)
+        self.flush()
+        items = self.__combo_items__(items)
+        self.ffi_calls += 1
+        return __combo__(self.ctx, items.array, len(items), selected, item_height, size)
+
+    def __combo_items__(self, items):
+        if isinstance(items, ComboItems):
+            return items
+        key = tuple(items)
+        # reinserted on every use, so the dict stays in order of use
+        prepared = self.combo_items.pop(key, None)
+        if prepared is None:
+            prepared = ComboItems(key)
+            if len(self.combo_items) >= 64:
+                del self.combo_items[next(iter(self.combo_items))]
+        self.combo_items[key] = prepared
+        return prepared
+
+    # items is a single bytes or str, with the items separated by
+    # zeros, so there are no per item objects at all
+    def combo_string(self, items, selected, count, item_height, size):
+        self.flush()
+        self.ffi_calls += 1
+        return __combo_string__(self.ctx, __encode__(items), selected, count, item_height, size)
+
+    # items is a single bytes or str, with the items separated by the
+    # separator character
+    def combo_separator(self, items, separator, selected, count, item_height, size):
+        self.flush()
+        if not isinstance(separator, int):
+            separator = ord(separator)
+        self.ffi_calls += 1
+        return __combo_separator__(self.ctx, __encode__(items), separator, selected, count, item_height, size)
 
     def tree_push(self, theType, title, state):
+        self.flush()
+        self.ffi_calls += 1
         return __tree_push__(self.ctx, theType, title, state)
 
     def tree_push_id(self, theType, title, state, id):
+        self.flush()
+        self.ffi_calls += 1
         return __tree_push_id__(self.ctx, theType, title, state, id)
 
     def tree_pop(self):
-        __tree_pop__(self.ctx)
+        if self.recording:
+            self.ops.append(__op_tree_pop__)
+        else:
+            self.ffi_calls += 1
+            __tree_pop__(self.ctx)
 
     def widget_width(self):
+        self.flush()
+        self.ffi_calls += 1
         return __widget_width__(self.ctx)
 
     def widget_bounds(self):
+        self.flush()
+        self.ffi_calls += 1
         return __widget_bounds__(self.ctx)
 
     def button_set_behavior(self, behavior):
-        __button_set_behavior__(self.ctx, behavior)
+        if self.recording:
+            self.ops += __pack_int__.pack(__op_button_set_behavior__, behavior)
+        else:
+            self.ffi_calls += 1
+            __button_set_behavior__(self.ctx, behavior)
 
     def button_color(self,color):
+        self.flush()
+        self.ffi_calls += 1
         return __button_color__(self.ctx,color)
 
     def button_symbol(self, symbol):
+        self.flush()
+        self.ffi_calls += 1
         return __button_symbol__(self.ctx, symbol)
 
     def button_symbol_label(self,symbol,label,align):
-        return __button_symbol_label__(self.ctx, symbol, str.encode(label), align)
+        self.flush()
+        self.ffi_calls += 1
+        return __button_symbol_label__(self.ctx, symbol, __encode__(label), align)
 
     def set_style_window_header_align(self, header_align):
-        __set_style_window_header_align__(self.ctx, header_align)
+        if self.recording:
+            self.ops += __pack_int__.pack(__op_set_style_window_header_align__, header_align)
+        else:
+            self.ffi_calls += 1
+            __set_style_window_header_align__(self.ctx, header_align)
 
     def input_is_mouse_hovering_rect(self, bounds):
+        self.flush()
+        self.ffi_calls += 1
         return __input_is_mouse_hovering_rect__(self.ctx, bounds)
 
     def style_push_window_spacing(self, vec2):
+        self.text_width_font = None
+        if self.recording:
+            self.ops += __pack_float_float__.pack(__op_style_push_window_spacing__, vec2.x, vec2.y)
+            return 1
+        self.ffi_calls += 1
         return __style_push_window_spacing__(self.ctx, vec2)
 
     def style_push_button_rounding(self, f):
-        return __style_push_button_rounding__(self.ctx,ctypes.c_float(f))
-
+        self.text_width_font = None
+        if self.recording:
+            self.ops += __pack_float__.pack(__op_style_push_button_rounding__, f)
+            return 1
+        self.ffi_calls += 1
+        return __style_push_button_rounding__(self.ctx, f)
+
+    # the width of a button with s as its label.  widths are cached, see
+    # TextWidthCache; the current font and button padding are asked for
+    # again after every begin and style push or pop, and the cache is
+    # cleared after a backend rebuilds its fonts, see fontsRebuilt.  call
+    # text_style_changed after changing them any other way in a window
     def get_text_width(self, s):
-        return __get_text_width__(self.ctx, str.encode(s))
+        font = self.text_width_font
+        if self.text_widths_generation != fontGeneration:
+            self.text_widths_generation = fontGeneration
+            self.text_widths_cache.clear()
+            font = None
+        if font is None:
+            font = self.text_style_changed()
+        key = (font, s)
+        width = self.text_widths_cache.get(key)
+        if width is None:
+            self.flush()
+            self.ffi_calls += 1
+            width = __get_text_width__(self.ctx, __encode__(s))
+            self.text_widths_cache.put(key, width)
+        return width
+
+    def text_style_changed(self):
+        self.flush()
+        self.ffi_calls += 1
+        font = __text_width_font__(self.ctx, self.text_width_metrics)
+        self.text_width_font = (font, self.text_width_metrics[0], self.text_width_metrics[1])
+        return self.text_width_font
+
+    # get_text_width of each of strings, a ComboItems or a list of
+    # strings, in one call.  returns a float32 array of the widths
+    def text_widths(self, strings):
+        self.flush()
+        strings = self.__combo_items__(strings)
+        widths = np.empty(len(strings), dtype=np.float32)
+        self.ffi_calls += 1
+        __text_widths__(self.ctx, strings.array, len(strings), widths.ctypes.data)
+        return widths
+
+    # every drawing command of the current frame, from a single walk of the
+    # command buffer in C (nk__begin/nk__next).  returns a COMMAND array
+    # and the text bytes which its text commands point into; both are views
+    # of buffers which are reused by the next call.  call this after the
+    # last window has ended, and before the frame is rendered or cleared.
+    def commands(self):
+        self.flush()
+        textUsed = c_int()
+        while True:
+            self.ffi_calls += 1
+            count = __commands__(self.ctx,
+                                 self.command_records.ctypes.data, len(self.command_records),
+                                 self.command_text.ctypes.data, len(self.command_text),
+                                 byref(textUsed))
+            if count <= len(self.command_records) and textUsed.value <= len(self.command_text):
+                return self.command_records[:count], self.command_text[:textUsed.value]
+            if count > len(self.command_records):
+                self.command_records = np.zeros(max(count, 2 * len(self.command_records)), dtype=COMMAND)
+            if textUsed.value > len(self.command_text):
+                self.command_text = np.zeros(max(textUsed.value, 2 * len(self.command_text)), dtype=np.uint8)
+
+    # nk_convert the current frame into vertices and elements, which are
+    # NumPy arrays (or other writable buffers) owned by the caller and
+    # written in place.  config is a ConvertConfig whose vertex layout
+    # matches the vertices.  returns the CONVERT_* result flags, the number
+    # of vertices and elements the frame needs, which may be more than fit
+    # when CONVERT_VERTEX_BUFFER_FULL or CONVERT_ELEMENT_BUFFER_FULL is
+    # set, and a DRAW_COMMAND array, a view of a buffer which is reused by
+    # the next call.  the frame is not cleared, call clear once it's drawn.
+    def convert(self, config, vertices, elements):
+        self.flush()
+        vertexPointer, vertexBytes, vertexKeepalive = writableBuffer(vertices)
+        elementPointer, elementBytes, elementKeepalive = writableBuffer(elements)
+        verticesNeeded, elementsNeeded, count = c_int(), c_int(), c_int()
+        while True:
+            self.ffi_calls += 1
+            result = __convert__(self.ctx, byref(config),
+                                 vertexPointer, vertexBytes,
+                                 elementPointer, elementBytes,
+                                 self.draw_command_records.ctypes.data, len(self.draw_command_records),
+                                 byref(verticesNeeded), byref(elementsNeeded), byref(count))
+            if count.value <= len(self.draw_command_records):
+                break
+            self.draw_command_records = np.zeros(max(count.value, 2 * len(self.draw_command_records)),
+                                                 dtype=DRAW_COMMAND)
+        return (result,
+                verticesNeeded.value // config.vertex_size,
+                elementsNeeded.value // np.dtype(ELEMENT).itemsize,
+                self.draw_command_records[:count.value])
+
+    # hit rate of the encoded string cache which is shared by all contexts
+    def string_cache_stats(self):
+        return stringCache.stats()
+
+    # a window with statistics about the previous frame, for diagnosing
+    # stutter in a running application.  call it once per frame, between
+    # glfw3_new_frame and glfw3_render; the frame time is the time between
+    # two calls.  it shows
+    #   fps and a plot of recent frame times
+    #   the vertices, elements and draw commands nk_convert produced, on
+    #   backends which count them
+    #   FFI calls into nuklear, where a batch of recorded calls counts
+    #   as one call
+    #   the net change in allocated Python memory blocks, and the number
+    #   of garbage collections.  blocks allocated and freed within the
+    #   frame cancel out, so this is not a count of allocations
+    #   the p95 time of each stage, when given a FrameProfiler
+    # the labels are formatted as bytes, so they bypass the string cache.
+    def perf_overlay(self, bounds=None, profiler=None, title="Performance",
+                     flags=WINDOW_BORDER|WINDOW_MOVABLE|WINDOW_SCALABLE|WINDOW_MINIMIZABLE|WINDOW_TITLE):
+        if self.perf_stats is None:
+            self.perf_stats = PerfStats()
+        stats = self.perf_stats
+        stats.update(self.ffi_calls)
+        if bounds is None:
+            bounds = Rect(10.0, 10.0, 280.0, 340.0)
+        if self.begin(title, bounds, flags):
+            history = stats.history()
+            self.layout_row_dynamic(18.0, 1)
+            if len(history):
+                self.label(b"%.1f fps   %.2f ms   max %.2f ms" % (1000.0 / max(float(history[-1]), 1e-3),
+                                                                  history[-1],
+                                                                  history.max()),
+                           TEXT_LEFT)
+                self.layout_row_dynamic(60.0, 1)
+                self.plot(CHART_COLUMN, history)
+                self.layout_row_dynamic(18.0, 1)
+            if __render_stats__:
+                self.label(b"vertices %d   elements %d" % (stats.vertices.value, stats.elements.value), TEXT_LEFT)
+                self.label(b"draw commands %d" % stats.draw_commands.value, TEXT_LEFT)
+                if stats.convert_result.value & (CONVERT_VERTEX_BUFFER_FULL | CONVERT_ELEMENT_BUFFER_FULL):
+                    self.label_colored(b"vertex/element buffer full", TEXT_LEFT, Color(255, 80, 80, 255))
+            if __buffer_stats__:
+                self.label(b"buffers %s / %s   peak %s / %s" % (__format_bytes__(stats.vertex_capacity.value),
+                                                              __format_bytes__(stats.element_capacity.value),
+                                                              __format_bytes__(stats.vertex_high_water.value),
+                                                              __format_bytes__(stats.element_high_water.value)),
+                           TEXT_LEFT)
+            self.label(b"FFI calls %d" % stats.calls, TEXT_LEFT)
+            self.label(b"net python blocks %+d   gc %d" % (stats.net_blocks, stats.gc_collections), TEXT_LEFT)
+            if profiler is not None:
+                percentiles = profiler.percentiles(q=(95,))
+                for stage, value in percentiles.items():
+                    self.label(b"%-10s p95 %.2f ms" % (stage.encode(), value['p95'] * 1000.0), TEXT_LEFT)
+        self.end()
@@ -25,6 +25,11 @@ from ctypes import (Structure, POINTER, CFUNCTYPE, byref, c_char_p, c_int, c_sho
                     c_uint, c_double, c_float, c_ushort, c_byte, c_ubyte)
 import inspect
 import builtins
+import heapq
+import itertools
+import json
+import time
+import numpy as np
 import glfw.glfw as glfw
 import nuklear as nk
 
@@ -35,20 +40,337 @@ GLFW3_DEFAULT=0
 GLFW3_INSTALL_CALLBACKS=1
 
 
-glfw3_init             = nk._nuklear.nk_glfw3_init
-glfw3_init.restype     = POINTER(nk.Context)
-glfw3_init.arglist     = [POINTER(glfw.GLFWwindow), c_int]
+# how the OpenGL 3 backend streams each frame's vertices and elements:
+# orphaning and mapping the buffers every frame, writing into the next
+# section of a fenced ring with unsynchronized glMapBufferRange, or the
+# same ring kept mapped persistently (GL 4.4 or ARB_buffer_storage)
+UPLOAD_ORPHAN=0
+UPLOAD_RING=1
+UPLOAD_PERSISTENT=2
+
+__glfw3_init__ = nk.prototype('nk_glfw3_init', [POINTER(glfw.GLFWwindow), c_int], POINTER(nk.Context))
+
+# upload is one of the UPLOAD_* strategies above, and is ignored by the
+# OpenGL 2 backend, which has no vertex buffers
+def glfw3_init(window, init_state, upload=UPLOAD_ORPHAN):
+    ctx = __glfw3_init__(window, init_state)
+    if upload != UPLOAD_ORPHAN and hasattr(nk._nuklear, 'nk_glfw3_set_upload'):
+        glfw3_set_upload(upload)
+    return ctx
 
 class FontAtlas(Structure): pass
 
-glfw3_font_stash_begin = nk._nuklear.nk_glfw3_font_stash_begin
-glfw3_font_stash_begin.arglist = [POINTER(POINTER(FontAtlas))]
+glfw3_font_stash_begin = nk.prototype('nk_glfw3_font_stash_begin', [POINTER(POINTER(FontAtlas))])
+
+__glfw3_font_stash_end__ = nk.prototype('nk_glfw3_font_stash_end', [])
+
+def glfw3_font_stash_end():
+    __glfw3_font_stash_end__()
+    nk.fontsRebuilt()
+
+glfw3_new_frame = nk.prototype('nk_glfw3_new_frame', [])
+
+
+# the OpenGL 3 backend streams into vertex and element buffers whose sizes
+# are passed in at render time, the OpenGL 2 backend only takes the
+# anti-aliasing flag
+if hasattr(nk._nuklear, 'nk_glfw3_device_create'):
+    glfw3_render = nk.prototype('nk_glfw3_render', [c_int, c_int, c_int])
+    # true if input arrived or the UI built this frame differs from the
+    # last rendered one; when false the app may skip clearing, rendering
+    # and swapping, but must still call nk.clear
+    glfw3_frame_changed = nk.prototype('nk_glfw3_frame_changed', [], c_int)
+    # CPU seconds spent converting, uploading and drawing in the last
+    # glfw3_render
+    glfw3_render_timings = nk.prototype('nk_glfw3_render_timings', [POINTER(c_double), POINTER(c_double), POINTER(c_double)])
+    # the font texture's white pixel, for NuklearContext.convert
+    glfw3_null_texture = nk.prototype('nk_glfw3_null_texture', [POINTER(nk.DrawNullTexture)])
+    # the sizes in bytes of the vertex and element buffers, which grow when
+    # a frame doesn't fit and shrink after a while of using little of them,
+    # and the most either has needed
+    glfw3_buffer_stats = nk.prototype('nk_glfw3_buffer_stats', [POINTER(c_int), POINTER(c_int), POINTER(c_int), POINTER(c_int)])
+    # switch to another UPLOAD_* strategy after glfw3_init.  returns the
+    # one in use, UPLOAD_RING when persistent mapping isn't supported
+    glfw3_set_upload = nk.prototype('nk_glfw3_set_upload', [c_int], c_int)
+    __glfw3_set_tessellation__ = nk.prototype('nk_glfw3_set_tessellation', [c_int, c_int, c_uint, c_uint, c_uint, c_float])
+
+    # how finely the following renders tessellate.  line_AA and shape_AA
+    # default to glfw3_render's anti_aliasing argument, the segment counts
+    # of circles, arcs and curves to 22.  with a lod_tolerance in pixels,
+    # the segment counts become the most that are used, and each frame uses
+    # only as many as its largest circle, arc and curve need to stay within
+    # the tolerance
+    def glfw3_set_tessellation(line_AA=None, shape_AA=None,
+                               circle_segments=None, arc_segments=None, curve_segments=None,
+                               lod_tolerance=0.0):
+        __glfw3_set_tessellation__(-1 if line_AA is None else line_AA,
+                                   -1 if shape_AA is None else shape_AA,
+                                   circle_segments or 0,
+                                   arc_segments or 0,
+                                   curve_segments or 0,
+                                   lod_tolerance)
+
+    # convert each frame on a worker thread while the next one is built.
+    # glfw3_render then draws the frame handed over by the render before.
+    # the first frame, one after glfw3_render_flush drew the one before,
+    # and one after a resize or a window opening or closing are drawn at
+    # once instead.  returns whether frames are pipelined
+    glfw3_set_pipelined = nk.prototype('nk_glfw3_set_pipelined', [c_int], c_int)
+    # whether the last frame handed over hasn't been drawn yet; a loop
+    # which skips rendering unchanged frames draws it with
+    # glfw3_render_flush, then swaps
+    glfw3_render_pending = nk.prototype('nk_glfw3_render_pending', [], c_int)
+    glfw3_render_flush = nk.prototype('nk_glfw3_render_flush', [])
+
+    # the state of the backend for one window: its nuklear context, input,
+    # GL objects and fonts.  glfw3_* functions work on the current one
+    class GLFW3State(Structure): pass
+
+    glfw3_create = nk.prototype('nk_glfw3_create', [], POINTER(GLFW3State))
+    glfw3_make_current = nk.prototype('nk_glfw3_make_current', [POINTER(GLFW3State)])
+    glfw3_destroy = nk.prototype('nk_glfw3_destroy', [POINTER(GLFW3State)])
+    glfw3_font_stash_share = nk.prototype('nk_glfw3_font_stash_share', [POINTER(GLFW3State)])
+
+    # a backend for one of several windows, each with a context and
+    # buffers of its own.  with share, another Backend whose window was
+    # passed as the share argument of glfwCreateWindow, the font texture is
+    # shared instead of baked again; destroy this backend before that one.
+    # call make_current before building, rendering or destroying
+    class Backend:
+        def __init__(self, window, init_state=GLFW3_INSTALL_CALLBACKS, upload=UPLOAD_ORPHAN, share=None):
+            self.window = window
+            self.handle = glfw3_create()
+            self.make_current()
+            self.ctx = glfw3_init(window, init_state, upload)
+            if share is None:
+                fontAtlas = POINTER(FontAtlas)()
+                glfw3_font_stash_begin(byref(fontAtlas))
+                glfw3_font_stash_end()
+            else:
+                glfw3_font_stash_share(share.handle)
+            self.nuklear = nk.NuklearContext(self.ctx)
+
+        # make the window's GL context and this backend current
+        def make_current(self):
+            glfw.glfwMakeContextCurrent(self.window)
+            glfw3_make_current(self.handle)
+
+        def destroy(self):
+            self.make_current()
+            glfw3_destroy(self.handle)
+            self.handle = None
+else:
+    glfw3_render = nk.prototype('nk_glfw3_render', [c_int])
+
+
+# the stages of a frame, in the order they happen.  convert and upload are
+# only measured by the OpenGL 3 backend; otherwise they are part of draw.
+PROFILE_POLL=0
+PROFILE_NEW_FRAME=1
+PROFILE_BUILD=2
+PROFILE_SCENE=3
+PROFILE_CONVERT=4
+PROFILE_UPLOAD=5
+PROFILE_DRAW=6
+PROFILE_SWAP=7
+PROFILE_TOTAL=8
+PROFILE_STAGES = ('poll', 'new_frame', 'build', 'scene', 'convert', 'upload', 'draw', 'swap', 'total')
+
+# seconds per stage for the last capacity frames.  a frame is timed by
+# calling begin_frame, then mark(stage) as each stage finishes, then
+# end_frame.  each mark only writes into a reused list, which is copied
+# into the ring buffer array once per frame.
+class FrameProfiler:
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.times = np.zeros((capacity, len(PROFILE_STAGES)))
+        self.frames = 0
+        self.current = [0.0] * len(PROFILE_STAGES)
+        self.start = self.last = 0.0
+        self.convert = c_double()
+        self.upload = c_double()
+
+    def begin_frame(self):
+        for stage in range(len(self.current)):
+            self.current[stage] = 0.0
+        self.start = self.last = time.perf_counter()
+
+    # charge the time since the previous mark to stage
+    def mark(self, stage):
+        now = time.perf_counter()
+        elapsed = now - self.last
+        self.current[stage] += elapsed
+        self.last = now
+        return elapsed
+
+    # mark the end of glfw3_render, split into its parts when the
+    # backend measures them
+    def mark_render(self):
+        elapsed = self.mark(PROFILE_DRAW)
+        if hasattr(nk._nuklear, 'nk_glfw3_render_timings'):
+            glfw3_render_timings(byref(self.convert), byref(self.upload), None)
+            self.current[PROFILE_CONVERT] += self.convert.value
+            self.current[PROFILE_UPLOAD] += self.upload.value
+            self.current[PROFILE_DRAW] -= self.convert.value + self.upload.value
+
+    def end_frame(self):
+        self.current[PROFILE_TOTAL] = time.perf_counter() - self.start
+        self.times[self.frames % self.capacity] = self.current
+        self.frames += 1
+
+    # the recorded frames, oldest first
+    def samples(self):
+        if self.frames <= self.capacity:
+            return self.times[:self.frames]
+        return np.roll(self.times, -(self.frames % self.capacity), axis=0)
+
+    # {stage: {'p50': seconds, ...}} over the recorded frames
+    def percentiles(self, q=(50, 95, 99)):
+        samples = self.samples()
+        if len(samples) == 0:
+            return {}
+        values = np.percentile(samples, q, axis=0)
+        return {stage: {'p%g' % p: float(values[i][s]) for i, p in enumerate(q)}
+                for s, stage in enumerate(PROFILE_STAGES)}
+
+    def dump_csv(self, path):
+        np.savetxt(path, self.samples(), delimiter=',',
+                   header=','.join(PROFILE_STAGES), comments='')
+
+    def dump_json(self, path):
+        with open(path, 'w') as f:
+            json.dump({'stages': PROFILE_STAGES,
+                       'frames': self.samples().tolist(),
+                       'percentiles': self.percentiles()}, f)
+
+
+# run() blocks in glfwWaitEvents while the UI is idle instead of redrawing as
+# fast as possible.  It wakes on input, on a due timer, or when
+# request_redraw() is called (from any thread).
+
+__redraw_requested__ = False
+__timers__ = []
+__timer_sequence__ = itertools.count()
+
+def request_redraw():
+    global __redraw_requested__
+    __redraw_requested__ = True
+    glfw.glfwPostEmptyEvent()
+
+# call callback() once, delay seconds from now, and redraw afterwards
+def add_timer(delay, callback):
+    heapq.heappush(__timers__, (glfw.glfwGetTime() + delay, next(__timer_sequence__), callback))
+    glfw.glfwPostEmptyEvent()
+
+def __fire_timers__():
+    global __redraw_requested__
+    now = glfw.glfwGetTime()
+    while __timers__ and __timers__[0][0] <= now:
+        deadline, sequence, callback = heapq.heappop(__timers__)
+        callback()
+        __redraw_requested__ = True
+
+# seconds to sleep before the next timer or idle timeout, None for forever
+def __idle_timeout__(idle_timeout):
+    timeout = idle_timeout
+    if __timers__:
+        untilTimer = max(__timers__[0][0] - glfw.glfwGetTime(), 0.0)
+        if timeout is None or untilTimer < timeout:
+            timeout = untilTimer
+    return timeout
+
+# events arriving while waiting are accumulated by the backend's callbacks
+# and handed to nuklear by the next glfw3_new_frame
+def __wait_until__(window, deadline):
+    now = glfw.glfwGetTime()
+    while now < deadline and not glfw.glfwWindowShouldClose(window):
+        glfw.glfwWaitEventsTimeout(deadline - now)
+        now = glfw.glfwGetTime()
 
-glfw3_font_stash_end = nk._nuklear.nk_glfw3_font_stash_end
+# build() creates the UI for one frame, and returns true while it is
+# animating and wants another frame.  draw(width, height) sets up the
+# viewport, clears and draws the scene underneath the UI.  Frames are never
+# drawn more often than max_fps.  With an idle_timeout, an otherwise idle
+# loop still builds a frame that often.  Drawn frames are timed into
+# profiler, a FrameProfiler, when one is given.  The OpenGL 3 backend
+# starts with vertex and element buffers of max_vertex_buffer and
+# max_element_buffer bytes, and grows them when a frame doesn't fit.
+# With pipelined, it converts each frame while the next is built, and
+# shows each frame one render later, see glfw3_set_pipelined.
+def run(window, ctx, build, draw,
+        max_fps=60.0,
+        idle_timeout=None,
+        anti_aliasing=nk.ANTI_ALIASING_ON,
+        max_vertex_buffer=128 * 1024,
+        max_element_buffer=32 * 1024,
+        profiler=None,
+        pipelined=False):
+    global __redraw_requested__
+    if pipelined and hasattr(nk._nuklear, 'nk_glfw3_set_pipelined'):
+        pipelined = bool(glfw3_set_pipelined(True))
+    else:
+        pipelined = False
+    minInterval = 1.0 / max_fps if max_fps else 0.0
+    lastFrame = glfw.glfwGetTime() - minInterval
+    pending = True
+    while not glfw.glfwWindowShouldClose(window):
+        woke = not pending
+        if woke:
+            timeout = __idle_timeout__(idle_timeout)
+            if timeout is None:
+                glfw.glfwWaitEvents()
+            else:
+                glfw.glfwWaitEventsTimeout(timeout)
+        __wait_until__(window, lastFrame + minInterval)
+        if profiler:
+            profiler.begin_frame()
+        glfw.glfwPollEvents()
+        __fire_timers__()
+        if profiler:
+            profiler.mark(PROFILE_POLL)
 
-glfw3_new_frame = nk._nuklear.nk_glfw3_new_frame
+        redraw = __redraw_requested__
+        __redraw_requested__ = False
+        glfw3_new_frame()
+        if profiler:
+            profiler.mark(PROFILE_NEW_FRAME)
+        animating = build()
 
+        # nuklear needs another frame after input to settle hover and
+        # active state.  With change detection, frames keep coming until
+        # one is identical to the last; without it, one follows each wake
+        if hasattr(nk._nuklear, 'nk_glfw3_device_create'):
+            changed = glfw3_frame_changed()
+            pending = bool(animating or changed or __redraw_requested__)
+        else:
+            changed = True
+            pending = bool(animating or woke or __redraw_requested__)
+        if profiler:
+            profiler.mark(PROFILE_BUILD)
 
+        idle = not (changed or redraw or animating)
+        if idle:
+            nk.clear(ctx)
+            # the last frame built is still in the pipeline, undrawn
+            if not (pipelined and glfw3_render_pending()):
+                continue
 
-glfw3_render = nk._nuklear.nk_glfw3_render
-glfw3_render.arglist = [c_int, c_int, c_int]
+        lastFrame = glfw.glfwGetTime()
+        width, height = glfw.glfwGetFramebufferSize(window)
+        draw(width, height)
+        if profiler:
+            profiler.mark(PROFILE_SCENE)
+        if idle:
+            glfw3_render_flush()
+        elif hasattr(nk._nuklear, 'nk_glfw3_device_create'):
+            glfw3_render(anti_aliasing, max_vertex_buffer, max_element_buffer)
+        else:
+            glfw3_render(anti_aliasing)
+        if profiler:
+            profiler.mark_render()
+        glfw.glfwSwapBuffers(window)
+        if profiler:
+            profiler.mark(PROFILE_SWAP)
+            profiler.end_frame()
+    if pipelined:
+        glfw3_set_pipelined(False)
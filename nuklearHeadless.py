@@ -0,0 +1,391 @@
+#Copyright (c) 2017-2018 William Emerison Six
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+
+# bindings to nuklear_headless.h, a backend without a window or a GPU, for
+# rendering UIs in tests and batch jobs, and for benchmarking UI building.
+# builtins.NUKLEAR_PATH must be the nuklearHeadless shared library.
+
+import ctypes
+from ctypes import (Structure, POINTER, byref, c_int, c_uint, c_float, c_void_p)
+import numpy as np
+import nuklear as nk
+
+
+headless_init = nk.prototype('nk_headless_init', [], POINTER(nk.Context))
+
+headless_shutdown = nk.prototype('nk_headless_shutdown', [])
+
+class FontAtlas(Structure): pass
+
+headless_font_stash_begin = nk.prototype('nk_headless_font_stash_begin', [POINTER(POINTER(FontAtlas))])
+
+__headless_font_stash_end__ = nk.prototype('nk_headless_font_stash_end', [])
+
+def headless_font_stash_end():
+    __headless_font_stash_end__()
+    nk.fontsRebuilt()
+
+headless_font_image = nk.prototype('nk_headless_font_image', [POINTER(c_int), POINTER(c_int)], c_void_p)
+
+headless_char = nk.prototype('nk_headless_char', [c_uint])
+
+# buttons is a bit mask of 1 << nk.BUTTON_LEFT etc.
+headless_new_frame = nk.prototype('nk_headless_new_frame', [c_float, c_float, c_int, c_float])
+
+headless_convert = nk.prototype('nk_headless_convert',
+                                [c_int,
+                                 c_void_p, c_int,
+                                 c_void_p, c_int,
+                                 c_void_p, c_int,
+                                 POINTER(c_int), POINTER(c_int), POINTER(c_int)],
+                                c_uint)
+
+headless_null_texture = nk.prototype('nk_headless_null_texture', [POINTER(nk.DrawNullTexture)])
+
+# must match struct nk_headless_vertex and struct nk_headless_draw_command,
+# which is laid out like the draw commands of NuklearContext.convert
+VERTEX = np.dtype([('position', np.float32, 2),
+                   ('uv', np.float32, 2),
+                   ('col', np.uint8, 4)])
+DRAW_COMMAND = nk.DRAW_COMMAND
+ELEMENT = nk.ELEMENT
+
+FONT_TEXTURE = 1
+
+
+# the baked font atlas as an RGBA array, sampled for text and, through
+# nuklear's null texture, for every other shape
+def font_image():
+    width, height = c_int(), c_int()
+    pointer = headless_font_image(byref(width), byref(height))
+    pixels = (ctypes.c_ubyte * (width.value * height.value * 4)).from_address(pointer)
+    return np.frombuffer(pixels, dtype=np.uint8).reshape(height.value, width.value, 4).copy()
+
+
+# converts each frame into vertex, element and draw command arrays which
+# are reused from frame to frame, and grown when a frame doesn't fit, and
+# rasterizes them into an RGBA image with NumPy.  triangles are drawn in
+# order, within their clip rectangle, with the same blending as the
+# OpenGL backends.  the result matches the OpenGL backends closely but not
+# bit for bit, since textures are sampled with the nearest texel.
+class Framebuffer:
+    def __init__(self, width, height,
+                 max_vertices=64 * 1024,
+                 max_elements=128 * 1024,
+                 max_commands=4 * 1024,
+                 max_batched=1024,
+                 max_fragments=256 * 1024):
+        self.width = width
+        self.height = height
+        self.vertices = np.zeros(max_vertices, dtype=VERTEX)
+        self.elements = np.zeros(max_elements, dtype=ELEMENT)
+        self.commands = np.zeros(max_commands, dtype=DRAW_COMMAND)
+        self.vertex_count = c_int()
+        self.element_count = c_int()
+        self.command_count = c_int()
+        self.convert_result = 0
+        # see rasterize.  max_fragments bounds the memory it uses
+        self.max_batched = max_batched
+        self.max_fragments = max_fragments
+        # for each pixel, the last opaque fragment drawn over it
+        self.covered = np.zeros(width * height, dtype=np.intp)
+        self.canvas = np.zeros((height, width, 4), dtype=np.float32)
+        self.texture = font_image().astype(np.float32) / 255.0
+
+    # run nk_convert on the current frame, growing the buffers and
+    # converting again until it fits, which also clears it.  returns views
+    # of the vertices, elements and draw commands it produced
+    def convert(self, anti_aliasing=nk.ANTI_ALIASING_ON):
+        while True:
+            self.convert_result = headless_convert(anti_aliasing,
+                                                   self.vertices.ctypes.data, len(self.vertices),
+                                                   self.elements.ctypes.data, len(self.elements),
+                                                   self.commands.ctypes.data, len(self.commands),
+                                                   byref(self.vertex_count),
+                                                   byref(self.element_count),
+                                                   byref(self.command_count))
+            if not self.convert_result & __BUFFERS_FULL__:
+                break
+            # what a full buffer needs is only counted up to where nuklear
+            # stopped, so it at least doubles
+            if self.convert_result & nk.CONVERT_VERTEX_BUFFER_FULL:
+                self.vertices = __grown__(self.vertices, self.vertex_count.value)
+            if self.convert_result & nk.CONVERT_ELEMENT_BUFFER_FULL:
+                self.elements = __grown__(self.elements, self.element_count.value)
+            if self.convert_result & nk.CONVERT_COMMAND_BUFFER_FULL:
+                self.commands = __grown__(self.commands, self.command_count.value)
+        return (self.vertices[:self.vertex_count.value],
+                self.elements[:self.element_count.value],
+                self.commands[:self.command_count.value])
+
+    # convert the current frame and draw it over background.  returns
+    # the image as a (height, width, 4) uint8 array
+    def render(self, anti_aliasing=nk.ANTI_ALIASING_ON, background=(0.0, 0.0, 0.0, 1.0)):
+        vertices, elements, commands = self.convert(anti_aliasing)
+        self.canvas[...] = background
+        self.rasterize(vertices, elements, commands)
+        return (self.canvas * 255.0 + 0.5).astype(np.uint8)
+
+    # every pixel that a triangle covers is a fragment.  the triangles are
+    # drawn in order, those with more than max_batched pixels in their
+    # bounding box one at a time, and runs of the smaller ones, mostly text
+    # and anti-aliased edges, in batches of at most max_fragments bounding
+    # box pixels whose fragments are found, shaded and blended at once.
+    # so the interpreter does a little work per batch or large triangle,
+    # rather than per triangle
+    def rasterize(self, vertices, elements, commands):
+        triangles = elements[:len(elements) - len(elements) % 3].reshape(-1, 3)
+        command = np.repeat(np.arange(len(commands)), commands['elem_count'] // 3)[:len(triangles)]
+        triangles = triangles[:len(command)]
+        positions = vertices['position'][triangles].astype(np.float64)
+        colors = vertices['col'][triangles].astype(np.float32) / 255.0
+        uvs = vertices['uv'][triangles]
+
+        # wind every triangle the same way
+        (ax, ay), (bx, by), (cx, cy) = positions.transpose(1, 2, 0)
+        area = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+        flip = area < 0.0
+        for corners in (positions, colors, uvs):
+            corners[flip, 1:] = corners[flip, :0:-1]
+        area = np.abs(area)
+
+        # bounding boxes within the clip rectangles, and whether a triangle
+        # has a single color and texel, which is true of most of nuklear's
+        # fills.  images other than the font atlas aren't available here,
+        # so their triangles are drawn untextured
+        clip = commands['clip_rect'][command].astype(int)
+        lows = np.floor(positions.min(axis=1)).astype(int)
+        highs = np.ceil(positions.max(axis=1)).astype(int)
+        x0 = np.maximum(lows[:, 0], np.maximum(clip[:, 0], 0))
+        y0 = np.maximum(lows[:, 1], np.maximum(clip[:, 1], 0))
+        x1 = np.minimum(highs[:, 0], np.minimum(clip[:, 0] + clip[:, 2], self.width))
+        y1 = np.minimum(highs[:, 1], np.minimum(clip[:, 1] + clip[:, 3], self.height))
+        flatColor = (colors == colors[:, :1]).all(axis=(1, 2))
+        flatUV = (uvs == uvs[:, :1]).all(axis=(1, 2))
+        textured = commands['texture'][command] == FONT_TEXTURE
+        # the texel of triangles with a single one, and their color where
+        # that is single too
+        texels = np.ones((len(triangles), 4), dtype=np.float32)
+        texels[textured & flatUV] = self.__sample__(uvs[textured & flatUV, 0])
+        flatSources = colors[:, 0] * texels
+        smoothUV = textured & ~flatUV
+        shading = (colors, uvs, flatColor, smoothUV, texels, flatSources)
+        # what every fragment of a batched triangle needs, a row per value,
+        # since np.repeat of rows is much cheaper than indexing with the
+        # triangle of every fragment
+        triangle = np.stack([ax, ay, bx, by, cx, cy, area])
+        widths = x1 - x0
+        heights = y1 - y0
+
+        self.covered[...] = -1
+        drawn = np.flatnonzero((x0 < x1) & (y0 < y1) & (area != 0.0))
+        boxes = (widths * heights)[drawn]
+        ends = np.cumsum(boxes)
+        large = np.flatnonzero(boxes > self.max_batched)
+        first = 0
+        while first < len(drawn):
+            t = drawn[first]
+            if boxes[first] > self.max_batched:
+                self.__triangle__(t, positions[t], area[t], shading, x0[t], y0[t], x1[t], y1[t])
+                first += 1
+                continue
+            done = ends[first - 1] if first else 0
+            last = np.searchsorted(ends, done + self.max_fragments, side='right')
+            following = np.searchsorted(large, first)
+            if following < len(large):
+                last = min(last, large[following])
+            last = max(last, first + 1)
+            batch = drawn[first:last]
+            # the rows of each triangle's bounding box, then their pixels
+            row = np.repeat(batch, heights[batch])
+            rowY = y0[row] + __counting__(heights[batch])
+            t = np.repeat(row, widths[row])
+            x = np.repeat(x0[row], widths[row]) + __counting__(widths[row])
+            y = np.repeat(rowY, widths[row])
+            values = np.repeat(triangle[:, row], widths[row], axis=1)
+            self.__fragments__(done, t, x, y, values, shading)
+            first = last
+
+    # draws a single triangle, with its edge functions computed over its
+    # bounding box by broadcasting a column of rows against a row of columns
+    def __triangle__(self, t, position, area, shading, x0, y0, x1, y1):
+        colors, uvs, flatColor, smoothUV, texels, flatSources = shading
+        (ax, ay), (bx, by), (cx, cy) = position.tolist()
+        px = np.arange(x0, x1) + 0.5
+        py = (np.arange(y0, y1) + 0.5)[:, None]
+        # edge functions, each is the weight of the opposite vertex
+        wa = (cx - bx) * (py - by) - (cy - by) * (px - bx)
+        wb = (ax - cx) * (py - cy) - (ay - cy) * (px - cx)
+        wc = (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+        # pixel centers exactly on an edge belong to only one of the two
+        # triangles sharing it, so translucent quads have no seams
+        inside = ((wa > 0) | ((wa == 0) & __owns_edge__(bx, by, cx, cy))) \
+               & ((wb > 0) | ((wb == 0) & __owns_edge__(cx, cy, ax, ay))) \
+               & ((wc > 0) | ((wc == 0) & __owns_edge__(ax, ay, bx, by)))
+        if not inside.any():
+            return
+
+        if flatColor[t] and not smoothUV[t]:
+            source = flatSources[t]
+        else:
+            la = (wa[inside] / area)[:, None]
+            lb = (wb[inside] / area)[:, None]
+            lc = (wc[inside] / area)[:, None]
+            color = colors[t]
+            if flatColor[t]:
+                source = color[0][None, :]
+            else:
+                source = la * color[0] + lb * color[1] + lc * color[2]
+            if smoothUV[t]:
+                uv = uvs[t]
+                source = source * self.__sample__(la * uv[0] + lb * uv[1] + lc * uv[2])
+            else:
+                source = source * texels[t]
+
+        # glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA) on every channel
+        region = self.canvas[y0:y1, x0:x1]
+        destination = region[inside]
+        alpha = source[..., 3:4]
+        region[inside] = source * alpha + destination * (1.0 - alpha)
+
+    # shades and blends the fragments of a batch.  fragment i of a batch
+    # is fragment done + i of the frame
+    def __fragments__(self, done, t, x, y, values, shading):
+        colors, uvs, flatColor, smoothUV, texels, flatSources = shading
+        ax, ay, bx, by, cx, cy, area = values
+        px = x + 0.5
+        py = y + 0.5
+        # edge functions, each is the weight of the opposite vertex
+        wa = (cx - bx) * (py - by) - (cy - by) * (px - bx)
+        wb = (ax - cx) * (py - cy) - (ay - cy) * (px - cx)
+        wc = (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+        # pixel centers exactly on an edge belong to only one of the two
+        # triangles sharing it, so translucent quads have no seams
+        inside = ((wa > 0) | ((wa == 0) & __owns_edge__(bx, by, cx, cy))) \
+               & ((wb > 0) | ((wb == 0) & __owns_edge__(cx, cy, ax, ay))) \
+               & ((wc > 0) | ((wc == 0) & __owns_edge__(ax, ay, bx, by)))
+        index = np.flatnonzero(inside)
+        t = t[index]
+        pixel = y[index] * self.width + x[index]
+        index += done
+
+        # only fragments of triangles whose colors or texels vary are
+        # interpolated
+        source = flatSources[t]
+        blended = ~flatColor[t]
+        smooth = smoothUV[t]
+        shaded = blended | smooth
+        if shaded.any():
+            blended = blended[shaded]
+            smooth = smooth[shaded]
+            area = area[inside][shaded]
+            la = (wa[inside][shaded] / area)[:, None]
+            lb = (wb[inside][shaded] / area)[:, None]
+            lc = (wc[inside][shaded] / area)[:, None]
+            t = t[shaded]
+            color = colors[t]
+            color = np.where(blended[:, None], la * color[:, 0] + lb * color[:, 1] + lc * color[:, 2], color[:, 0])
+            texel = texels[t]
+            if smooth.any():
+                corner = uvs[t[smooth]]
+                texel[smooth] = self.__sample__(la[smooth] * corner[:, 0] +
+                                                lb[smooth] * corner[:, 1] +
+                                                lc[smooth] * corner[:, 2])
+            source[shaded] = color * texel
+
+        # glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA) on every
+        # channel.  an opaque fragment hides every fragment before it and
+        # a transparent one changes nothing, so what is left is at most
+        # one opaque fragment per pixel, copied, followed by translucent
+        # fragments, which are blended in order, one layer per pixel at a
+        # time.  the sort is stable, so fragments stay in order
+        alpha = source[:, 3]
+        opaque = alpha == 1.0
+        np.maximum.at(self.covered, pixel[opaque], index[opaque])
+        visible = (index >= self.covered[pixel]) & (alpha > 0.0)
+        canvas = self.canvas.reshape(-1, 4)
+        copied = visible & opaque
+        canvas[pixel[copied]] = source[copied]
+
+        translucent = visible & ~opaque
+        pixel = pixel[translucent]
+        source = source[translucent]
+        order = np.argsort(pixel, kind='stable')
+        ordered = pixel[order]
+        starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+        layer = np.arange(len(ordered)) - np.repeat(starts, np.diff(np.r_[starts, len(ordered)]))
+        byLayer = order[np.argsort(layer, kind='stable')]
+        first = 0
+        for count in np.bincount(layer).tolist():
+            fragments = byLayer[first:first + count]
+            where = pixel[fragments]
+            color = source[fragments]
+            alpha = color[:, 3:4]
+            canvas[where] = color * alpha + canvas[where] * (1.0 - alpha)
+            first += count
+
+    # nearest texel lookup of the font atlas
+    def __sample__(self, uv):
+        height, width = self.texture.shape[:2]
+        u = np.minimum((uv[:, 0] * width).astype(int), width - 1)
+        v = np.minimum((uv[:, 1] * height).astype(int), height - 1)
+        return self.texture[v, u]
+
+
+__BUFFERS_FULL__ = (nk.CONVERT_VERTEX_BUFFER_FULL |
+                    nk.CONVERT_ELEMENT_BUFFER_FULL |
+                    nk.CONVERT_COMMAND_BUFFER_FULL)
+
+# 0 to count - 1 for each of counts, one after the other
+def __counting__(counts):
+    return np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+def __grown__(array, needed):
+    return np.zeros(max(needed, 2 * len(array)), dtype=array.dtype)
+
+
+# the top left rule, from the point of view of the edge's direction: of
+# the two triangles sharing an edge, the one that has it pointing down
+# (or left, when horizontal) owns the pixels on it
+def __owns_edge__(x0, y0, x1, y1):
+    return (y1 > y0) | ((y1 == y0) & (x1 < x0))
+
+
+# the font atlas's white pixel, for a ConvertConfig of one's own
+def null_texture():
+    null = nk.DrawNullTexture()
+    headless_null_texture(byref(null))
+    return null
+
+
+# set up a context with the default font, ready for building frames
+def init():
+    ctx = headless_init()
+    fontAtlas = POINTER(FontAtlas)()
+    headless_font_stash_begin(byref(fontAtlas))
+    headless_font_stash_end()
+    return ctx
+
+
+def new_frame(mouse_x=0.0, mouse_y=0.0, buttons=0, scroll=0.0, text=''):
+    for character in text:
+        headless_char(ord(character))
+    headless_new_frame(mouse_x, mouse_y, buttons, scroll)